@@ -0,0 +1,214 @@
+"""Local stand-ins for Pyrogram and pytgcalls used by the benchmark."""
+
+import asyncio
+import io
+import math
+import random
+import struct
+import wave
+from typing import Callable, Dict, List, Optional
+
+import pyrogram.raw
+from aiohttp import web
+from pyrogram import utils
+from pyrogram.errors import FloodWait
+from pytgcalls.exceptions import AlreadyJoinedError, NoActiveGroupCall, NotInGroupCallError, TelegramServerError
+from pytgcalls.types import StreamAudioEnded
+
+
+class FakeBehavior:
+    """Latencies and error rates the fake backend simulates."""
+
+    def __init__(
+        self,
+        join_latency: float = 0.2,
+        join_jitter: float = 0.1,
+        stream_seconds: float = 5.0,
+        no_active_rate: float = 0.0,
+        already_joined_rate: float = 0.0,
+        flood_wait_rate: float = 0.0,
+        flood_wait_seconds: int = 5,
+        error_rate: float = 0.0,
+        transient_error_rate: float = 0.0,
+        rpc_latency: float = 0.05,
+        seed: int = 0,
+    ):
+        self.join_latency = join_latency
+        self.join_jitter = join_jitter
+        self.stream_seconds = stream_seconds
+        self.no_active_rate = no_active_rate
+        self.already_joined_rate = already_joined_rate
+        self.flood_wait_rate = flood_wait_rate
+        self.flood_wait_seconds = flood_wait_seconds
+        self.error_rate = error_rate
+        self.transient_error_rate = transient_error_rate
+        self.rpc_latency = rpc_latency
+        self.random = random.Random(seed)
+
+    def join_delay(self) -> float:
+        return max(0.0, self.random.gauss(self.join_latency, self.join_jitter))
+
+    def chance(self, rate: float) -> bool:
+        return rate > 0 and self.random.random() < rate
+
+
+class FakeClient:
+    """Pyrogram Client stand-in; only what VoiceChatManager calls."""
+
+    def __init__(self, name: str, behavior: FakeBehavior):
+        self.name = name
+        self.behavior = behavior
+        self.is_connected = False
+        self.started_group_calls: set = set()
+        self.resolved_peers = 0
+        self.me = None
+
+    async def start(self):
+        self.is_connected = True
+
+    async def stop(self):
+        self.is_connected = False
+
+    def add_handler(self, handler, group: int = 0):
+        pass
+
+    async def resolve_peer(self, peer_id: int):
+        await asyncio.sleep(self.behavior.rpc_latency)
+        self.resolved_peers += 1
+        if utils.get_peer_type(peer_id) == 'channel':
+            return pyrogram.raw.types.InputPeerChannel(
+                channel_id=utils.get_channel_id(peer_id),
+                access_hash=0
+            )
+        return pyrogram.raw.types.InputPeerChat(chat_id=-peer_id)
+
+    async def invoke(self, query):
+        """Accept phone.CreateGroupCall and remember the chat as having a call."""
+        await asyncio.sleep(self.behavior.rpc_latency)
+        if self.behavior.chance(self.behavior.flood_wait_rate):
+            raise FloodWait(value=self.behavior.flood_wait_seconds)
+        peer = query.peer
+        if isinstance(peer, pyrogram.raw.types.InputPeerChannel):
+            channel = pyrogram.raw.types.PeerChannel(channel_id=peer.channel_id)
+            self.started_group_calls.add(utils.get_peer_id(channel))
+        else:
+            self.started_group_calls.add(-peer.chat_id)
+        return None
+
+
+class FakePyTgCalls:
+    """
+    PyTgCalls stand-in that simulates joins, playback and Telegram errors.
+
+    A joined call plays for stream_seconds and then delivers
+    StreamAudioEnded to the registered handlers. Like the real library, it
+    stays in the call until it is left.
+    """
+
+    def __init__(self, client: FakeClient):
+        self.client = client
+        self.behavior = client.behavior
+        self.calls: Dict[int, Optional[asyncio.TimerHandle]] = {}  # chat -> end of playback
+        self._stream_end_handlers: List[Callable] = []
+        self.joins = 0
+
+    async def start(self):
+        pass
+
+    def on_stream_end(self) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            self._stream_end_handlers.append(func)
+            return func
+        return decorator
+
+    async def join_group_call(self, chat_id: int, stream, *args, **kwargs):
+        behavior = self.behavior
+        await asyncio.sleep(behavior.join_delay())
+
+        if behavior.chance(behavior.flood_wait_rate):
+            raise FloodWait(value=behavior.flood_wait_seconds)
+        if behavior.chance(behavior.error_rate):
+            raise RuntimeError("Simulated join failure")
+        if behavior.chance(behavior.transient_error_rate):
+            raise TelegramServerError()
+        if chat_id in self.calls or behavior.chance(behavior.already_joined_rate):
+            raise AlreadyJoinedError()
+        if chat_id not in self.client.started_group_calls and behavior.chance(behavior.no_active_rate):
+            raise NoActiveGroupCall()
+
+        self._begin(chat_id)
+
+    async def play(self, chat_id: int, stream, *args, **kwargs):
+        behavior = self.behavior
+        await asyncio.sleep(behavior.join_delay())
+
+        if behavior.chance(behavior.flood_wait_rate):
+            raise FloodWait(value=behavior.flood_wait_seconds)
+        if behavior.chance(behavior.error_rate):
+            raise RuntimeError("Simulated call failure")
+        if behavior.chance(behavior.transient_error_rate):
+            raise TelegramServerError()
+
+        self._begin(chat_id)
+
+    async def change_stream(self, chat_id: int, stream, *args, **kwargs):
+        await asyncio.sleep(self.behavior.rpc_latency)
+        if chat_id not in self.calls:
+            raise NotInGroupCallError()
+        self._begin(chat_id)
+
+    async def leave_call(self, chat_id: int):
+        await asyncio.sleep(self.behavior.rpc_latency)
+        handle = self.calls.pop(chat_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    async def leave_group_call(self, chat_id: int):
+        await self.leave_call(chat_id)
+
+    def _begin(self, chat_id: int):
+        self.joins += 1
+        handle = self.calls.get(chat_id)
+        if handle is not None:
+            handle.cancel()
+        loop = asyncio.get_running_loop()
+        self.calls[chat_id] = loop.call_later(self.behavior.stream_seconds, self._end, chat_id)
+
+    def _end(self, chat_id: int):
+        if chat_id in self.calls:
+            self.calls[chat_id] = None
+        for handler in self._stream_end_handlers:
+            asyncio.ensure_future(handler(self, StreamAudioEnded(chat_id)))
+
+
+def make_wav(seconds: float, sample_rate: int = 48000) -> bytes:
+    """Generate a mono 16-bit sine tone as WAV bytes ffmpeg can decode."""
+    frames = int(seconds * sample_rate)
+    samples = (
+        int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+        for i in range(frames)
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b''.join(struct.pack('<h', sample) for sample in samples))
+    return buffer.getvalue()
+
+
+async def start_audio_server(port: int, audio: bytes) -> web.AppRunner:
+    """Serve audio at http://127.0.0.1:port/azan.wav with ETag revalidation."""
+    etag = f'"{len(audio)}"'
+
+    async def handle_audio(request):
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        return web.Response(body=audio, content_type='audio/wav', headers={'ETag': etag})
+
+    app = web.Application()
+    app.router.add_get('/azan.wav', handle_audio)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
@@ -0,0 +1,416 @@
+"""
+Load-generation benchmark for the voice chat service.
+
+Starts the real gRPC service in a child process with fake Telegram
+sessions, serves audio from a local HTTP server, fires bursts of requests
+at it and reports RPC latency percentiles together with the peak RSS, open
+file descriptors and CPU time of the service process.
+
+Example:
+    python run_benchmark.py --rpc stream --chats 1000 --shape burst
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from grpc import aio
+
+import voice_chat_pb2
+import voice_chat_pb2_grpc
+
+from fakes import FakeBehavior, make_wav, start_audio_server
+from server import server_main
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+class ProcessSampler:
+    """Samples RSS, open file descriptors and CPU time of a process from /proc."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_bytes = 0
+        self.peak_fds = 0
+        self.baseline: Optional[Dict[str, float]] = None
+        self._started_wall = 0.0
+        self._started_cpu = 0.0
+        self._last: Dict[str, float] = {}
+
+    def sample(self) -> Dict[str, float]:
+        rss_bytes = 0
+        with open(f'/proc/{self.pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss_bytes = int(line.split()[1]) * 1024
+                    break
+        fds = len(os.listdir(f'/proc/{self.pid}/fd'))
+        with open(f'/proc/{self.pid}/stat') as f:
+            # Fields after the parenthesised command name; utime and stime are 14 and 15
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        self.peak_fds = max(self.peak_fds, fds)
+        self._last = {'rss_bytes': rss_bytes, 'fds': fds, 'cpu_seconds': cpu_seconds}
+        return self._last
+
+    def start(self):
+        """Record the idle baseline and begin the measured window."""
+        self.baseline = self.sample()
+        self.peak_rss_bytes = self.baseline['rss_bytes']
+        self.peak_fds = self.baseline['fds']
+        self._started_wall = time.perf_counter()
+        self._started_cpu = self.baseline['cpu_seconds']
+
+    async def run(self):
+        while True:
+            try:
+                self.sample()
+            except FileNotFoundError:
+                return
+            await asyncio.sleep(self.interval)
+
+    def summary(self) -> Dict[str, float]:
+        wall = time.perf_counter() - self._started_wall
+        cpu = self._last.get('cpu_seconds', self._started_cpu) - self._started_cpu
+        return {
+            'baseline_rss_mb': round(self.baseline['rss_bytes'] / 2 ** 20, 1),
+            'peak_rss_mb': round(self.peak_rss_bytes / 2 ** 20, 1),
+            'baseline_fds': self.baseline['fds'],
+            'peak_fds': self.peak_fds,
+            'cpu_seconds': round(cpu, 2),
+            'cpu_percent': round(100 * cpu / wall, 1) if wall > 0 else 0.0,
+            'wall_seconds': round(wall, 2),
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def schedule(count: int, shape: str, spread: float, rng: random.Random) -> List[float]:
+    """Offsets in seconds at which each of count requests is sent."""
+    if shape == 'burst':
+        return [0.0] * count
+    if shape == 'ramp':
+        return [spread * index / count for index in range(count)]
+    if shape == 'jitter':
+        return sorted(rng.uniform(0, spread) for _ in range(count))
+    raise ValueError(f"Unknown shape {shape}")
+
+
+class Results:
+    """Latency and outcome of every request, grouped by RPC."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+        self.messages: Dict[str, int] = {}
+
+    def record(self, rpc: str, latency: float, success: bool, message: str = ''):
+        self.latencies.setdefault(rpc, []).append(latency)
+        if not success:
+            self.failures[rpc] = self.failures.get(rpc, 0) + 1
+            self.messages[message] = self.messages.get(message, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for rpc, latencies in self.latencies.items():
+            summary[rpc] = {
+                'requests': len(latencies),
+                'failed': self.failures.get(rpc, 0),
+                'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+                'max_ms': round(max(latencies) * 1000, 1),
+            }
+        return summary
+
+
+def chat_ids_for(args: argparse.Namespace) -> List[int]:
+    """Group chat IDs a wave streams to."""
+    return [-(1_000_000 + index) for index in range(args.chats)]
+
+
+async def prewarm_wave(
+    stub: voice_chat_pb2_grpc.VoiceChatServiceStub,
+    args: argparse.Namespace,
+    results: Results,
+):
+    """Ask the service to pre-warm the chats of the next wave, then wait until it is due."""
+    start_at = time.time() + args.prewarm
+    sent = time.perf_counter()
+    try:
+        response = await stub.PrepareBroadcast(voice_chat_pb2.PrepareBroadcastRequest(
+            chat_ids=chat_ids_for(args),
+            start_unix_ms=int(start_at * 1000),
+            lead_seconds=max(1, int(args.prewarm))
+        ))
+        results.record('PrepareBroadcast', time.perf_counter() - sent, response.success, response.message)
+    except Exception as e:
+        results.record('PrepareBroadcast', time.perf_counter() - sent, False, type(e).__name__)
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+
+
+async def run_wave(
+    stub: voice_chat_pb2_grpc.VoiceChatServiceStub,
+    args: argparse.Namespace,
+    audio_url: str,
+    results: Results,
+    rng: random.Random,
+):
+    """Send one wave of requests shaped by args.shape."""
+    started = time.perf_counter()
+
+    async def timed(rpc: str, call, offset: float):
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            response = await call()
+        except Exception as e:
+            results.record(rpc, time.perf_counter() - sent, False, type(e).__name__)
+            return
+        latency = time.perf_counter() - sent
+        if rpc == 'StreamAzanBatch':
+            # One latency sample for the batch, one outcome per chat
+            results.record(rpc, latency, response.success, response.message)
+            for result in response.results:
+                if not result.success:
+                    results.messages[result.message] = results.messages.get(result.message, 0) + 1
+        else:
+            results.record(rpc, latency, response.success, response.message)
+
+    if args.rpc == 'stream':
+        offsets = schedule(args.chats, args.shape, args.spread, rng)
+        tasks = [
+            timed('StreamAzan', lambda chat_id=chat_id: stub.StreamAzan(
+                voice_chat_pb2.StreamAzanRequest(chat_id=chat_id, audio_url=audio_url)
+            ), offset)
+            for chat_id, offset in zip(chat_ids_for(args), offsets)
+        ]
+    elif args.rpc == 'batch':
+        chat_ids = chat_ids_for(args)
+        batches = [chat_ids[i:i + args.batch_size] for i in range(0, len(chat_ids), args.batch_size)]
+        offsets = schedule(len(batches), args.shape, args.spread, rng)
+        tasks = [
+            timed('StreamAzanBatch', lambda batch=batch: stub.StreamAzanBatch(
+                voice_chat_pb2.StreamAzanBatchRequest(chat_ids=batch, audio_url=audio_url)
+            ), offset)
+            for batch, offset in zip(batches, offsets)
+        ]
+    else:
+        offsets = schedule(args.chats, args.shape, args.spread, rng)
+        tasks = [
+            timed('StartCall', lambda user_id=100_000 + index: stub.StartCall(
+                voice_chat_pb2.StartCallRequest(
+                    user_id=user_id,
+                    audio_url=audio_url,
+                    duration_seconds=max(1, int(args.stream_seconds))
+                )
+            ), offset)
+            for index, offset in enumerate(offsets)
+        ]
+
+    await asyncio.gather(*tasks)
+
+
+async def wait_until_serving(stub: voice_chat_pb2_grpc.VoiceChatServiceStub, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            response = await stub.HealthCheck(voice_chat_pb2.HealthCheckRequest(), timeout=1.0)
+            if response.healthy:
+                return
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise RuntimeError("Benchmark server did not start")
+        await asyncio.sleep(0.2)
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    behavior = FakeBehavior(
+        join_latency=args.join_latency,
+        join_jitter=args.join_jitter,
+        stream_seconds=args.stream_seconds,
+        no_active_rate=args.no_active_rate,
+        already_joined_rate=args.already_joined_rate,
+        flood_wait_rate=args.flood_wait_rate,
+        flood_wait_seconds=args.flood_wait_seconds,
+        error_rate=args.error_rate,
+        transient_error_rate=args.transient_error_rate,
+        seed=args.seed,
+    )
+    audio_runner = await start_audio_server(args.audio_port, make_wav(args.audio_seconds))
+    audio_url = f"http://127.0.0.1:{args.audio_port}/azan.wav"
+
+    context = multiprocessing.get_context('spawn')
+    server = context.Process(
+        target=server_main,
+        args=(
+            args.port,
+            args.sessions,
+            behavior,
+            {
+                'pretranscode': args.pretranscode,
+                'batch_concurrency': args.batch_concurrency,
+                'max_concurrent_joins': args.max_concurrent_joins,
+                'max_concurrent_joins_per_session': args.max_concurrent_joins_per_session,
+                'join_rate_per_session': args.join_rate,
+                'join_burst_per_session': args.join_burst,
+                'admission_max_wait_seconds': args.admission_max_wait,
+                'retry_max_attempts': args.retry_attempts,
+                'retry_budget_seconds': args.retry_budget,
+            },
+            args.log_level,
+            args.server_log,
+        ),
+        daemon=True,
+    )
+    server.start()
+
+    channel = aio.insecure_channel(f"127.0.0.1:{args.port}")
+    stub = voice_chat_pb2_grpc.VoiceChatServiceStub(channel)
+    try:
+        await wait_until_serving(stub)
+        sampler = ProcessSampler(server.pid)
+        sampler.start()
+        sampling = asyncio.create_task(sampler.run())
+
+        results = Results()
+        rng = random.Random(args.seed)
+        load_started = time.perf_counter()
+        for wave in range(args.waves):
+            if wave:
+                await asyncio.sleep(max(0.0, load_started + wave * args.wave_interval - time.perf_counter()))
+            if args.prewarm > 0 and args.rpc != 'call':
+                await prewarm_wave(stub, args, results)
+            await run_wave(stub, args, audio_url, results, rng)
+        load_seconds = time.perf_counter() - load_started
+
+        # Keep sampling while the streams play out and the calls are left
+        await asyncio.sleep(args.drain_seconds)
+        sampling.cancel()
+        sampler.sample()
+
+        return {
+            'config': vars(args),
+            'load_seconds': round(load_seconds, 2),
+            'rpcs': results.summary(),
+            'failures': results.messages,
+            'process': sampler.summary(),
+        }
+    finally:
+        await channel.close()
+        server.terminate()
+        server.join(10)
+        await audio_runner.cleanup()
+
+
+def print_report(report: dict):
+    config = report['config']
+    print(
+        f"\n{config['rpc']} x {config['chats']} ({config['shape']}, {config['waves']} wave(s), "
+        f"{config['sessions']} session(s)) sent in {report['load_seconds']}s\n"
+    )
+    print(f"{'RPC':<18}{'requests':>10}{'failed':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for rpc, stats in report['rpcs'].items():
+        print(
+            f"{rpc:<18}{stats['requests']:>10}{stats['failed']:>8}{stats['p50_ms']:>10}"
+            f"{stats['p90_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+        )
+    if report['failures']:
+        print("\nFailures:")
+        for message, count in sorted(report['failures'].items(), key=lambda item: -item[1]):
+            print(f"  {count:>6}  {message}")
+
+    process = report['process']
+    print(
+        f"\nService process: RSS {process['baseline_rss_mb']} -> {process['peak_rss_mb']} MB peak, "
+        f"fds {process['baseline_fds']} -> {process['peak_fds']} peak, "
+        f"CPU {process['cpu_seconds']}s ({process['cpu_percent']}% over {process['wall_seconds']}s)"
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_argument_group('load')
+    load.add_argument('--rpc', choices=['stream', 'batch', 'call'], default='stream',
+                      help='StreamAzan per chat, StreamAzanBatch, or StartCall per user')
+    load.add_argument('--chats', type=int, default=1000, help='Chats (or users) per wave')
+    load.add_argument('--shape', choices=['burst', 'ramp', 'jitter'], default='burst',
+                      help='burst: all at once; ramp: evenly over --spread; jitter: random within --spread')
+    load.add_argument('--spread', type=float, default=5.0, help='Seconds a ramp or jitter wave is spread over')
+    load.add_argument('--batch-size', type=int, default=250, help='Chats per StreamAzanBatch request')
+    load.add_argument('--waves', type=int, default=1, help='Number of waves')
+    load.add_argument('--wave-interval', type=float, default=60.0, help='Seconds between wave starts')
+    load.add_argument('--drain-seconds', type=float, default=None,
+                      help='Seconds to keep sampling after the last request (default: stream length + 2)')
+    load.add_argument('--prewarm', type=float, default=0.0, metavar='SECONDS',
+                      help='Send PrepareBroadcast this long before each stream or batch wave')
+    load.add_argument('--seed', type=int, default=0)
+
+    fake = parser.add_argument_group('fake telegram')
+    fake.add_argument('--sessions', type=int, default=1, help='Fake user sessions')
+    fake.add_argument('--join-latency', type=float, default=0.2, help='Mean join time in seconds')
+    fake.add_argument('--join-jitter', type=float, default=0.1, help='Standard deviation of join time')
+    fake.add_argument('--stream-seconds', type=float, default=5.0, help='Playback time before the stream ends')
+    fake.add_argument('--no-active-rate', type=float, default=0.0, help='Share of chats without a voice chat')
+    fake.add_argument('--already-joined-rate', type=float, default=0.0)
+    fake.add_argument('--flood-wait-rate', type=float, default=0.0)
+    fake.add_argument('--flood-wait-seconds', type=int, default=5)
+    fake.add_argument('--error-rate', type=float, default=0.0, help='Share of joins failing outright')
+    fake.add_argument('--transient-error-rate', type=float, default=0.0,
+                      help='Share of joins failing with a retryable server error')
+
+    service = parser.add_argument_group('service')
+    service.add_argument('--port', type=int, default=50153, help='gRPC port of the service under test')
+    service.add_argument('--audio-port', type=int, default=8753, help='Port of the local audio server')
+    service.add_argument('--audio-seconds', type=float, default=3.0, help='Length of the generated audio')
+    service.add_argument('--pretranscode', action='store_true', help='Decode audio to PCM (needs ffmpeg)')
+    service.add_argument('--batch-concurrency', type=int, default=20)
+    service.add_argument('--max-concurrent-joins', type=int, default=50)
+    service.add_argument('--max-concurrent-joins-per-session', type=int, default=10)
+    service.add_argument('--join-rate', type=float, default=5.0, help='Admitted joins per second per session')
+    service.add_argument('--join-burst', type=int, default=10, help='Join token bucket size per session')
+    service.add_argument('--admission-max-wait', type=float, default=120.0,
+                         help='Seconds a join may wait for admission before it is shed')
+    service.add_argument('--retry-attempts', type=int, default=4, help='Attempts per chat before giving up')
+    service.add_argument('--retry-budget', type=float, default=60.0, help='Seconds per chat spent retrying')
+    service.add_argument('--log-level', default='INFO', help='Service log level')
+    service.add_argument('--server-log', default=os.devnull, help='File for the service log')
+    parser.add_argument('--json', metavar='PATH', help='Also write the report as JSON')
+
+    args = parser.parse_args(argv)
+    if args.drain_seconds is None:
+        args.drain_seconds = args.stream_seconds + 2
+    return args
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(benchmark(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Voice chat service process backed by the fake Telegram stand-ins."""
+
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from audio_cache import AudioCache
+from grpc_server import serve
+from voice_chat import VoiceChatManager
+
+from fakes import FakeBehavior, FakeClient, FakePyTgCalls
+
+
+async def run_server(
+    port: int,
+    sessions: int,
+    behavior: FakeBehavior,
+    manager_options: dict,
+):
+    """Serve the real VoiceChatServicer over gRPC with fake sessions."""
+    clients = [FakeClient(f"bench_{index}", behavior) for index in range(sessions)]
+    with tempfile.TemporaryDirectory(prefix='voice-chat-bench-') as cache_dir:
+        manager = VoiceChatManager(
+            clients,
+            audio_cache=AudioCache(cache_dir),
+            max_stream_seconds=behavior.stream_seconds + 30,
+            pytgcalls_factory=FakePyTgCalls,
+            **manager_options
+        )
+        await asyncio.gather(*(client.start() for client in clients))
+        await manager.start()
+        try:
+            await serve(manager, port, '127.0.0.1')
+        finally:
+            await manager.stop()
+
+
+def server_main(
+    port: int,
+    sessions: int,
+    behavior: FakeBehavior,
+    manager_options: dict,
+    log_level: str,
+    log_path: str,
+):
+    """Entry point of the benchmark server process."""
+    # Logging stays on, as in production, but out of the benchmark output
+    logging.basicConfig(
+        level=log_level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(log_path)
+        ],
+        force=True
+    )
+    try:
+        asyncio.run(run_server(port, sessions, behavior, manager_options))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,293 @@
+"""Admission control for joins and calls hitting Telegram during bursts."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_SHED, ADMISSION_WAIT_SECONDS
+from session_pool import VoiceSession
+from timer_wheel import Timer, TimerWheel
+
+logger = logging.getLogger(__name__)
+
+
+class Priority:
+    """Admission priorities; lower values are admitted first."""
+
+    AZAN = 0
+    REMINDER = 1
+    PREWARM = 2
+    TEST = 3
+
+    NAMES = {AZAN: 'azan', REMINDER: 'reminder', PREWARM: 'prewarm', TEST: 'test'}
+
+
+class AdmissionRejected(Exception):
+    """Raised when work is shed because it could not start before its deadline."""
+
+
+class TokenBucket:
+    """Classic token bucket: rate tokens per second, at most capacity banked."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available, 0 if one is available now."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class _Ticket:
+    """A caller waiting for admission on a session."""
+
+    __slots__ = ('priority', 'deadline', 'seq', 'session', 'future', 'timer', 'queued_at')
+
+    def __init__(
+        self,
+        priority: int,
+        deadline: Optional[float],
+        seq: int,
+        session: VoiceSession,
+        future: asyncio.Future,
+    ):
+        self.priority = priority
+        self.deadline = deadline
+        self.seq = seq
+        self.session = session
+        self.future = future
+        self.timer: Optional[Timer] = None
+        self.queued_at = time.monotonic()
+
+    def sort_key(self):
+        # Priority first, then earliest deadline, then arrival order
+        return (self.priority, self.deadline if self.deadline is not None else math.inf, self.seq)
+
+    def __lt__(self, other: '_Ticket') -> bool:
+        return self.sort_key() < other.sort_key()
+
+
+class AdmissionScheduler:
+    """
+    Decides when each join or call may hit Telegram.
+
+    Work is queued per session and admitted in priority order, then by
+    earliest deadline, while three limits hold: a global cap on concurrent
+    joins, a cap per session, and a token bucket per session that bounds the
+    rate of new joins an account sends. A session in FloodWait admits
+    nothing until the wait is over. Work whose deadline passes while queued
+    is shed with AdmissionRejected instead of starting late.
+    """
+
+    def __init__(
+        self,
+        timer_wheel: TimerWheel,
+        max_concurrent: int = 50,
+        max_concurrent_per_session: int = 10,
+        rate_per_session: float = 5.0,
+        burst_per_session: int = 10,
+        max_wait_seconds: float = 120.0,
+    ):
+        self.timer_wheel = timer_wheel
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_session = max_concurrent_per_session
+        self.rate_per_session = rate_per_session
+        self.burst_per_session = burst_per_session
+        self.max_wait_seconds = max_wait_seconds
+
+        self._queues: Dict[int, List[_Ticket]] = {}  # session index -> heap of tickets
+        self._in_flight = 0
+        self._session_in_flight: Dict[int, int] = {}
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.admitted = 0
+        self.shed = 0
+
+        ADMISSION_QUEUED.set_function(lambda: self.queued)
+        ADMISSION_IN_FLIGHT.set_function(lambda: self._in_flight)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return sum(
+            1 for queue in self._queues.values() for ticket in queue if not ticket.future.done()
+        )
+
+    @property
+    def available(self) -> int:
+        """Joins that could still start at once under the global cap, after those queued."""
+        return max(0, self.max_concurrent - self._in_flight - self.queued)
+
+    def session_in_flight(self, session: VoiceSession) -> int:
+        return self._session_in_flight.get(session.index, 0)
+
+    def session_queued(self, session: VoiceSession) -> int:
+        return sum(1 for ticket in self._queues.get(session.index, ()) if not ticket.future.done())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        session: VoiceSession,
+        priority: int = Priority.REMINDER,
+        deadline: Optional[float] = None,
+    ):
+        """Hold an admission slot on a session for the duration of the block."""
+        await self.acquire(session, priority, deadline)
+        try:
+            yield
+        finally:
+            self.release(session)
+
+    async def acquire(
+        self,
+        session: VoiceSession,
+        priority: int = Priority.REMINDER,
+        deadline: Optional[float] = None,
+    ):
+        """
+        Wait until work on a session may start.
+
+        Args:
+            session: Session the work will run on
+            priority: One of the Priority values
+            deadline: Unix time after which the work is no longer wanted
+
+        Raises:
+            AdmissionRejected: If the deadline passes before admission
+        """
+        now = time.time()
+        if self.max_wait_seconds:
+            limit = now + self.max_wait_seconds
+            deadline = limit if deadline is None else min(deadline, limit)
+        if deadline is not None and deadline <= now:
+            self._count_shed(priority)
+            raise AdmissionRejected("Deadline passed before the request could start")
+
+        ticket = _Ticket(
+            priority,
+            deadline,
+            next(self._seq),
+            session,
+            asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queues.setdefault(session.index, []), ticket)
+        if deadline is not None:
+            ticket.timer = self.timer_wheel.schedule(deadline - now, lambda: self._expire(ticket))
+        self._dispatch()
+
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled() and ticket.future.exception() is None:
+                # Admitted just before the caller went away
+                self.release(session)
+            raise
+        finally:
+            self.timer_wheel.cancel(ticket.timer)
+
+        ADMISSION_WAIT_SECONDS.labels(Priority.NAMES.get(priority, priority)).observe(
+            time.monotonic() - ticket.queued_at
+        )
+
+    def release(self, session: VoiceSession):
+        """Return a slot taken by acquire()."""
+        self._in_flight -= 1
+        self._session_in_flight[session.index] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit as many queued tickets as the limits allow, best first across sessions."""
+        while self._in_flight < self.max_concurrent:
+            now = time.monotonic()
+            best: Optional[_Ticket] = None
+            next_wake: Optional[float] = None
+
+            for index, queue in self._queues.items():
+                while queue and queue[0].future.done():
+                    heapq.heappop(queue)  # shed or cancelled
+                if not queue:
+                    continue
+                if self._session_in_flight.get(index, 0) >= self.max_concurrent_per_session:
+                    continue
+
+                head = queue[0]
+                session = head.session
+                if session.is_flood_waited():
+                    wait = session.flood_wait_remaining
+                else:
+                    wait = self._bucket(index).wait_time(now)
+                if wait > 0:
+                    next_wake = wait if next_wake is None else min(next_wake, wait)
+                    continue
+
+                if best is None or head < best:
+                    best = head
+
+            if best is None:
+                if next_wake is not None:
+                    self._schedule_wakeup(next_wake)
+                return
+
+            index = best.session.index
+            heapq.heappop(self._queues[index])
+            self._bucket(index).take()
+            self._in_flight += 1
+            self._session_in_flight[index] = self._session_in_flight.get(index, 0) + 1
+            self.admitted += 1
+            best.future.set_result(None)
+
+    def _expire(self, ticket: _Ticket):
+        """Shed a ticket whose deadline passed while it was queued."""
+        if ticket.future.done():
+            return
+        self._count_shed(ticket.priority)
+        ticket.future.set_exception(
+            AdmissionRejected("Deadline passed while waiting to start")
+        )
+
+    def _count_shed(self, priority: int):
+        self.shed += 1
+        ADMISSION_SHED.labels(Priority.NAMES.get(priority, priority)).inc()
+
+    def _bucket(self, index: int) -> TokenBucket:
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = TokenBucket(self.rate_per_session, self.burst_per_session)
+        return bucket
+
+    def _schedule_wakeup(self, delay: float):
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._wakeup is not None and not self._wakeup.cancelled() and self._wakeup.when() <= when:
+            return
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = loop.call_at(when, self._on_wakeup)
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
@@ -0,0 +1,354 @@
+"""Persistent, content-addressed on-disk cache for downloaded audio files."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.json'
+BLOB_SUFFIX = '.mp3'
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class CacheEntry:
+    """Validators and content digest recorded for a single audio URL."""
+
+    def __init__(
+        self,
+        url: str,
+        digest: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        validated_at: float = 0.0,
+    ):
+        self.url = url
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = validated_at
+
+    def to_dict(self) -> dict:
+        return {
+            'digest': self.digest,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'validated_at': self.validated_at,
+        }
+
+
+class AudioCache:
+    """
+    Size-bounded LRU cache of audio files keyed by URL plus ETag/Last-Modified.
+
+    Files are stored once per content digest, so two URLs serving the same
+    bytes share a blob. Derived files such as transcoded copies are kept as
+    variants of a blob and live and die with it. Every path handed out by acquire() holds a reference
+    that must be returned with release(); blobs with outstanding references
+    are never evicted, so a file being streamed stays on disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        revalidate_after: float = 300.0,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+
+        self._entries: Dict[str, CacheEntry] = {}  # url -> entry
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()  # digest -> size, LRU order
+        self._variants: Dict[str, Dict[str, int]] = {}  # digest -> suffix -> size
+        self._refcounts: Dict[str, int] = {}
+        self._total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cache entry for a URL if its blob is still on disk."""
+        entry = self._entries.get(url)
+        if entry is None or entry.digest not in self._blobs:
+            return None
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether an entry can be served without asking the origin again."""
+        return time.time() - entry.validated_at < self.revalidate_after
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers for revalidation."""
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def hit(self, entry: CacheEntry, revalidated: bool = False) -> str:
+        """Record a cache hit for an entry and acquire its blob."""
+        self.hits += 1
+        if revalidated:
+            self.revalidations += 1
+            entry.validated_at = time.time()
+            self._save_index()
+        return self.acquire(entry.digest)
+
+    def create_temp_file(self) -> str:
+        """Create an empty partial file inside the cache directory."""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.part')
+        os.close(fd)
+        return temp_path
+
+    def store(
+        self,
+        url: str,
+        temp_path: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        digest: Optional[str] = None,
+    ) -> str:
+        """
+        Move a freshly downloaded file into the cache and acquire it.
+
+        Args:
+            url: URL the file was downloaded from
+            temp_path: Path returned by create_temp_file()
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            digest: SHA-256 of the file, computed here when not given
+
+        Returns:
+            Path of the stored blob, with one reference held for the caller
+        """
+        if digest is None:
+            digest = self._hash_file(temp_path)
+
+        self.misses += 1
+        blob_path = self.path_for(digest)
+
+        if digest in self._blobs:
+            # Same bytes already cached under another URL or validator
+            os.remove(temp_path)
+            self._blobs.move_to_end(digest)
+        else:
+            os.replace(temp_path, blob_path)
+            size = os.path.getsize(blob_path)
+            self._blobs[digest] = size
+            self._total_bytes += size
+
+        self._entries[url] = CacheEntry(
+            url,
+            digest,
+            etag=etag,
+            last_modified=last_modified,
+            validated_at=time.time(),
+        )
+        blob_path = self.acquire(digest)
+        self._evict()
+        self._save_index()
+        return blob_path
+
+    def path_for(self, digest: str) -> str:
+        """Return the on-disk path of a blob."""
+        return os.path.join(self.cache_dir, f"{digest}{BLOB_SUFFIX}")
+
+    def variant_path(self, digest: str, suffix: str) -> str:
+        """Return the on-disk path of a derived file of a blob."""
+        return os.path.join(self.cache_dir, f"{digest}{suffix}")
+
+    def has_variant(self, digest: str, suffix: str) -> bool:
+        """Whether a derived file of a blob is cached."""
+        return suffix in self._variants.get(digest, {})
+
+    def add_variant(self, digest: str, suffix: str) -> str:
+        """
+        Register a derived file written to variant_path() for a cached blob.
+
+        The variant counts towards the size budget and is evicted together
+        with its blob.
+        """
+        if digest not in self._blobs:
+            raise KeyError(f"Audio blob {digest} is not cached")
+        path = self.variant_path(digest, suffix)
+        size = os.path.getsize(path)
+        variants = self._variants.setdefault(digest, {})
+        self._total_bytes += size - variants.get(suffix, 0)
+        variants[suffix] = size
+        self._evict()
+        self._save_index()
+        return path
+
+    def digest_for(self, path: str) -> str:
+        """Return the content digest of a blob path."""
+        return os.path.splitext(os.path.basename(path))[0]
+
+    def acquire(self, digest: str) -> str:
+        """Take a reference on a blob and return its path."""
+        if digest not in self._blobs:
+            raise KeyError(f"Audio blob {digest} is not cached")
+        self._refcounts[digest] = self._refcounts.get(digest, 0) + 1
+        self._blobs.move_to_end(digest)
+        return self.path_for(digest)
+
+    def retain(self, path: str, count: int = 1) -> str:
+        """Take additional references on a path that is already held."""
+        digest = self.digest_for(path)
+        if digest not in self._refcounts:
+            raise KeyError(f"Audio blob {digest} is not held")
+        self._refcounts[digest] += count
+        return path
+
+    def release(self, path: str):
+        """Return a reference taken by acquire()."""
+        digest = self.digest_for(path)
+        count = self._refcounts.get(digest, 0)
+        if count <= 1:
+            self._refcounts.pop(digest, None)
+            self._evict()
+        else:
+            self._refcounts[digest] = count - 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current cache occupancy."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'blobs': len(self._blobs),
+            'bytes': self._total_bytes,
+            'pinned': len(self._refcounts),
+        }
+
+    def _evict(self):
+        """Drop least recently used, unreferenced blobs until under max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        for digest in list(self._blobs.keys()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if self._refcounts.get(digest):
+                continue
+
+            size = self._blobs.pop(digest)
+            variants = self._variants.pop(digest, {})
+            size += sum(variants.values())
+            self._total_bytes -= size
+            self.evictions += 1
+            for url in [u for u, e in self._entries.items() if e.digest == digest]:
+                del self._entries[url]
+
+            paths = [self.path_for(digest)]
+            paths.extend(self.variant_path(digest, suffix) for suffix in variants)
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Failed to remove evicted audio file {path}: {e}")
+
+            logger.info(f"Evicted audio blob {digest} ({size} bytes)")
+
+        if self._total_bytes > self.max_bytes:
+            logger.warning(
+                f"Audio cache over budget ({self._total_bytes}/{self.max_bytes} bytes), "
+                f"remaining blobs are in use"
+            )
+        self._save_index()
+
+    def _hash_file(self, path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def _load_index(self):
+        """Restore the index from disk and drop anything that no longer matches."""
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        data = {}
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable audio cache index: {e}")
+
+        for digest in data.get('blobs', []):
+            blob_path = self.path_for(digest)
+            if os.path.exists(blob_path):
+                size = os.path.getsize(blob_path)
+                self._blobs[digest] = size
+                self._total_bytes += size
+
+        for digest, suffixes in data.get('variants', {}).items():
+            if digest not in self._blobs:
+                continue
+            for suffix in suffixes:
+                variant_path = self.variant_path(digest, suffix)
+                if os.path.exists(variant_path):
+                    size = os.path.getsize(variant_path)
+                    self._variants.setdefault(digest, {})[suffix] = size
+                    self._total_bytes += size
+
+        for url, raw in data.get('entries', {}).items():
+            if raw.get('digest') in self._blobs:
+                self._entries[url] = CacheEntry(
+                    url,
+                    raw['digest'],
+                    etag=raw.get('etag'),
+                    last_modified=raw.get('last_modified'),
+                    validated_at=raw.get('validated_at', 0.0),
+                )
+
+        # Remove partial downloads and blobs the index no longer knows about
+        for name in os.listdir(self.cache_dir):
+            if name == INDEX_FILE:
+                continue
+            digest, suffix = os.path.splitext(name)
+            known = suffix == BLOB_SUFFIX or suffix in self._variants.get(digest, {})
+            if name.endswith('.part') or digest not in self._blobs or not known:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except Exception as e:
+                    logger.warning(f"Failed to remove stale cache file {name}: {e}")
+
+        logger.info(
+            f"Audio cache loaded from {self.cache_dir}: "
+            f"{len(self._blobs)} blobs, {self._total_bytes} bytes"
+        )
+        self._evict()
+
+    def _save_index(self):
+        """Persist the index atomically so restarts keep the cache warm."""
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        data = {
+            'blobs': list(self._blobs.keys()),
+            'variants': {digest: list(v.keys()) for digest, v in self._variants.items()},
+            'entries': {url: e.to_dict() for url, e in self._entries.items()},
+        }
+        try:
+            temp_path = f"{index_path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, index_path)
+        except Exception as e:
+            logger.warning(f"Failed to save audio cache index: {e}")
@@ -0,0 +1,84 @@
+"""One-off transcoding of audio files into the raw format pytgcalls plays."""
+
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# pytgcalls feeds group calls with 16-bit little-endian mono PCM sampled at
+# the stream bitrate; files already in this layout are played without ffmpeg.
+PCM_SUFFIX = '.pcm'
+PCM_SAMPLE_RATE = 48000
+PCM_CHANNELS = 1
+
+
+async def transcode_to_pcm(
+    source_path: str,
+    target_path: str,
+    sample_rate: int = PCM_SAMPLE_RATE,
+    timeout_seconds: float = 120.0,
+):
+    """
+    Decode an audio file into raw PCM suitable for InputAudioStream.
+
+    The output is written to a temporary sibling file and renamed into place,
+    so a partially written target is never visible.
+
+    Args:
+        source_path: Audio file in any format ffmpeg understands
+        target_path: Where to write the raw PCM
+        sample_rate: Output sample rate, matching the stream bitrate
+        timeout_seconds: Give up if ffmpeg takes longer than this
+
+    Raises:
+        RuntimeError: If ffmpeg fails or times out
+    """
+    temp_path = f"{target_path}.part"
+    process = await asyncio.create_subprocess_exec(
+        'ffmpeg',
+        '-y',
+        '-v', 'error',
+        '-i', source_path,
+        '-f', 's16le',
+        '-ac', str(PCM_CHANNELS),
+        '-ar', str(sample_rate),
+        temp_path,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout_seconds)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        _remove_quietly(temp_path)
+        raise RuntimeError(f"ffmpeg timed out after {timeout_seconds}s transcoding {source_path}")
+
+    if process.returncode != 0:
+        _remove_quietly(temp_path)
+        raise RuntimeError(
+            f"ffmpeg exited with {process.returncode}: {stderr.decode(errors='replace').strip()}"
+        )
+
+    os.replace(temp_path, target_path)
+    logger.info(f"Transcoded {source_path} to {target_path}")
+
+
+def write_silence(path: str, seconds: float, sample_rate: int = PCM_SAMPLE_RATE):
+    """Write raw PCM silence in the layout InputAudioStream plays, without ffmpeg."""
+    temp_path = f"{path}.part"
+    frame_bytes = 2 * PCM_CHANNELS
+    with open(temp_path, 'wb') as f:
+        f.write(bytes(int(seconds * sample_rate) * frame_bytes))
+    os.replace(temp_path, path)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Failed to remove {path}: {e}")
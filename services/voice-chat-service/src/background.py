@@ -0,0 +1,43 @@
+"""Background tasks kept referenced until they finish."""
+
+import asyncio
+import logging
+from typing import Coroutine, Set
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """
+    Tasks started in the background and not awaited by anyone.
+
+    The event loop only keeps weak references to tasks, so a task nobody
+    holds may be garbage-collected before it finishes, and an exception
+    nobody retrieves is lost. Tasks started here are held until they are
+    done, and their exceptions are logged.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, coro: Coroutine) -> asyncio.Task:
+        """Run a coroutine as a task held until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    async def cancel_all(self):
+        """Cancel every task still running and wait for them to finish."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background task {task.get_name()} failed: {task.exception()}", exc_info=task.exception())
@@ -0,0 +1,127 @@
+"""Fan-out of call lifecycle events to subscribers with bounded buffers."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Iterable, Optional, Set, Tuple
+
+from metrics import CALL_EVENTS_DROPPED, CALL_EVENT_SUBSCRIBERS
+
+# Events held for a subscriber that asked for no particular buffer size
+DEFAULT_BUFFER_SIZE = 256
+
+
+class CallEvent:
+    """One lifecycle transition of a group stream or a private call."""
+
+    __slots__ = ('kind', 'chat_id', 'user_id', 'job_id', 'call_id', 'message', 'at')
+
+    JOINED = 'joined'
+    PLAYING = 'playing'
+    ENDED = 'ended'
+    FAILED = 'failed'
+    AUTO_ENDED = 'auto_ended'
+
+    def __init__(
+        self,
+        kind: str,
+        chat_id: int = 0,
+        user_id: int = 0,
+        job_id: str = '',
+        call_id: str = '',
+        message: str = '',
+    ):
+        self.kind = kind
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.job_id = job_id
+        self.call_id = call_id
+        self.message = message
+        self.at = time.time()
+
+
+class EventSubscription:
+    """
+    Events waiting for one subscriber.
+
+    Holds at most max_events; when a slow subscriber lets it fill up, the
+    oldest event is dropped, so a stuck client never holds back publishers
+    or grows memory. get() reports how many events were dropped before the
+    one it returns.
+    """
+
+    def __init__(self, max_events: int, keys: Optional[Set[int]] = None):
+        self.max_events = max_events
+        self.keys = keys
+        self.closed = False
+        self._events: deque = deque()  # [event, events dropped just before it]
+        self._carried_drops = 0
+        self._ready = asyncio.Event()
+
+    def wants(self, *keys: int) -> bool:
+        return self.keys is None or any(key in self.keys for key in keys)
+
+    def put(self, event: Any):
+        if self.closed:
+            return
+        if len(self._events) >= self.max_events:
+            _, dropped = self._events.popleft()
+            CALL_EVENTS_DROPPED.inc()
+            # The next event left in line is the one the drops came before
+            if self._events:
+                self._events[0][1] += dropped + 1
+            else:
+                self._carried_drops += dropped + 1
+        self._events.append([event, self._carried_drops])
+        self._carried_drops = 0
+        self._ready.set()
+
+    async def get(self) -> Optional[Tuple[Any, int]]:
+        """Wait for the next event and the number dropped before it; None once closed."""
+        while not self._events:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        event, dropped = self._events.popleft()
+        return event, dropped
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+class CallEventBus:
+    """Publishes call events to every subscription interested in them."""
+
+    def __init__(self, default_buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.default_buffer_size = default_buffer_size
+        self._subscriptions: Set[EventSubscription] = set()
+        CALL_EVENT_SUBSCRIBERS.set_function(lambda: len(self._subscriptions))
+
+    def subscribe(
+        self,
+        keys: Optional[Iterable[int]] = None,
+        buffer_size: Optional[int] = None,
+    ) -> EventSubscription:
+        """Subscribe to events of the given chats and users, or of all of them."""
+        subscription = EventSubscription(
+            buffer_size or self.default_buffer_size,
+            set(keys) if keys else None,
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EventSubscription):
+        subscription.close()
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: CallEvent):
+        for subscription in self._subscriptions:
+            if subscription.wants(event.chat_id, event.user_id):
+                subscription.put(event)
+
+    def close(self):
+        """End every subscription, e.g. on shutdown."""
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
@@ -0,0 +1,153 @@
+"""Append-only journal of call lifecycle transitions, replayed after a restart."""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lines written before the journal is rewritten with only what is still open
+COMPACT_AFTER_LINES = 10000
+
+
+class JournalState:
+    """Work a journal says is in progress: what a crash would leave behind."""
+
+    def __init__(self):
+        self.group_calls: Dict[int, int] = {}  # chat_id -> session index
+        self.private_calls: Dict[str, Tuple[int, int]] = {}  # call_id -> (user_id, session index)
+        self.broadcasts: Dict[float, Set[int]] = {}  # start_at -> chats to pre-warm
+        # job_id -> (chat_id, audio_url, priority, deadline), in queue order
+        self.clips: "OrderedDict[str, Tuple[int, str, int, Optional[float]]]" = OrderedDict()
+        self.fifo_dirs: Set[str] = set()
+
+    def __len__(self) -> int:
+        return (
+            len(self.group_calls) + len(self.private_calls) + len(self.broadcasts)
+            + len(self.clips) + len(self.fifo_dirs)
+        )
+
+    def apply(self, entry: Dict[str, Any]):
+        """Fold one journal entry into the state."""
+        op = entry['op']
+        if op == 'joined':
+            self.group_calls[entry['chat']] = entry['session']
+        elif op == 'left':
+            self.group_calls.pop(entry['chat'], None)
+        elif op == 'called':
+            self.private_calls[entry['call']] = (entry['user'], entry['session'])
+        elif op == 'hung_up':
+            self.private_calls.pop(entry['call'], None)
+        elif op == 'broadcast':
+            self.broadcasts.setdefault(entry['start_at'], set()).update(entry['chats'])
+        elif op == 'queued':
+            self.clips[entry['job']] = (entry['chat'], entry['url'], entry['priority'], entry['deadline'])
+        elif op == 'dequeued':
+            self.clips.pop(entry['job'], None)
+        elif op == 'fifo':
+            self.fifo_dirs.add(entry['dir'])
+        elif op == 'fifo_removed':
+            self.fifo_dirs.discard(entry['dir'])
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """The shortest journal that replays into this state, dropping past broadcasts."""
+        now = time.time()
+        return [
+            *({'op': 'joined', 'chat': chat_id, 'session': session} for chat_id, session in self.group_calls.items()),
+            *(
+                {'op': 'called', 'call': call_id, 'user': user_id, 'session': session}
+                for call_id, (user_id, session) in self.private_calls.items()
+            ),
+            *(
+                {'op': 'broadcast', 'chats': sorted(chat_ids), 'start_at': start_at}
+                for start_at, chat_ids in self.broadcasts.items() if start_at > now
+            ),
+            *(
+                {'op': 'queued', 'job': job_id, 'chat': chat_id, 'url': url, 'priority': priority, 'deadline': deadline}
+                for job_id, (chat_id, url, priority, deadline) in self.clips.items()
+            ),
+            *({'op': 'fifo', 'dir': path} for path in self.fifo_dirs),
+        ]
+
+
+class CallJournal:
+    """
+    Append-only log of call lifecycle transitions.
+
+    Each transition is appended as one JSON line and flushed, so it
+    survives the process being killed. On open, the log left by the last
+    run is replayed into the state it describes: the calls it was in, the
+    broadcasts and clips it had not played yet and the FIFO directories it
+    had not removed. Once enough lines accumulate, the log is rewritten
+    atomically with only the entries still open. A torn last line from a
+    crash is skipped. Without a path nothing is recorded.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.state = JournalState()
+        self._file = None
+        self._lines = 0
+
+    def open(self) -> JournalState:
+        """Replay the journal of the last run and start appending to it; returns what it left open."""
+        if not self.path:
+            return JournalState()
+
+        recovered = JournalState()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    for line in f:
+                        try:
+                            recovered.apply(json.loads(line))
+                        except (ValueError, KeyError) as e:
+                            logger.warning(f"Skipping unreadable journal entry: {e}")
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable journal: {e}")
+            logger.info(f"Journal replayed from {self.path}: {len(recovered)} open entries")
+
+        for entry in recovered.entries():
+            self.state.apply(entry)
+        self._rewrite()
+        return recovered
+
+    def record(self, op: str, **fields):
+        """Append a transition."""
+        if self._file is None:
+            return
+        entry = {'op': op, **fields}
+        self.state.apply(entry)
+        try:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+        except Exception as e:
+            logger.warning(f"Failed to write journal entry {op}: {e}")
+            return
+
+        self._lines += 1
+        if self._lines > COMPACT_AFTER_LINES and self._lines > 2 * len(self.state):
+            self._rewrite()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rewrite(self):
+        """Replace the journal with the entries of the current state and keep appending to it."""
+        self.close()
+        entries = self.state.entries()
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'a')
+            self._lines = len(entries)
+        except Exception as e:
+            logger.warning(f"Failed to write journal, continuing without it: {e}")
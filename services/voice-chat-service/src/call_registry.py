@@ -0,0 +1,171 @@
+"""Registry of the group voice chats and private calls a manager holds."""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from session_pool import VoiceSession
+from timer_wheel import Timer
+
+
+class CallRecord:
+    """State of one group voice chat or private call."""
+
+    __slots__ = (
+        'kind', 'chat_id', 'user_id', 'call_id', 'state', 'session', 'audio_path',
+        'progressive', 'deadline', 'timer', 'job_id', 'stream_end', 'created_at', 'updated_at',
+    )
+
+    GROUP = 'group'
+    PRIVATE = 'private'
+
+    STARTING = 'starting'  # private call being dialed
+    WARM = 'warm'          # group call idling on silence ahead of a broadcast
+    IDLE = 'idle'          # group call idling on silence after a queued clip
+    PLAYING = 'playing'
+    ENDING = 'ending'      # leaving the call
+
+    def __init__(
+        self,
+        kind: str,
+        chat_id: int = 0,
+        user_id: int = 0,
+        call_id: str = '',
+        state: str = PLAYING,
+        session: Optional[VoiceSession] = None,
+        deadline: Optional[float] = None,
+    ):
+        self.kind = kind
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.call_id = call_id
+        self.state = state
+        self.session = session
+        self.audio_path: Optional[str] = None  # cache reference held by the call
+        self.progressive: Any = None  # or the download it plays from
+        self.deadline = deadline
+        self.timer: Optional[Timer] = None  # pre-warm expiry or hang-up
+        self.job_id = ''
+        self.stream_end: Optional[asyncio.Future] = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+
+
+class CallRegistry:
+    """
+    Call records indexed by chat, user and call ID.
+
+    Group calls are indexed by chat and private calls by call ID, and by
+    user once connected, so each user is indexed by the call up with them.
+    Counts by kind and state and of calls holding audio are kept up
+    to date on every change, so metrics never scan the records. State and
+    audio must therefore only be changed through the registry.
+    """
+
+    def __init__(self):
+        self._by_chat: Dict[int, CallRecord] = {}
+        self._by_user: Dict[int, CallRecord] = {}
+        self._by_call: Dict[str, CallRecord] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self.holding_audio = 0
+
+    def __len__(self) -> int:
+        return len(self._by_chat) + len(self._by_call)
+
+    def add(self, record: CallRecord) -> CallRecord:
+        """
+        Register a call.
+
+        A chat holds one group call, so the previous one must be removed,
+        and its audio taken back, before another is added for the chat.
+
+        Raises:
+            ValueError: If a group call is already registered for the chat
+        """
+        if record.kind == CallRecord.GROUP:
+            if record.chat_id in self._by_chat:
+                raise ValueError(f"A call is already registered for chat {record.chat_id}")
+            self._by_chat[record.chat_id] = record
+        else:
+            self._by_call[record.call_id] = record
+        self._count(record, 1)
+        return record
+
+    def connect(self, record: CallRecord):
+        """Index a private call by its user once the call is up."""
+        self._by_user[record.user_id] = record
+
+    def remove(self, record: CallRecord) -> bool:
+        """Unregister a call; False if it was not registered."""
+        if not self.holds(record):
+            return False
+        if record.kind == CallRecord.GROUP:
+            del self._by_chat[record.chat_id]
+        else:
+            del self._by_call[record.call_id]
+            if self._by_user.get(record.user_id) is record:
+                del self._by_user[record.user_id]
+        self._count(record, -1)
+        return True
+
+    def holds(self, record: CallRecord) -> bool:
+        if record.kind == CallRecord.GROUP:
+            return self._by_chat.get(record.chat_id) is record
+        return self._by_call.get(record.call_id) is record
+
+    def chat(self, chat_id: int) -> Optional[CallRecord]:
+        return self._by_chat.get(chat_id)
+
+    def user(self, user_id: int) -> Optional[CallRecord]:
+        return self._by_user.get(user_id)
+
+    def call(self, call_id: str) -> Optional[CallRecord]:
+        return self._by_call.get(call_id)
+
+    def chat_ids(self) -> List[int]:
+        return list(self._by_chat)
+
+    def user_ids(self) -> List[int]:
+        return list(self._by_user)
+
+    def records(self) -> List[CallRecord]:
+        """Snapshot of every registered call, safe to iterate while calls end."""
+        return [*self._by_chat.values(), *self._by_call.values()]
+
+    def count(self, kind: str, *states: str) -> int:
+        """Registered calls of a kind, in any of the given states or in all of them."""
+        if not states:
+            return len(self._by_chat) if kind == CallRecord.GROUP else len(self._by_call)
+        return sum(self._counts.get((kind, state), 0) for state in states)
+
+    def set_state(self, record: CallRecord, state: str):
+        registered = self.holds(record)
+        if registered:
+            self._count(record, -1)
+        record.state = state
+        record.updated_at = time.time()
+        if registered:
+            self._count(record, 1)
+
+    def hold_audio(self, record: CallRecord, audio_path: Optional[str], progressive: Any = None):
+        """Hand the audio a call plays to its record."""
+        if audio_path is None and progressive is None:
+            return
+        had_audio = record.audio_path is not None or record.progressive is not None
+        record.audio_path = audio_path
+        record.progressive = progressive
+        if not had_audio:
+            self.holding_audio += 1
+
+    def take_audio(self, record: CallRecord) -> Tuple[Optional[str], Any]:
+        """Take back the audio of a call for release; each call's audio is returned once."""
+        audio_path, progressive = record.audio_path, record.progressive
+        if audio_path is None and progressive is None:
+            return None, None
+        record.audio_path = record.progressive = None
+        self.holding_audio -= 1
+        return audio_path, progressive
+
+    def _count(self, record: CallRecord, delta: int):
+        key = (record.kind, record.state)
+        self._counts[key] = self._counts.get(key, 0) + delta
@@ -0,0 +1,113 @@
+"""Service configuration read from the environment."""
+
+import os
+from typing import List, Optional
+
+
+class ServiceConfig:
+    """
+    Settings for the voice chat service.
+
+    Plain attributes only, so a config can be handed to worker processes.
+    """
+
+    def __init__(self):
+        self.api_id: Optional[str] = None
+        self.api_hash: Optional[str] = None
+        self.session_strings: List[str] = []
+        self.grpc_port = 50053
+        self.audio_cache_dir = '/tmp/voice-chat-audio-cache'
+        self.audio_cache_max_mb = 512
+        self.audio_cache_revalidate_seconds = 300.0
+        self.audio_http_limit_per_host = 8
+        self.audio_http_keepalive_seconds = 60.0
+        self.audio_http_timeout_seconds = 30.0
+        self.audio_max_mb = 50
+        self.audio_pretranscode = True
+        self.audio_progressive_streaming = False
+        self.audio_stream_buffer_kb = 256
+        self.audio_fifo_dir: Optional[str] = None
+        self.batch_concurrency = 20
+        self.max_stream_seconds = 600.0
+        self.workers = 1
+        self.worker_base_port = self.grpc_port + 1
+        self.worker_load_report_seconds = 2.0
+        self.metrics_port = 9464
+        self.max_concurrent_joins = 50
+        self.max_concurrent_joins_per_session = 10
+        self.join_rate_per_session = 5.0
+        self.join_burst_per_session = 10
+        self.admission_max_wait_seconds = 120.0
+        self.retry_max_attempts = 4
+        self.retry_base_delay = 0.5
+        self.retry_max_delay = 15.0
+        self.retry_budget_seconds = 60.0
+        self.max_flood_wait_seconds = 60.0
+        self.prewarm_lead_seconds = 60.0
+        self.prewarm_hold_seconds = 300.0
+        self.queue_idle_seconds = 30.0
+        self.peer_cache_path = '/tmp/voice-chat-peers.json'
+        self.journal_path = '/tmp/voice-chat-journal.jsonl'
+        self.peer_cache_max_entries = 10000
+        self.peer_cache_ttl_seconds = 7 * 86400.0
+        self.group_call_cache_ttl_seconds = 600.0
+        self.call_event_buffer_size = 256
+        self.idempotency_ttl_seconds = 600.0
+        self.drain_timeout_seconds = 300.0
+
+    @classmethod
+    def from_env(cls) -> 'ServiceConfig':
+        """Build the configuration from environment variables."""
+        config = cls()
+        config.api_id = os.getenv('API_ID')
+        config.api_hash = os.getenv('API_HASH')
+        # Several accounts can share the call load; SESSION_STRINGS is comma-separated.
+        # An empty SESSION_STRINGS, as docker-compose passes by default, falls back to SESSION_STRING
+        config.session_strings = [
+            value.strip()
+            for value in (os.getenv('SESSION_STRINGS') or os.getenv('SESSION_STRING', '')).split(',')
+            if value.strip()
+        ]
+        config.grpc_port = int(os.getenv('VOICE_CHAT_GRPC_PORT', '50053'))
+        config.audio_cache_dir = os.getenv('AUDIO_CACHE_DIR', '/tmp/voice-chat-audio-cache')
+        config.audio_cache_max_mb = int(os.getenv('AUDIO_CACHE_MAX_MB', '512'))
+        config.audio_cache_revalidate_seconds = float(os.getenv('AUDIO_CACHE_REVALIDATE_SECONDS', '300'))
+        config.audio_http_limit_per_host = int(os.getenv('AUDIO_HTTP_LIMIT_PER_HOST', '8'))
+        config.audio_http_keepalive_seconds = float(os.getenv('AUDIO_HTTP_KEEPALIVE_SECONDS', '60'))
+        config.audio_http_timeout_seconds = float(os.getenv('AUDIO_HTTP_TIMEOUT_SECONDS', '30'))
+        config.audio_max_mb = int(os.getenv('AUDIO_MAX_MB', '50'))
+        config.audio_pretranscode = os.getenv('AUDIO_PRETRANSCODE', 'true').lower() == 'true'
+        config.audio_progressive_streaming = os.getenv('AUDIO_PROGRESSIVE_STREAMING', 'false').lower() == 'true'
+        config.audio_stream_buffer_kb = int(os.getenv('AUDIO_STREAM_BUFFER_KB', '256'))
+        config.audio_fifo_dir = os.getenv('AUDIO_FIFO_DIR') or None
+        config.batch_concurrency = int(os.getenv('BATCH_JOIN_CONCURRENCY', '20'))
+        config.max_stream_seconds = float(os.getenv('MAX_STREAM_SECONDS', '600'))
+        config.workers = int(os.getenv('VOICE_CHAT_WORKERS', '1'))
+        config.worker_base_port = int(os.getenv('VOICE_CHAT_WORKER_BASE_PORT', str(config.grpc_port + 1)))
+        config.worker_load_report_seconds = float(os.getenv('WORKER_LOAD_REPORT_SECONDS', '2'))
+        # 0 disables the metrics endpoint
+        config.metrics_port = int(os.getenv('METRICS_PORT', '9464'))
+        config.max_concurrent_joins = int(os.getenv('MAX_CONCURRENT_JOINS', '50'))
+        config.max_concurrent_joins_per_session = int(os.getenv('MAX_CONCURRENT_JOINS_PER_SESSION', '10'))
+        config.join_rate_per_session = float(os.getenv('JOIN_RATE_PER_SESSION', '5'))
+        config.join_burst_per_session = int(os.getenv('JOIN_BURST_PER_SESSION', '10'))
+        config.admission_max_wait_seconds = float(os.getenv('ADMISSION_MAX_WAIT_SECONDS', '120'))
+        config.retry_max_attempts = int(os.getenv('JOIN_RETRY_ATTEMPTS', '4'))
+        config.retry_base_delay = float(os.getenv('JOIN_RETRY_BASE_DELAY_SECONDS', '0.5'))
+        config.retry_max_delay = float(os.getenv('JOIN_RETRY_MAX_DELAY_SECONDS', '15'))
+        config.retry_budget_seconds = float(os.getenv('JOIN_RETRY_BUDGET_SECONDS', '60'))
+        config.max_flood_wait_seconds = float(os.getenv('MAX_FLOOD_WAIT_SECONDS', '60'))
+        config.prewarm_lead_seconds = float(os.getenv('PREWARM_LEAD_SECONDS', '60'))
+        config.prewarm_hold_seconds = float(os.getenv('PREWARM_HOLD_SECONDS', '300'))
+        config.queue_idle_seconds = float(os.getenv('QUEUE_IDLE_SECONDS', '30'))
+        # Empty keeps the peer cache in memory only
+        config.peer_cache_path = os.getenv('PEER_CACHE_PATH', '/tmp/voice-chat-peers.json')
+        # Empty disables the journal, so a restart recovers nothing
+        config.journal_path = os.getenv('JOURNAL_PATH', '/tmp/voice-chat-journal.jsonl')
+        config.peer_cache_max_entries = int(os.getenv('PEER_CACHE_MAX_ENTRIES', '10000'))
+        config.peer_cache_ttl_seconds = float(os.getenv('PEER_CACHE_TTL_SECONDS', '604800'))
+        config.group_call_cache_ttl_seconds = float(os.getenv('GROUP_CALL_CACHE_TTL_SECONDS', '600'))
+        config.call_event_buffer_size = int(os.getenv('CALL_EVENT_BUFFER_SIZE', '256'))
+        config.idempotency_ttl_seconds = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '600'))
+        config.drain_timeout_seconds = float(os.getenv('DRAIN_TIMEOUT_SECONDS', '300'))
+        return config
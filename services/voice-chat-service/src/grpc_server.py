@@ -2,7 +2,9 @@
 
 import asyncio
 import logging
-from concurrent import futures
+import signal
+import time
+from typing import Optional, Tuple
 import grpc
 from grpc import aio
 
@@ -14,10 +16,120 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'generated'))
 import voice_chat_pb2
 import voice_chat_pb2_grpc
 
+from admission import Priority
+from call_events import CallEvent
+from call_registry import CallRecord
+from metrics import MetricsInterceptor
 from voice_chat import VoiceChatManager
+from stream_jobs import StreamJob
 
 logger = logging.getLogger(__name__)
 
+# Seconds between progress updates sent by WatchStream
+WATCH_PROGRESS_INTERVAL = 5.0
+
+_STREAM_STATES = {
+    StreamJob.QUEUED: voice_chat_pb2.STREAM_QUEUED,
+    StreamJob.JOINING: voice_chat_pb2.STREAM_JOINING,
+    StreamJob.PLAYING: voice_chat_pb2.STREAM_PLAYING,
+    StreamJob.COMPLETED: voice_chat_pb2.STREAM_COMPLETED,
+    StreamJob.FAILED: voice_chat_pb2.STREAM_FAILED,
+    StreamJob.CANCELLED: voice_chat_pb2.STREAM_CANCELLED,
+}
+
+# StreamAzan reply for a stream that did not fail, by the state of its job
+_STREAM_STARTED_MESSAGES = {
+    StreamJob.PLAYING: "Started streaming azan",
+    StreamJob.QUEUED: "Queued behind the audio playing in the chat",
+}
+
+_EVENT_TYPES = {
+    CallEvent.JOINED: voice_chat_pb2.CALL_EVENT_JOINED,
+    CallEvent.PLAYING: voice_chat_pb2.CALL_EVENT_PLAYING,
+    CallEvent.ENDED: voice_chat_pb2.CALL_EVENT_ENDED,
+    CallEvent.FAILED: voice_chat_pb2.CALL_EVENT_FAILED,
+    CallEvent.AUTO_ENDED: voice_chat_pb2.CALL_EVENT_AUTO_ENDED,
+}
+
+_PRIORITIES = {
+    voice_chat_pb2.PRIORITY_AZAN: Priority.AZAN,
+    voice_chat_pb2.PRIORITY_REMINDER: Priority.REMINDER,
+    voice_chat_pb2.PRIORITY_TEST: Priority.TEST,
+    voice_chat_pb2.PRIORITY_PREWARM: Priority.PREWARM,
+}
+
+
+def _admission(request, context, default_priority: int) -> Tuple[int, Optional[float]]:
+    """
+    Read the admission priority and deadline of a request.
+
+    The deadline is the earlier of deadline_unix_ms and the gRPC deadline.
+    """
+    priority = _PRIORITIES.get(request.priority, default_priority)
+    deadline = request.deadline_unix_ms / 1000 if request.deadline_unix_ms > 0 else None
+    remaining = context.time_remaining() if context is not None else None
+    if remaining is not None:
+        rpc_deadline = time.time() + remaining
+        deadline = rpc_deadline if deadline is None else min(deadline, rpc_deadline)
+    return priority, deadline
+
+
+def _stream_status(job: StreamJob) -> voice_chat_pb2.StreamStatusResponse:
+    """Convert a stream job into its gRPC status message."""
+    return voice_chat_pb2.StreamStatusResponse(
+        success=True,
+        message=job.message,
+        job_id=job.job_id,
+        chat_id=job.chat_id,
+        state=_STREAM_STATES[job.state],
+        elapsed_seconds=job.elapsed_seconds,
+        updated_at_ms=int(job.updated_at * 1000)
+    )
+
+
+def _call_event(event: CallEvent, dropped: int) -> voice_chat_pb2.CallEvent:
+    """Convert a call event into its gRPC message."""
+    return voice_chat_pb2.CallEvent(
+        type=_EVENT_TYPES[event.kind],
+        chat_id=event.chat_id,
+        user_id=event.user_id,
+        job_id=event.job_id,
+        call_id=event.call_id,
+        message=event.message,
+        at_unix_ms=int(event.at * 1000),
+        dropped=dropped
+    )
+
+
+def _health_check(manager: VoiceChatManager) -> voice_chat_pb2.HealthCheckResponse:
+    """Snapshot the liveness, readiness, load and sessions of a manager."""
+    admission = manager.admission
+    live = manager.is_live()
+    return voice_chat_pb2.HealthCheckResponse(
+        healthy=live,
+        draining=manager.draining,
+        active_streams=manager.active_streams(),
+        drain_deadline_unix_ms=int(manager.drain_deadline * 1000) if manager.draining else 0,
+        live=live,
+        ready=manager.is_ready(),
+        group_calls=manager.calls.count(CallRecord.GROUP),
+        private_calls=manager.calls.count(CallRecord.PRIVATE),
+        admission_in_flight=admission.in_flight,
+        admission_queued=admission.queued,
+        admission_available=admission.available,
+        sessions=[
+            voice_chat_pb2.SessionHealth(
+                name=session.name,
+                connected=session.is_connected(),
+                calls=session.load,
+                admission_in_flight=admission.session_in_flight(session),
+                admission_queued=admission.session_queued(session),
+                flood_wait_until_unix_ms=int(session.flood_until * 1000) if session.is_flood_waited() else 0
+            )
+            for session in manager.sessions
+        ]
+    )
+
 
 class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
     """gRPC servicer for voice chat operations."""
@@ -26,24 +138,32 @@ class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
         self.voice_chat_manager = voice_chat_manager
 
     async def StreamAzan(self, request, context):
-        """Stream azan audio to a voice chat."""
+        """Start streaming azan audio to a voice chat."""
         try:
             logger.info(f"Received StreamAzan request for chat {request.chat_id}")
+            priority, deadline = _admission(request, context, Priority.AZAN)
 
-            success = await self.voice_chat_manager.stream_audio(
+            job = await self.voice_chat_manager.stream_audio(
                 request.chat_id,
-                request.audio_url
+                request.audio_url,
+                priority,
+                deadline,
+                request.idempotency_key or None
             )
 
-            if success:
+            if job.state != StreamJob.FAILED:
+                # A repeated idempotency key may get a job that has moved on since
+                message = _STREAM_STARTED_MESSAGES.get(job.state, f"Azan stream {job.state}: {job.message}")
                 return voice_chat_pb2.StreamAzanResponse(
                     success=True,
-                    message="Successfully streamed azan"
+                    message=message,
+                    job_id=job.job_id
                 )
             else:
                 return voice_chat_pb2.StreamAzanResponse(
                     success=False,
-                    message="Failed to stream azan"
+                    message=f"Failed to stream azan: {job.message}",
+                    job_id=job.job_id
                 )
 
         except Exception as e:
@@ -53,6 +173,81 @@ class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
                 message=f"Error: {str(e)}"
             )
 
+    async def StreamAzanBatch(self, request, context):
+        """Start streaming the same azan audio to many voice chats."""
+        try:
+            logger.info(f"Received StreamAzanBatch request for {len(request.chat_ids)} chats")
+            priority, deadline = _admission(request, context, Priority.AZAN)
+
+            jobs = await self.voice_chat_manager.stream_audio_batch(
+                list(request.chat_ids),
+                request.audio_url,
+                request.max_concurrency if request.max_concurrency > 0 else None,
+                priority,
+                deadline
+            )
+
+            results = [
+                voice_chat_pb2.ChatStreamResult(
+                    chat_id=chat_id,
+                    success=job.state != StreamJob.FAILED,
+                    message=job.message,
+                    job_id=job.job_id
+                )
+                for chat_id, job in jobs.items()
+            ]
+            succeeded = sum(1 for result in results if result.success)
+
+            return voice_chat_pb2.StreamAzanBatchResponse(
+                success=succeeded == len(results),
+                message=f"Started streaming azan in {succeeded}/{len(results)} chats",
+                results=results
+            )
+
+        except Exception as e:
+            logger.error(f"Error in StreamAzanBatch: {e}")
+            return voice_chat_pb2.StreamAzanBatchResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def GetStreamStatus(self, request, context):
+        """Return the current state of a stream job."""
+        job = self.voice_chat_manager.get_stream_job(request.job_id)
+        if job is None:
+            return voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Stream job {request.job_id} not found",
+                job_id=request.job_id
+            )
+        return _stream_status(job)
+
+    async def WatchStream(self, request, context):
+        """Send stream job updates until the stream finishes."""
+        job = self.voice_chat_manager.get_stream_job(request.job_id)
+        if job is None:
+            yield voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Stream job {request.job_id} not found",
+                job_id=request.job_id
+            )
+            return
+
+        while True:
+            version = job.version
+            yield _stream_status(job)
+            if job.finished:
+                return
+
+            # Report progress periodically even if the state does not change
+            try:
+                await asyncio.wait_for(
+                    job.wait_for_change(version),
+                    timeout=WATCH_PROGRESS_INTERVAL
+                )
+            except asyncio.TimeoutError:
+                pass
+
     async def StartVoiceChat(self, request, context):
         """Start a voice chat in a group."""
         try:
@@ -107,15 +302,122 @@ class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
                 message=f"Error: {str(e)}"
             )
 
+    async def EnqueueAudio(self, request, context):
+        """Queue audio clips to play in turn in a voice chat."""
+        try:
+            logger.info(f"Received EnqueueAudio request for {len(request.audio_urls)} clips in chat {request.chat_id}")
+            if not request.audio_urls:
+                return voice_chat_pb2.EnqueueAudioResponse(
+                    success=False,
+                    message="No audio to queue"
+                )
+            # Clips play long after the RPC returns, so its deadline does not apply
+            priority, deadline = _admission(request, None, Priority.AZAN)
+
+            jobs, ahead = self.voice_chat_manager.enqueue_audio(
+                request.chat_id,
+                list(request.audio_urls),
+                priority,
+                deadline
+            )
+
+            return voice_chat_pb2.EnqueueAudioResponse(
+                success=True,
+                message=f"Queued {len(jobs)} clips behind {ahead}",
+                job_ids=[job.job_id for job in jobs],
+                ahead=ahead
+            )
+
+        except Exception as e:
+            logger.error(f"Error in EnqueueAudio: {e}")
+            return voice_chat_pb2.EnqueueAudioResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def SkipAudio(self, request, context):
+        """Skip to the next queued clip in a voice chat."""
+        try:
+            logger.info(f"Received SkipAudio request for chat {request.chat_id}")
+
+            if self.voice_chat_manager.skip_audio(request.chat_id):
+                return voice_chat_pb2.SkipAudioResponse(
+                    success=True,
+                    message="Skipped clip"
+                )
+            else:
+                return voice_chat_pb2.SkipAudioResponse(
+                    success=False,
+                    message="No queued clip playing"
+                )
+
+        except Exception as e:
+            logger.error(f"Error in SkipAudio: {e}")
+            return voice_chat_pb2.SkipAudioResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def ClearQueue(self, request, context):
+        """Drop the clips waiting in a voice chat's queue."""
+        try:
+            logger.info(f"Received ClearQueue request for chat {request.chat_id}")
+
+            cleared = self.voice_chat_manager.clear_queue(request.chat_id)
+
+            return voice_chat_pb2.ClearQueueResponse(
+                success=True,
+                message=f"Cleared {cleared} clips",
+                cleared=cleared
+            )
+
+        except Exception as e:
+            logger.error(f"Error in ClearQueue: {e}")
+            return voice_chat_pb2.ClearQueueResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def PrepareBroadcast(self, request, context):
+        """Schedule joining group calls ahead of a broadcast."""
+        try:
+            logger.info(
+                f"Received PrepareBroadcast request for {len(request.chat_ids)} chats "
+                f"starting at {request.start_unix_ms}"
+            )
+
+            scheduled = self.voice_chat_manager.prepare_broadcast(
+                list(request.chat_ids),
+                request.start_unix_ms / 1000,
+                request.lead_seconds if request.lead_seconds > 0 else None
+            )
+
+            return voice_chat_pb2.PrepareBroadcastResponse(
+                success=True,
+                message=f"Scheduled {scheduled}/{len(request.chat_ids)} chats for pre-warming",
+                scheduled=scheduled
+            )
+
+        except Exception as e:
+            logger.error(f"Error in PrepareBroadcast: {e}")
+            return voice_chat_pb2.PrepareBroadcastResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
     async def StartCall(self, request, context):
         """Start a 1-on-1 call with a user."""
         try:
             logger.info(f"Received StartCall request for user {request.user_id}")
+            priority, deadline = _admission(request, context, Priority.REMINDER)
 
             success, call_id = await self.voice_chat_manager.start_call(
                 request.user_id,
                 request.audio_url,
-                request.duration_seconds if request.duration_seconds > 0 else 180
+                request.duration_seconds if request.duration_seconds > 0 else 180,
+                priority,
+                deadline,
+                request.idempotency_key or None
             )
 
             if success:
@@ -139,6 +441,40 @@ class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
                 call_id=""
             )
 
+    async def StartCallBatch(self, request, context):
+        """Call many users with the same audio, sending each result as it is known."""
+        reported = set()
+        try:
+            logger.info(f"Received StartCallBatch request for {len(request.user_ids)} users")
+            priority, deadline = _admission(request, context, Priority.REMINDER)
+
+            async for user_id, call_id, message in self.voice_chat_manager.start_call_batch(
+                list(request.user_ids),
+                request.audio_url,
+                request.duration_seconds if request.duration_seconds > 0 else 180,
+                request.max_concurrency if request.max_concurrency > 0 else None,
+                priority,
+                deadline,
+                dict(request.idempotency_keys)
+            ):
+                reported.add(user_id)
+                yield voice_chat_pb2.UserCallResult(
+                    user_id=user_id,
+                    success=bool(call_id),
+                    message=message,
+                    call_id=call_id
+                )
+
+        except Exception as e:
+            logger.error(f"Error in StartCallBatch: {e}")
+            for user_id in dict.fromkeys(request.user_ids):
+                if user_id not in reported:
+                    yield voice_chat_pb2.UserCallResult(
+                        user_id=user_id,
+                        success=False,
+                        message=f"Error: {str(e)}"
+                    )
+
     async def EndCall(self, request, context):
         """End an active 1-on-1 call."""
         try:
@@ -164,27 +500,83 @@ class VoiceChatServicer(voice_chat_pb2_grpc.VoiceChatServiceServicer):
                 message=f"Error: {str(e)}"
             )
 
+    async def SubscribeCallEvents(self, request, context):
+        """Send call lifecycle events until the client goes away."""
+        events = self.voice_chat_manager.events
+        subscription = events.subscribe(
+            request.chat_ids,
+            request.buffer_size if request.buffer_size > 0 else None
+        )
+        try:
+            while True:
+                item = await subscription.get()
+                if item is None:
+                    return
+                yield _call_event(*item)
+        finally:
+            events.unsubscribe(subscription)
+
     async def HealthCheck(self, request, context):
-        """Health check endpoint."""
-        return voice_chat_pb2.HealthCheckResponse(healthy=True)
+        """Report liveness, readiness, load and session state, and drain progress while shutting down."""
+        return _health_check(self.voice_chat_manager)
 
 
-async def serve(voice_chat_manager: VoiceChatManager, port: int = 50053):
-    """Start the gRPC server."""
-    server = aio.server()
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+async def wait_for_shutdown_signal() -> str:
+    """
+    Wait until the process is sent SIGTERM, as on docker stop, or SIGINT, as on Ctrl-C.
+
+    Returns the name of the signal. Only the first signal is handled here;
+    a second one stops the process at once.
+    """
+    loop = asyncio.get_running_loop()
+    received = loop.create_future()
+
+    def handle(sig: signal.Signals):
+        if not received.done():
+            received.set_result(sig.name)
+
+    for sig in SHUTDOWN_SIGNALS:
+        loop.add_signal_handler(sig, handle, sig)
+    try:
+        return await received
+    finally:
+        for sig in SHUTDOWN_SIGNALS:
+            loop.remove_signal_handler(sig)
+
+
+async def serve(
+    voice_chat_manager: VoiceChatManager,
+    port: int = 50053,
+    host: str = '0.0.0.0',
+    drain_timeout: float = 300.0,
+):
+    """
+    Start the gRPC server and serve until shutdown.
+
+    On SIGTERM or SIGINT the manager drains for up to drain_timeout seconds while
+    the server keeps answering, so HealthCheck reports the progress and
+    streams in flight can still be followed. The server is stopped
+    afterwards; tearing down the remaining calls is up to the caller.
+    """
+    server = aio.server(interceptors=[MetricsInterceptor()])
     voice_chat_pb2_grpc.add_VoiceChatServiceServicer_to_server(
         VoiceChatServicer(voice_chat_manager),
         server
     )
 
-    listen_addr = f'0.0.0.0:{port}'
+    listen_addr = f'{host}:{port}'
     server.add_insecure_port(listen_addr)
 
     logger.info(f"Starting gRPC server on {listen_addr}")
     await server.start()
 
     try:
-        await server.wait_for_termination()
-    except KeyboardInterrupt:
+        signal_name = await wait_for_shutdown_signal()
+        logger.info(f"Received {signal_name}, draining before shutdown")
+        await voice_chat_manager.drain(drain_timeout)
+    finally:
         logger.info("Shutting down gRPC server")
         await server.stop(5)
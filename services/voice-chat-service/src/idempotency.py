@@ -0,0 +1,91 @@
+"""Locks and idempotency keys serializing concurrent requests for the same chat."""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from timer_wheel import TimerWheel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class KeyedLocks:
+    """
+    One asyncio lock per key, created on first use.
+
+    A lock is dropped again once nobody holds or waits for it, so keys
+    seen once do not accumulate. Waiters are served in arrival order.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, List[Any]] = {}  # key -> [lock, holders and waiters]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def locked(self, key: Hashable) -> bool:
+        entry = self._locks.get(key)
+        return entry is not None and entry[0].locked()
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+
+class OperationCache:
+    """
+    Runs each keyed operation once and hands its result to duplicate requests.
+
+    A request carrying the key of an operation still in flight waits for
+    that operation instead of starting it again; one arriving after it
+    succeeded gets the same result for ttl_seconds. Failed operations are
+    forgotten as soon as they finish, so a retry after a failure tries again.
+    """
+
+    def __init__(self, timer_wheel: TimerWheel, ttl_seconds: float = 600.0):
+        self.timer_wheel = timer_wheel
+        self.ttl_seconds = ttl_seconds
+        self._operations: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    async def run(
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[T]],
+        succeeded: Callable[[T], bool] = lambda result: True,
+    ) -> T:
+        """Run operation under key, or wait for the run already started under it."""
+        future = self._operations.get(key)
+        if future is not None:
+            logger.info(f"Attaching duplicate request {key} to the operation in flight")
+        else:
+            future = asyncio.ensure_future(operation())
+            self._operations[key] = future
+            future.add_done_callback(lambda done: self._settle(key, done, succeeded))
+        # A caller going away must not cancel the operation for the others
+        return await asyncio.shield(future)
+
+    def _settle(self, key: Hashable, future: asyncio.Future, succeeded: Callable[[Any], bool]):
+        if future.cancelled() or future.exception() is not None or not succeeded(future.result()):
+            self._forget(key, future)
+        else:
+            self.timer_wheel.schedule(self.ttl_seconds, lambda: self._forget(key, future))
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._operations.get(key) is future:
+            del self._operations[key]
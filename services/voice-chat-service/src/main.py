@@ -2,14 +2,12 @@
 
 import asyncio
 import logging
-import os
-import struct
 import sys
 from dotenv import load_dotenv
-from pyrogram import Client
 
-from voice_chat import VoiceChatManager
-from grpc_server import serve
+from config import ServiceConfig
+from service import run_service
+from supervisor import Supervisor
 
 # Configure logging
 logging.basicConfig(
@@ -29,71 +27,28 @@ async def main():
     load_dotenv()
 
     # Get configuration from environment
-    api_id = os.getenv('API_ID')
-    api_hash = os.getenv('API_HASH')
-    session_string = os.getenv('SESSION_STRING')
-    grpc_port = int(os.getenv('VOICE_CHAT_GRPC_PORT', '50053'))
+    config = ServiceConfig.from_env()
 
-    if not all([api_id, api_hash]):
+    if not all([config.api_id, config.api_hash]):
         logger.error("Missing required environment variables: API_ID, API_HASH")
         sys.exit(1)
 
-    if not session_string:
-        logger.error("Missing SESSION_STRING environment variable")
+    if not config.session_strings:
+        logger.error("Missing SESSION_STRING (or SESSION_STRINGS) environment variable")
         logger.error("Run 'python generate_session.py' to create a session string")
         sys.exit(1)
 
-    logger.info("Initializing Pyrogram client with user session...")
-
-    # Initialize Pyrogram client with user session (not bot token!)
-    # This avoids conflicts with the main bot and provides better voice chat support
-    app = Client(
-        name="voice_chat_user",
-        api_id=int(api_id),
-        api_hash=api_hash,
-        session_string=session_string,
-        workdir="/tmp"
-    )
-    logger.info(f"app_id: {api_id}")
-    logger.info(f"app_hash: {api_hash}")
-    logger.info(f"session_string: {session_string}")
-    # Initialize voice chat manager
-    voice_chat_manager = VoiceChatManager(app)
-
-    try:
-        # Start Pyrogram client
-        logger.info("Starting Pyrogram client...")
-        try:
-            await app.start()
-        except struct.error as e:
-            logger.error("Session string is corrupted or incompatible with current Pyrogram version")
-            logger.error("Please regenerate the session string by running:")
-            logger.error("  cd services/voice-chat-service && python generate_session.py")
-            sys.exit(1)
-        logger.info("Pyrogram client started")
-
-        # Start PyTgCalls
-        logger.info("Starting PyTgCalls...")
-        await voice_chat_manager.start()
-        logger.info("PyTgCalls started")
-
-        # Start gRPC server
-        logger.info(f"Starting gRPC server on port {grpc_port}...")
-        await serve(voice_chat_manager, grpc_port)
-
-    except KeyboardInterrupt:
-        logger.info("Received shutdown signal")
-    except Exception as e:
-        logger.error(f"Error in main: {e}", exc_info=True)
-    finally:
-        # Cleanup
-        logger.info("Shutting down...")
-        try:
-            await voice_chat_manager.stop()
-            await app.stop()
-            logger.info("Shutdown complete")
-        except Exception as e:
-            logger.error(f"Error during shutdown: {e}")
+    if config.workers > 1:
+        # Spread calls over worker processes behind a gRPC router
+        logger.info(f"Starting supervisor with {config.workers} workers...")
+        await Supervisor(config).run()
+    else:
+        await run_service(
+            config,
+            config.session_strings,
+            config.grpc_port,
+            metrics_port=config.metrics_port
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""Prometheus metrics of the voice chat service and the endpoint serving them."""
+
+import logging
+import time
+
+import grpc
+from grpc import aio
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+# Joins, downloads and admission waits run well past the client's default top bucket of 10s
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Voice chat metrics
+DOWNLOAD_SECONDS = Histogram(
+    'voice_chat_audio_download_seconds',
+    'Time to obtain audio for a URL, by cache result',
+    ['result'],
+    buckets=BUCKETS,
+)
+JOIN_SECONDS = Histogram(
+    'voice_chat_join_seconds',
+    'Time to join a group voice chat, by outcome',
+    ['outcome'],
+    buckets=BUCKETS,
+)
+TIME_TO_FIRST_AUDIO_SECONDS = Histogram(
+    'voice_chat_time_to_first_audio_seconds',
+    'Time from request to audio playing, by call kind',
+    ['kind'],
+    buckets=BUCKETS,
+)
+ERRORS = Counter(
+    'voice_chat_errors_total',
+    'Telegram and pytgcalls errors handled, by type',
+    ['type'],
+)
+for _error_type in ('AlreadyJoinedError', 'NoActiveGroupCall', 'FloodWait'):
+    ERRORS.labels(_error_type)
+RETRIES = Counter(
+    'voice_chat_retries_total',
+    'Join and call attempts retried, by reason',
+    ['reason'],
+)
+RETRIES_EXHAUSTED = Counter(
+    'voice_chat_retries_exhausted_total',
+    'Joins and calls given up after their retry budget ran out, by last reason',
+    ['reason'],
+)
+PREWARM = Counter(
+    'voice_chat_prewarm_total',
+    'Group calls joined ahead of a broadcast, by outcome',
+    ['outcome'],
+)
+RECOVERED = Counter(
+    'voice_chat_recovered_total',
+    'Work the journal of the previous run left open, by kind and how it was settled',
+    ['kind', 'outcome'],
+)
+PEER_CACHE_LOOKUPS = Counter(
+    'voice_chat_peer_cache_lookups_total',
+    'Peer and group call state lookups, by kind and cache result',
+    ['kind', 'result'],
+)
+CALL_EVENTS_DROPPED = Counter(
+    'voice_chat_call_events_dropped_total',
+    'Call events dropped because a subscriber fell behind',
+)
+CALL_EVENT_SUBSCRIBERS = Gauge('voice_chat_call_event_subscribers', 'Open SubscribeCallEvents streams')
+ACTIVE_CALLS = Gauge('voice_chat_active_calls', 'Group voice chats currently joined')
+ACTIVE_PRIVATE_CALLS = Gauge('voice_chat_active_private_calls', 'Private calls in progress')
+TEMP_FILES = Gauge('voice_chat_temp_files', 'Calls holding cached or downloading audio')
+ADMISSION_WAIT_SECONDS = Histogram(
+    'voice_chat_admission_wait_seconds',
+    'Time joins and calls waited for admission, by priority',
+    ['priority'],
+    buckets=BUCKETS,
+)
+ADMISSION_SHED = Counter(
+    'voice_chat_admission_shed_total',
+    'Joins and calls dropped because their deadline passed, by priority',
+    ['priority'],
+)
+ADMISSION_QUEUED = Gauge('voice_chat_admission_queued', 'Joins and calls waiting for admission')
+ADMISSION_IN_FLIGHT = Gauge('voice_chat_admission_in_flight', 'Joins and calls currently admitted')
+GRPC_REQUEST_SECONDS = Histogram(
+    'voice_chat_grpc_request_seconds',
+    'gRPC request handling time, by method',
+    ['method'],
+    buckets=BUCKETS,
+)
+
+
+class MetricsInterceptor(aio.ServerInterceptor):
+    """Server interceptor recording the handling time of every gRPC method."""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        histogram = GRPC_REQUEST_SECONDS.labels(method)
+
+        if handler.unary_unary is not None:
+            behavior = handler.unary_unary
+
+            async def unary_unary(request, context):
+                start = time.perf_counter()
+                try:
+                    return await behavior(request, context)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        if handler.unary_stream is not None:
+            behavior = handler.unary_stream
+
+            async def unary_stream(request, context):
+                start = time.perf_counter()
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream,
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer,
+            )
+
+        return handler
+
+
+async def start_metrics_server(
+    port: int,
+    host: str = '0.0.0.0',
+    registry: CollectorRegistry = REGISTRY,
+) -> web.AppRunner:
+    """Serve the registry on http://host:port/metrics; stop it with runner.cleanup()."""
+    async def handle_metrics(request):
+        return web.Response(body=generate_latest(registry), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
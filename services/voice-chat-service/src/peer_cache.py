@@ -0,0 +1,231 @@
+"""Cache of resolved peers and group-call state that survives restarts."""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pyrogram.raw
+from pyrogram import Client, utils
+from pyrogram.handlers import RawUpdateHandler
+from pyrogram.storage.sqlite_storage import get_input_peer
+
+from metrics import PEER_CACHE_LOOKUPS
+from timer_wheel import Timer, TimerWheel
+
+logger = logging.getLogger(__name__)
+
+# Seconds between a change and writing the cache to disk
+SAVE_DELAY_SECONDS = 60.0
+
+# Pyrogram only runs the first matching handler of each group, and pytgcalls
+# takes the default group 0 for its own raw update handler
+UPDATE_HANDLER_GROUP = 1
+
+
+def account_key(client: Client) -> str:
+    """Identify the account behind a client; peers are only valid for the account that resolved them."""
+    me = getattr(client, 'me', None)
+    return str(me.id) if me is not None else client.name
+
+
+class PeerCache:
+    """
+    Bounded TTL cache of input peers and whether chats have a group call.
+
+    Input peers are cached per account, since access hashes differ between
+    accounts. They are written to disk and fed back into each client's
+    Pyrogram storage on start, so neither this service nor pytgcalls has to
+    resolve a known chat again after a restart. Group-call state records
+    whether a chat was last seen with or without an active voice chat, so
+    a join to a chat known to have none starts the voice chat first instead
+    of failing once. Raw updates about group calls and channels keep both
+    up to date. Entries expire after their TTL and the least recently used
+    ones are dropped beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        timer_wheel: TimerWheel,
+        path: Optional[str] = None,
+        max_entries: int = 10000,
+        peer_ttl: float = 7 * 86400.0,
+        group_call_ttl: float = 600.0,
+    ):
+        self.timer_wheel = timer_wheel
+        self.path = path
+        self.max_entries = max_entries
+        self.peer_ttl = peer_ttl
+        self.group_call_ttl = group_call_ttl
+
+        # (account, chat_id) -> (access_hash, peer type, expires_at)
+        self._peers: "OrderedDict[Tuple[str, int], Tuple[int, str, float]]" = OrderedDict()
+        # chat_id -> (has active group call, expires_at)
+        self._group_calls: "OrderedDict[int, Tuple[bool, float]]" = OrderedDict()
+        self._save_timer: Optional[Timer] = None
+
+        self._load()
+
+    async def resolve(self, client: Client, chat_id: int):
+        """Return the input peer of chat_id for a client, resolving it only on a miss."""
+        key = (account_key(client), chat_id)
+        entry = self._peers.get(key)
+        if entry is not None and entry[2] > time.time():
+            self._peers.move_to_end(key)
+            PEER_CACHE_LOOKUPS.labels('peer', 'hit').inc()
+            return get_input_peer(chat_id, entry[0], entry[1])
+
+        PEER_CACHE_LOOKUPS.labels('peer', 'miss').inc()
+        peer = await client.resolve_peer(chat_id)
+        self.remember_peer(client, chat_id, peer)
+        return peer
+
+    def remember_peer(self, client: Client, chat_id: int, peer):
+        """Record an input peer a client resolved."""
+        if isinstance(peer, pyrogram.raw.types.InputPeerChannel):
+            access_hash, peer_type = peer.access_hash, 'supergroup'
+        elif isinstance(peer, pyrogram.raw.types.InputPeerChat):
+            access_hash, peer_type = 0, 'group'
+        elif isinstance(peer, pyrogram.raw.types.InputPeerUser):
+            access_hash, peer_type = peer.access_hash, 'user'
+        else:
+            return
+
+        key = (account_key(client), chat_id)
+        self._peers[key] = (access_hash, peer_type, time.time() + self.peer_ttl)
+        self._peers.move_to_end(key)
+        self._trim(self._peers)
+        self._schedule_save()
+
+    def forget_peer(self, chat_id: int, client: Optional[Client] = None):
+        """Drop the cached peer of chat_id for one client's account, or for every account."""
+        if client is not None:
+            removed = self._peers.pop((account_key(client), chat_id), None) is not None
+        else:
+            keys = [key for key in self._peers if key[1] == chat_id]
+            for key in keys:
+                del self._peers[key]
+            removed = bool(keys)
+        if removed:
+            self._schedule_save()
+
+    async def seed(self, client: Client):
+        """Load the cached peers of a client's account into its Pyrogram storage."""
+        account = account_key(client)
+        now = time.time()
+        peers = [
+            (chat_id, access_hash, peer_type, None, None)
+            for (key_account, chat_id), (access_hash, peer_type, expires_at) in self._peers.items()
+            if key_account == account and expires_at > now
+        ]
+        if not peers:
+            return
+        try:
+            await client.storage.update_peers(peers)
+            logger.info(f"Seeded {len(peers)} cached peers into {client.name}")
+        except Exception as e:
+            logger.warning(f"Failed to seed cached peers into {client.name}: {e}")
+
+    def has_group_call(self, chat_id: int) -> Optional[bool]:
+        """Whether chat_id was last seen with an active group call; None if not known."""
+        entry = self._group_calls.get(chat_id)
+        if entry is not None and entry[1] <= time.time():
+            del self._group_calls[chat_id]
+            entry = None
+        PEER_CACHE_LOOKUPS.labels('group_call', 'miss' if entry is None else 'hit').inc()
+        return None if entry is None else entry[0]
+
+    def set_group_call(self, chat_id: int, active: bool):
+        """Record whether chat_id has an active group call."""
+        self._group_calls[chat_id] = (active, time.time() + self.group_call_ttl)
+        self._group_calls.move_to_end(chat_id)
+        self._trim(self._group_calls)
+        self._schedule_save()
+
+    def forget_group_call(self, chat_id: int):
+        if self._group_calls.pop(chat_id, None) is not None:
+            self._schedule_save()
+
+    def watch(self, client: Client):
+        """Keep the cache in line with the raw updates a client receives."""
+        client.add_handler(RawUpdateHandler(self.on_raw_update), group=UPDATE_HANDLER_GROUP)
+
+    async def on_raw_update(self, client: Client, update, users, chats):
+        """Pyrogram raw update handler keeping cached state in line with Telegram."""
+        if isinstance(update, pyrogram.raw.types.UpdateGroupCall):
+            active = not isinstance(update.call, pyrogram.raw.types.GroupCallDiscarded)
+            # The update carries the bare ID of either a basic group or a channel
+            for chat_id in (-update.chat_id, _channel_peer_id(update.chat_id)):
+                if chat_id in self._group_calls:
+                    self.set_group_call(chat_id, active)
+        elif isinstance(update, pyrogram.raw.types.UpdateChannel):
+            # Membership or access changed; resolve the channel again next time
+            chat_id = _channel_peer_id(update.channel_id)
+            self.forget_peer(chat_id, client)
+            self.forget_group_call(chat_id)
+
+    def save(self):
+        """Write the cache to disk atomically, if it has a path."""
+        self.timer_wheel.cancel(self._save_timer)
+        self._save_timer = None
+        if not self.path:
+            return
+
+        now = time.time()
+        data = {
+            'peers': [
+                [account, chat_id, access_hash, peer_type, expires_at]
+                for (account, chat_id), (access_hash, peer_type, expires_at) in self._peers.items()
+                if expires_at > now
+            ],
+            'group_calls': [
+                [chat_id, active, expires_at]
+                for chat_id, (active, expires_at) in self._group_calls.items()
+                if expires_at > now
+            ],
+        }
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to save peer cache: {e}")
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable peer cache: {e}")
+            return
+
+        now = time.time()
+        for account, chat_id, access_hash, peer_type, expires_at in data.get('peers', []):
+            if expires_at > now:
+                self._peers[(account, chat_id)] = (access_hash, peer_type, expires_at)
+        for chat_id, active, expires_at in data.get('group_calls', []):
+            if expires_at > now:
+                self._group_calls[chat_id] = (active, expires_at)
+        self._trim(self._peers)
+        self._trim(self._group_calls)
+        logger.info(
+            f"Peer cache loaded from {self.path}: "
+            f"{len(self._peers)} peers, {len(self._group_calls)} group calls"
+        )
+
+    def _trim(self, entries: OrderedDict):
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _schedule_save(self):
+        if self.path and self._save_timer is None:
+            self._save_timer = self.timer_wheel.schedule(SAVE_DELAY_SECONDS, self.save)
+
+
+def _channel_peer_id(channel_id: int) -> int:
+    return utils.get_peer_id(pyrogram.raw.types.PeerChannel(channel_id=channel_id))
@@ -0,0 +1,78 @@
+"""Per-chat queues of audio clips played one after another in the same group call."""
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from stream_jobs import StreamJob
+
+
+class QueuedClip:
+    """A clip waiting for its turn, with the admission terms of its request."""
+
+    __slots__ = ('job', 'priority', 'deadline')
+
+    def __init__(self, job: StreamJob, priority: int, deadline: Optional[float]):
+        self.job = job
+        self.priority = priority
+        self.deadline = deadline
+
+
+class PlaybackQueue:
+    """
+    Clips queued for one chat and the task playing them.
+
+    The player takes clips in order; current is the clip it started last,
+    until the queue has played out.
+    """
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.clips: Deque[QueuedClip] = deque()
+        self.current: Optional[StreamJob] = None
+        self.player: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.clips)
+
+    def clear(self, message: str) -> List[StreamJob]:
+        """Cancel every clip still waiting; returns their jobs."""
+        cleared = []
+        while self.clips:
+            job = self.clips.popleft().job
+            job.update(StreamJob.CANCELLED, message)
+            cleared.append(job)
+        return cleared
+
+
+class PlaybackQueues:
+    """The playback queues of all chats, each dropped once it has played out."""
+
+    def __init__(self):
+        self._queues: Dict[int, PlaybackQueue] = {}
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._queues
+
+    def get(self, chat_id: int) -> Optional[PlaybackQueue]:
+        return self._queues.get(chat_id)
+
+    def open(self, chat_id: int) -> PlaybackQueue:
+        """The chat's queue, created if it has none."""
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = PlaybackQueue(chat_id)
+        return queue
+
+    def close(self, queue: PlaybackQueue):
+        if self._queues.get(queue.chat_id) is queue:
+            del self._queues[queue.chat_id]
+
+    def chat_ids(self) -> List[int]:
+        return list(self._queues)
+
+    def queues(self) -> List[PlaybackQueue]:
+        return list(self._queues.values())
@@ -0,0 +1,178 @@
+"""Playback of audio while it is still downloading."""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+from pytgcalls.types import HighQualityAudio, InputAudioStream, InputStream
+
+from audio_transcoder import PCM_CHANNELS, PCM_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 16 * 1024
+
+
+class ProgressiveAudio:
+    """
+    Audio decoded from an HTTP response while it downloads.
+
+    The response body is written into ffmpeg, which decodes it to raw PCM
+    into a FIFO that pytgcalls reads like a PCM file. Playback starts as
+    soon as ffmpeg has the first few kilobytes. At most buffer_bytes are
+    queued for ffmpeg; beyond that the download waits, so it runs only a
+    little ahead of what the call plays.
+
+    With a copy_path, the body is also written there as it arrives, so the
+    finished download can go into the audio cache. download_done is set
+    once the download has ended either way; copy_digest is only set when
+    the copy is complete.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        fifo_path: str,
+        buffer_bytes: int = 256 * 1024,
+        max_bytes: int = 50 * 1024 * 1024,
+        sample_rate: int = PCM_SAMPLE_RATE,
+        copy_path: Optional[str] = None,
+    ):
+        self.url = url
+        self.path = fifo_path
+        self.buffer_bytes = buffer_bytes
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.bytes_received = 0
+        self.error: Optional[Exception] = None
+        self.copy_path = copy_path
+        self.copy_digest: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.download_done = asyncio.Event()
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._pump: Optional[asyncio.Task] = None
+
+    @property
+    def stream(self) -> InputStream:
+        """The pytgcalls input stream playing this audio."""
+        return InputStream(InputAudioStream(self.path, HighQualityAudio()))
+
+    async def open(self, session: aiohttp.ClientSession, timeout: aiohttp.ClientTimeout):
+        """
+        Request the audio and start decoding it in the background.
+
+        Returns once the response headers have arrived.
+
+        Raises:
+            Exception: If the audio cannot be requested or is too large
+        """
+        response = await session.get(self.url, timeout=timeout)
+        try:
+            if response.status != 200:
+                raise Exception(f"Failed to download audio: HTTP {response.status}")
+            if response.content_length and response.content_length > self.max_bytes:
+                raise Exception(
+                    f"Audio too large: {response.content_length} bytes "
+                    f"(limit {self.max_bytes})"
+                )
+            self.etag = response.headers.get('ETag')
+            self.last_modified = response.headers.get('Last-Modified')
+
+            os.mkfifo(self.path)
+            self._process = await asyncio.create_subprocess_exec(
+                'ffmpeg',
+                '-y',
+                '-v', 'error',
+                '-i', 'pipe:0',
+                '-f', 's16le',
+                '-ac', str(PCM_CHANNELS),
+                '-ar', str(self.sample_rate),
+                self.path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            self._process.stdin.transport.set_write_buffer_limits(high=self.buffer_bytes)
+        except Exception:
+            response.release()
+            self.close()
+            raise
+
+        self._pump = asyncio.create_task(self._run(response))
+
+    async def _run(self, response: aiohttp.ClientResponse):
+        """Copy the response body into ffmpeg until it ends."""
+        process = self._process
+        copy = open(self.copy_path, 'wb') if self.copy_path else None
+        sha = hashlib.sha256()
+        try:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                self.bytes_received += len(chunk)
+                if self.bytes_received > self.max_bytes:
+                    raise Exception(f"Audio exceeded size limit of {self.max_bytes} bytes")
+                if copy is not None:
+                    sha.update(chunk)
+                    copy.write(chunk)
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+            process.stdin.close()
+            if copy is not None:
+                copy.close()
+                self.copy_digest = sha.hexdigest()
+            self.download_done.set()
+
+            # ffmpeg exits once the call has read everything it decoded
+            stderr = await process.stderr.read()
+            await process.wait()
+            if process.returncode != 0:
+                raise RuntimeError(
+                    f"ffmpeg exited with {process.returncode}: "
+                    f"{stderr.decode(errors='replace').strip()}"
+                )
+            logger.info(f"Streamed {self.bytes_received} bytes of audio from {self.url}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Progressive download of {self.url} failed: {e}")
+            self.error = e
+            self.close()
+        finally:
+            if copy is not None:
+                copy.close()
+            self._end_download()
+            response.release()
+
+    def _end_download(self):
+        """Mark the download as over, dropping the copy unless it is complete."""
+        if self.copy_path is not None and self.copy_digest is None:
+            try:
+                os.remove(self.copy_path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to remove {self.copy_path}: {e}")
+        self.download_done.set()
+
+    def close(self):
+        """Stop the download and ffmpeg and remove the FIFO."""
+        if self._pump is not None and self._pump is not asyncio.current_task():
+            self._pump.cancel()
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+        if self._pump is None:
+            self._end_download()
+        try:
+            # A reader still waiting for ffmpeg to open the FIFO sees its end instead
+            os.close(os.open(self.path, os.O_WRONLY | os.O_NONBLOCK))
+        except OSError:
+            pass
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to remove {self.path}: {e}")
@@ -0,0 +1,89 @@
+"""Retry decisions for joins and calls: jittered backoff and per-chat budgets."""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+from pyrogram.errors import InternalServerError, ServiceUnavailable
+from pytgcalls.exceptions import TelegramServerError
+
+# Failures worth another attempt: the network or Telegram had a bad moment
+TRANSIENT_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    InternalServerError,
+    ServiceUnavailable,
+    TelegramServerError,
+)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an error is a network or server hiccup rather than a refusal."""
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+class RetryPolicy:
+    """
+    How hard a join or call is retried before it is given up.
+
+    Every chat gets its own budget: a number of attempts and a time limit
+    that never extends past the chat's deadline. Backoff is exponential with
+    jitter, so chats that failed together do not retry together. FloodWaits
+    are not backed off; the caller pauses the session for the time Telegram
+    asked for and the retry only goes ahead if that wait fits the budget.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 15.0,
+        budget_seconds: float = 60.0,
+        max_flood_wait_seconds: float = 60.0,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_seconds = budget_seconds
+        self.max_flood_wait_seconds = max_flood_wait_seconds
+
+    def budget(self, deadline: Optional[float] = None) -> 'RetryBudget':
+        """Start the retry budget of one chat; deadline is a Unix time."""
+        return RetryBudget(self, deadline)
+
+    def backoff_delay(self, retry: int) -> float:
+        """Delay before the given retry (1 for the first), with equal jitter."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class RetryBudget:
+    """Attempts and time left for retrying one chat."""
+
+    __slots__ = ('policy', 'attempts', 'deadline')
+
+    def __init__(self, policy: RetryPolicy, deadline: Optional[float] = None):
+        self.policy = policy
+        self.attempts = 1
+        limit = time.time() + policy.budget_seconds
+        self.deadline = limit if deadline is None else min(deadline, limit)
+
+    def backoff(self) -> Optional[float]:
+        """Take a retry and return how long to sleep first, or None if the budget is spent."""
+        if self.attempts >= self.policy.max_attempts:
+            return None
+        delay = self.policy.backoff_delay(self.attempts)
+        if time.time() + delay > self.deadline:
+            return None
+        self.attempts += 1
+        return delay
+
+    def wait(self, seconds: float) -> bool:
+        """Take a retry that first has to wait out a FloodWait; False if it does not fit."""
+        if self.attempts >= self.policy.max_attempts:
+            return False
+        if seconds > self.policy.max_flood_wait_seconds or time.time() + seconds > self.deadline:
+            return False
+        self.attempts += 1
+        return True
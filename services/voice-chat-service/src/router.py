@@ -0,0 +1,642 @@
+"""Front gRPC server that routes calls to voice chat worker processes."""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import grpc
+from grpc import aio
+
+import voice_chat_pb2
+import voice_chat_pb2_grpc
+
+from call_events import DEFAULT_BUFFER_SIZE, EventSubscription
+from grpc_server import wait_for_shutdown_signal
+from metrics import MetricsInterceptor
+
+logger = logging.getLogger(__name__)
+
+# Job and call IDs remembered for routing follow-up requests
+MAX_ROUTED_IDS = 100_000
+
+# Delay before resubscribing to the call events of a worker that went away,
+# doubled up to the maximum while resubscribing keeps failing
+EVENT_RESUBSCRIBE_SECONDS = 1.0
+MAX_EVENT_RESUBSCRIBE_SECONDS = 30.0
+
+# How long HealthCheck waits for each worker's health
+WORKER_HEALTH_TIMEOUT_SECONDS = 2.0
+
+
+class WorkerHandle:
+    """Router-side view of one worker process: its address and reported load."""
+
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.name = f"worker-{index}"
+        self.port = port
+        self.address = f"127.0.0.1:{port}"
+        self.chats: Set[int] = set()  # chats and users with a call, as last reported
+        self.pending: Dict[int, float] = {}  # dispatched since, until a report covers them
+        self.streams = 0
+        self.accepting = True  # ready for new calls with admission capacity left, as last reported
+        self.reported_at = 0.0
+        self.channel: Optional[aio.Channel] = None
+        self.stub: Optional[voice_chat_pb2_grpc.VoiceChatServiceStub] = None
+
+    @property
+    def load(self) -> int:
+        return len(self.chats) + sum(1 for key in self.pending if key not in self.chats)
+
+    def holds(self, key: int) -> bool:
+        return key in self.chats or key in self.pending
+
+    def is_ready(self, stale_after: float) -> bool:
+        """Whether the worker has reported recently enough to receive calls."""
+        return time.time() - self.reported_at < stale_after
+
+    def apply_report(self, report: dict):
+        """Replace the reported load with a fresh report from the worker."""
+        self.chats = set(report.get('chats', ()))
+        self.chats.update(report.get('users', ()))
+        self.streams = report.get('streams', 0)
+        self.accepting = report.get('ready', True) and report.get('available', 1) > 0
+        self.reported_at = report.get('reported_at', time.time())
+        # Dispatches that finished before this report are reflected in it
+        self.pending = {
+            key: finished_at for key, finished_at in self.pending.items()
+            if finished_at > self.reported_at
+        }
+
+    def mark_down(self):
+        """Forget everything about a worker that exited."""
+        self.chats.clear()
+        self.pending.clear()
+        self.streams = 0
+        self.reported_at = 0.0
+
+
+class VoiceChatRouter(voice_chat_pb2_grpc.VoiceChatServiceServicer):
+    """
+    gRPC servicer that forwards each request to a worker process.
+
+    Chats and users are mapped to workers by rendezvous hashing, so repeat
+    calls for a chat reach the worker whose sessions already know it. A chat
+    with an active call always goes to the worker holding it. When the
+    preferred worker carries more than its share of calls, the least loaded
+    ready worker is used instead. Job and call IDs returned by workers are
+    remembered so follow-up requests reach the same worker.
+    """
+
+    def __init__(self, workers: List[WorkerHandle], stale_after: float, load_factor: float = 1.25):
+        self.workers = workers
+        self.stale_after = stale_after
+        self.load_factor = load_factor
+        self._jobs: "OrderedDict[str, WorkerHandle]" = OrderedDict()
+        self._calls: "OrderedDict[str, WorkerHandle]" = OrderedDict()
+        self.draining = False
+        self.drain_deadline: Optional[float] = None  # Unix time workers tear down their remaining calls
+
+        for worker in workers:
+            worker.channel = aio.insecure_channel(worker.address)
+            worker.stub = voice_chat_pb2_grpc.VoiceChatServiceStub(worker.channel)
+
+    async def close(self):
+        for worker in self.workers:
+            if worker.channel is not None:
+                await worker.channel.close()
+
+    def worker_for(self, key: int) -> Optional[WorkerHandle]:
+        """Pick the worker that should handle a chat or user."""
+        ready = [worker for worker in self.workers if worker.is_ready(self.stale_after)]
+        if not ready:
+            return None
+
+        for worker in ready:
+            if worker.holds(key):
+                return worker
+
+        # New calls avoid draining, flood-waited and saturated workers while others can take them
+        ready = [worker for worker in ready if worker.accepting] or ready
+        preferred = max(ready, key=lambda worker: self._score(worker, key))
+        total = sum(worker.load for worker in ready) + 1
+        if preferred.load < max(1.0, self.load_factor * total / len(ready)):
+            return preferred
+        return min(ready, key=lambda worker: worker.load)
+
+    async def StreamAzan(self, request, context):
+        """Forward StreamAzan to the worker for the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.StreamAzanResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+
+        worker.pending[request.chat_id] = math.inf
+        try:
+            response = await worker.stub.StreamAzan(request, timeout=context.time_remaining())
+            self._finish_dispatch(worker, [request.chat_id])
+            if response.job_id:
+                self._remember(self._jobs, response.job_id, worker)
+            return response
+
+        except Exception as e:
+            worker.pending.pop(request.chat_id, None)
+            logger.error(f"Error forwarding StreamAzan to {worker.name}: {e}")
+            return voice_chat_pb2.StreamAzanResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def StreamAzanBatch(self, request, context):
+        """Split a batch by worker and merge the per-chat results."""
+        results: List[voice_chat_pb2.ChatStreamResult] = []
+        groups: Dict[int, List[int]] = {}
+        for chat_id in request.chat_ids:
+            worker = self.worker_for(chat_id)
+            if worker is None:
+                results.append(voice_chat_pb2.ChatStreamResult(
+                    chat_id=chat_id,
+                    success=False,
+                    message="No voice chat workers available"
+                ))
+                continue
+            worker.pending[chat_id] = math.inf
+            groups.setdefault(worker.index, []).append(chat_id)
+
+        async def forward(worker: WorkerHandle, chat_ids: List[int]):
+            try:
+                response = await worker.stub.StreamAzanBatch(
+                    voice_chat_pb2.StreamAzanBatchRequest(
+                        chat_ids=chat_ids,
+                        audio_url=request.audio_url,
+                        max_concurrency=request.max_concurrency,
+                        priority=request.priority,
+                        deadline_unix_ms=request.deadline_unix_ms
+                    ),
+                    timeout=context.time_remaining()
+                )
+            except Exception as e:
+                logger.error(f"Error forwarding StreamAzanBatch to {worker.name}: {e}")
+                for chat_id in chat_ids:
+                    worker.pending.pop(chat_id, None)
+                return [
+                    voice_chat_pb2.ChatStreamResult(
+                        chat_id=chat_id,
+                        success=False,
+                        message=f"Error: {str(e)}"
+                    )
+                    for chat_id in chat_ids
+                ]
+
+            self._finish_dispatch(worker, chat_ids)
+            for result in response.results:
+                if result.job_id:
+                    self._remember(self._jobs, result.job_id, worker)
+            return list(response.results)
+
+        forwarded = await asyncio.gather(*(
+            forward(self.workers[index], chat_ids)
+            for index, chat_ids in groups.items()
+        ))
+        for worker_results in forwarded:
+            results.extend(worker_results)
+
+        succeeded = sum(1 for result in results if result.success)
+        return voice_chat_pb2.StreamAzanBatchResponse(
+            success=succeeded == len(results),
+            message=f"Started streaming azan in {succeeded}/{len(results)} chats",
+            results=results
+        )
+
+    async def GetStreamStatus(self, request, context):
+        """Ask the worker running a stream job for its status."""
+        worker = await self._find_job_worker(request.job_id)
+        if worker is None:
+            return voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Stream job {request.job_id} not found",
+                job_id=request.job_id
+            )
+        try:
+            return await worker.stub.GetStreamStatus(request)
+        except Exception as e:
+            logger.error(f"Error forwarding GetStreamStatus to {worker.name}: {e}")
+            return voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                job_id=request.job_id
+            )
+
+    async def WatchStream(self, request, context):
+        """Relay stream job updates from the worker running the job."""
+        worker = await self._find_job_worker(request.job_id)
+        if worker is None:
+            yield voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Stream job {request.job_id} not found",
+                job_id=request.job_id
+            )
+            return
+
+        try:
+            async for response in worker.stub.WatchStream(request):
+                yield response
+        except grpc.aio.AioRpcError as e:
+            logger.error(f"Error relaying WatchStream from {worker.name}: {e}")
+            yield voice_chat_pb2.StreamStatusResponse(
+                success=False,
+                message=f"Error: {e.details()}",
+                job_id=request.job_id
+            )
+
+    async def StartVoiceChat(self, request, context):
+        """Forward StartVoiceChat to the worker for the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.StartVoiceChatResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+        try:
+            return await worker.stub.StartVoiceChat(request)
+        except Exception as e:
+            logger.error(f"Error forwarding StartVoiceChat to {worker.name}: {e}")
+            return voice_chat_pb2.StartVoiceChatResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def StopVoiceChat(self, request, context):
+        """Forward StopVoiceChat to the worker holding the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.StopVoiceChatResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+        try:
+            return await worker.stub.StopVoiceChat(request)
+        except Exception as e:
+            logger.error(f"Error forwarding StopVoiceChat to {worker.name}: {e}")
+            return voice_chat_pb2.StopVoiceChatResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def EnqueueAudio(self, request, context):
+        """Forward EnqueueAudio to the worker for the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.EnqueueAudioResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+
+        worker.pending[request.chat_id] = math.inf
+        try:
+            response = await worker.stub.EnqueueAudio(request, timeout=context.time_remaining())
+            self._finish_dispatch(worker, [request.chat_id])
+            for job_id in response.job_ids:
+                self._remember(self._jobs, job_id, worker)
+            return response
+
+        except Exception as e:
+            worker.pending.pop(request.chat_id, None)
+            logger.error(f"Error forwarding EnqueueAudio to {worker.name}: {e}")
+            return voice_chat_pb2.EnqueueAudioResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def SkipAudio(self, request, context):
+        """Forward SkipAudio to the worker holding the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.SkipAudioResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+        try:
+            return await worker.stub.SkipAudio(request)
+        except Exception as e:
+            logger.error(f"Error forwarding SkipAudio to {worker.name}: {e}")
+            return voice_chat_pb2.SkipAudioResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def ClearQueue(self, request, context):
+        """Forward ClearQueue to the worker holding the chat."""
+        worker = self.worker_for(request.chat_id)
+        if worker is None:
+            return voice_chat_pb2.ClearQueueResponse(
+                success=False,
+                message="No voice chat workers available"
+            )
+        try:
+            return await worker.stub.ClearQueue(request)
+        except Exception as e:
+            logger.error(f"Error forwarding ClearQueue to {worker.name}: {e}")
+            return voice_chat_pb2.ClearQueueResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+    async def PrepareBroadcast(self, request, context):
+        """Split a pre-warm request by worker, so each worker warms the chats it will stream to."""
+        groups: Dict[int, List[int]] = {}
+        for chat_id in request.chat_ids:
+            worker = self.worker_for(chat_id)
+            if worker is not None:
+                groups.setdefault(worker.index, []).append(chat_id)
+
+        async def forward(worker: WorkerHandle, chat_ids: List[int]) -> int:
+            try:
+                response = await worker.stub.PrepareBroadcast(
+                    voice_chat_pb2.PrepareBroadcastRequest(
+                        chat_ids=chat_ids,
+                        start_unix_ms=request.start_unix_ms,
+                        lead_seconds=request.lead_seconds
+                    )
+                )
+                return response.scheduled
+            except Exception as e:
+                logger.error(f"Error forwarding PrepareBroadcast to {worker.name}: {e}")
+                return 0
+
+        scheduled = sum(await asyncio.gather(*(
+            forward(self.workers[index], chat_ids)
+            for index, chat_ids in groups.items()
+        )))
+        return voice_chat_pb2.PrepareBroadcastResponse(
+            success=True,
+            message=f"Scheduled {scheduled}/{len(request.chat_ids)} chats for pre-warming",
+            scheduled=scheduled
+        )
+
+    async def StartCall(self, request, context):
+        """Forward StartCall to the worker for the user."""
+        worker = self.worker_for(request.user_id)
+        if worker is None:
+            return voice_chat_pb2.StartCallResponse(
+                success=False,
+                message="No voice chat workers available",
+                call_id=""
+            )
+
+        worker.pending[request.user_id] = math.inf
+        try:
+            response = await worker.stub.StartCall(request, timeout=context.time_remaining())
+            self._finish_dispatch(worker, [request.user_id])
+            if response.call_id:
+                self._remember(self._calls, response.call_id, worker)
+            return response
+
+        except Exception as e:
+            worker.pending.pop(request.user_id, None)
+            logger.error(f"Error forwarding StartCall to {worker.name}: {e}")
+            return voice_chat_pb2.StartCallResponse(
+                success=False,
+                message=f"Error: {str(e)}",
+                call_id=""
+            )
+
+    async def StartCallBatch(self, request, context):
+        """Split a call batch by worker and send the results of all workers as they arrive."""
+        groups: Dict[int, List[int]] = {}
+        for user_id in dict.fromkeys(request.user_ids):
+            worker = self.worker_for(user_id)
+            if worker is None:
+                yield voice_chat_pb2.UserCallResult(
+                    user_id=user_id,
+                    success=False,
+                    message="No voice chat workers available"
+                )
+                continue
+            worker.pending[user_id] = math.inf
+            groups.setdefault(worker.index, []).append(user_id)
+
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def forward(worker: WorkerHandle, user_ids: List[int]):
+            remaining = set(user_ids)
+            try:
+                async for result in worker.stub.StartCallBatch(
+                    voice_chat_pb2.StartCallBatchRequest(
+                        user_ids=user_ids,
+                        audio_url=request.audio_url,
+                        duration_seconds=request.duration_seconds,
+                        max_concurrency=request.max_concurrency,
+                        priority=request.priority,
+                        deadline_unix_ms=request.deadline_unix_ms,
+                        idempotency_keys={
+                            user_id: request.idempotency_keys[user_id]
+                            for user_id in user_ids
+                            if user_id in request.idempotency_keys
+                        }
+                    ),
+                    timeout=context.time_remaining()
+                ):
+                    remaining.discard(result.user_id)
+                    self._finish_dispatch(worker, [result.user_id])
+                    if result.call_id:
+                        self._remember(self._calls, result.call_id, worker)
+                    results.put_nowait(result)
+            except Exception as e:
+                logger.error(f"Error forwarding StartCallBatch to {worker.name}: {e}")
+                for user_id in remaining:
+                    results.put_nowait(voice_chat_pb2.UserCallResult(
+                        user_id=user_id,
+                        success=False,
+                        message=f"Error: {str(e)}"
+                    ))
+            finally:
+                # Users the worker never reported on are not counted against it
+                for user_id in remaining:
+                    worker.pending.pop(user_id, None)
+                results.put_nowait(None)
+
+        forwards = [
+            asyncio.create_task(forward(self.workers[index], user_ids))
+            for index, user_ids in groups.items()
+        ]
+        try:
+            finished = 0
+            while finished < len(forwards):
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    yield result
+        finally:
+            for task in forwards:
+                task.cancel()
+
+    async def EndCall(self, request, context):
+        """Forward EndCall to the worker that started the call."""
+        worker = self._calls.pop(request.call_id, None)
+        candidates = [worker] if worker is not None else self.workers
+        try:
+            responses = await asyncio.gather(*(
+                candidate.stub.EndCall(request) for candidate in candidates
+            ), return_exceptions=True)
+        except Exception as e:
+            logger.error(f"Error forwarding EndCall: {e}")
+            return voice_chat_pb2.EndCallResponse(
+                success=False,
+                message=f"Error: {str(e)}"
+            )
+
+        for response in responses:
+            if isinstance(response, voice_chat_pb2.EndCallResponse) and response.success:
+                return response
+        return voice_chat_pb2.EndCallResponse(
+            success=False,
+            message="Failed to end call"
+        )
+
+    async def SubscribeCallEvents(self, request, context):
+        """Merge the call events of every worker into one stream."""
+        subscription = EventSubscription(
+            request.buffer_size if request.buffer_size > 0 else DEFAULT_BUFFER_SIZE
+        )
+        relays = [
+            asyncio.create_task(self._relay_events(worker, request, subscription))
+            for worker in self.workers
+        ]
+        try:
+            while True:
+                event, dropped = await subscription.get()
+                # Drops here add to those the worker already counted
+                event.dropped += dropped
+                yield event
+        finally:
+            for relay in relays:
+                relay.cancel()
+
+    async def _relay_events(self, worker: WorkerHandle, request, subscription: EventSubscription):
+        """Feed a worker's call events into a subscription, resubscribing after restarts."""
+        delay = EVENT_RESUBSCRIBE_SECONDS
+        while True:
+            try:
+                async for event in worker.stub.SubscribeCallEvents(request):
+                    subscription.put(event)
+                    delay = EVENT_RESUBSCRIBE_SECONDS
+            except grpc.aio.AioRpcError as e:
+                logger.warning(f"Call event stream from {worker.name} ended: {e.code()}, resubscribing in {delay:.0f}s")
+            except Exception as e:
+                logger.error(f"Call event relay from {worker.name} failed: {e}, resubscribing in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_EVENT_RESUBSCRIBE_SECONDS)
+
+    async def HealthCheck(self, request, context):
+        """
+        Merge the health of every worker.
+
+        Ready while any reporting worker is ready; counts and capacity are
+        summed and sessions listed under their worker. While draining, the
+        streams left on all workers are reported; workers that already
+        exited have nothing left.
+        """
+        responses = await asyncio.gather(*(
+            worker.stub.HealthCheck(request, timeout=WORKER_HEALTH_TIMEOUT_SECONDS) for worker in self.workers
+        ), return_exceptions=True)
+        healths = [
+            (worker, response) for worker, response in zip(self.workers, responses)
+            if isinstance(response, voice_chat_pb2.HealthCheckResponse)
+        ]
+
+        ready = not self.draining and any(
+            response.ready and worker.is_ready(self.stale_after) for worker, response in healths
+        )
+        live = any(response.live for _, response in healths)
+        sessions = []
+        for worker, response in healths:
+            for session in response.sessions:
+                session.name = f"{worker.name}/{session.name}"
+                sessions.append(session)
+        return voice_chat_pb2.HealthCheckResponse(
+            healthy=live,
+            draining=self.draining,
+            active_streams=sum(response.active_streams for _, response in healths),
+            drain_deadline_unix_ms=int(self.drain_deadline * 1000) if self.draining else 0,
+            live=live,
+            ready=ready,
+            group_calls=sum(response.group_calls for _, response in healths),
+            private_calls=sum(response.private_calls for _, response in healths),
+            admission_in_flight=sum(response.admission_in_flight for _, response in healths),
+            admission_queued=sum(response.admission_queued for _, response in healths),
+            admission_available=sum(response.admission_available for _, response in healths),
+            sessions=sessions
+        )
+
+    def _finish_dispatch(self, worker: WorkerHandle, keys: List[int]):
+        """Keep dispatched chats counted until the next load report covers them."""
+        now = time.time()
+        for key in keys:
+            if key in worker.pending:
+                worker.pending[key] = now
+
+    async def _find_job_worker(self, job_id: str) -> Optional[WorkerHandle]:
+        """Return the worker running a job, asking every worker if it is not remembered."""
+        worker = self._jobs.get(job_id)
+        if worker is not None:
+            return worker
+
+        request = voice_chat_pb2.GetStreamStatusRequest(job_id=job_id)
+        responses = await asyncio.gather(*(
+            candidate.stub.GetStreamStatus(request) for candidate in self.workers
+        ), return_exceptions=True)
+        for candidate, response in zip(self.workers, responses):
+            if isinstance(response, voice_chat_pb2.StreamStatusResponse) and response.success:
+                self._remember(self._jobs, job_id, candidate)
+                return candidate
+        return None
+
+    @staticmethod
+    def _remember(ids: "OrderedDict[str, WorkerHandle]", key: str, worker: WorkerHandle):
+        ids[key] = worker
+        ids.move_to_end(key)
+        while len(ids) > MAX_ROUTED_IDS:
+            ids.popitem(last=False)
+
+    @staticmethod
+    def _score(worker: WorkerHandle, key: int) -> int:
+        digest = hashlib.md5(f"{worker.name}:{key}".encode()).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+
+async def serve_router(
+    router: VoiceChatRouter,
+    port: int = 50053,
+    drain: Optional[Callable[[], Awaitable[None]]] = None,
+):
+    """
+    Start the front gRPC server and serve until shutdown.
+
+    On SIGTERM or SIGINT, drain is awaited while the server keeps answering, so
+    HealthCheck reports the workers' progress; then the server stops.
+    """
+    server = aio.server(interceptors=[MetricsInterceptor()])
+    voice_chat_pb2_grpc.add_VoiceChatServiceServicer_to_server(router, server)
+
+    listen_addr = f'0.0.0.0:{port}'
+    server.add_insecure_port(listen_addr)
+
+    logger.info(f"Starting gRPC router on {listen_addr} for {len(router.workers)} workers")
+    await server.start()
+
+    try:
+        signal_name = await wait_for_shutdown_signal()
+        logger.info(f"Received {signal_name}, draining workers before shutdown")
+        if drain is not None:
+            await drain()
+    finally:
+        logger.info("Shutting down gRPC router")
+        await server.stop(5)
@@ -0,0 +1,207 @@
+"""Startup and shutdown of one voice chat service instance."""
+
+import asyncio
+import logging
+import struct
+import sys
+import time
+from typing import List, Optional
+
+from pyrogram import Client
+
+from audio_cache import AudioCache
+from config import ServiceConfig
+from metrics import start_metrics_server
+from voice_chat import VoiceChatManager
+from grpc_server import serve
+
+logger = logging.getLogger(__name__)
+
+
+def create_voice_chat_manager(
+    config: ServiceConfig,
+    clients: List[Client],
+    audio_cache_dir: str,
+    peer_cache_path: Optional[str] = None,
+    journal_path: Optional[str] = None,
+) -> VoiceChatManager:
+    """Build a VoiceChatManager with its audio and peer caches and journal from the configuration."""
+    # Initialize audio cache shared by all calls
+    audio_cache = AudioCache(
+        audio_cache_dir,
+        max_bytes=config.audio_cache_max_mb * 1024 * 1024,
+        revalidate_after=config.audio_cache_revalidate_seconds
+    )
+
+    return VoiceChatManager(
+        clients,
+        audio_cache=audio_cache,
+        http_limit_per_host=config.audio_http_limit_per_host,
+        http_keepalive_seconds=config.audio_http_keepalive_seconds,
+        http_timeout_seconds=config.audio_http_timeout_seconds,
+        max_audio_bytes=config.audio_max_mb * 1024 * 1024,
+        pretranscode=config.audio_pretranscode,
+        progressive_streaming=config.audio_progressive_streaming,
+        stream_buffer_bytes=config.audio_stream_buffer_kb * 1024,
+        fifo_dir=config.audio_fifo_dir,
+        batch_concurrency=config.batch_concurrency,
+        max_stream_seconds=config.max_stream_seconds,
+        max_concurrent_joins=config.max_concurrent_joins,
+        max_concurrent_joins_per_session=config.max_concurrent_joins_per_session,
+        join_rate_per_session=config.join_rate_per_session,
+        join_burst_per_session=config.join_burst_per_session,
+        admission_max_wait_seconds=config.admission_max_wait_seconds,
+        retry_max_attempts=config.retry_max_attempts,
+        retry_base_delay=config.retry_base_delay,
+        retry_max_delay=config.retry_max_delay,
+        retry_budget_seconds=config.retry_budget_seconds,
+        max_flood_wait_seconds=config.max_flood_wait_seconds,
+        prewarm_lead_seconds=config.prewarm_lead_seconds,
+        prewarm_hold_seconds=config.prewarm_hold_seconds,
+        queue_idle_seconds=config.queue_idle_seconds,
+        peer_cache_path=peer_cache_path or None,
+        journal_path=journal_path or None,
+        peer_cache_max_entries=config.peer_cache_max_entries,
+        peer_cache_ttl_seconds=config.peer_cache_ttl_seconds,
+        group_call_cache_ttl_seconds=config.group_call_cache_ttl_seconds,
+        event_buffer_size=config.call_event_buffer_size,
+        idempotency_ttl_seconds=config.idempotency_ttl_seconds
+    )
+
+
+async def run_service(
+    config: ServiceConfig,
+    session_strings: List[str],
+    port: int,
+    host: str = '0.0.0.0',
+    audio_cache_dir: Optional[str] = None,
+    peer_cache_path: Optional[str] = None,
+    journal_path: Optional[str] = None,
+    client_prefix: str = 'voice_chat_user',
+    metrics_port: int = 0,
+    load_queue=None,
+    worker_index: Optional[int] = None,
+):
+    """
+    Run Pyrogram clients, PyTgCalls and the gRPC server until shutdown.
+
+    Args:
+        config: Service configuration
+        session_strings: User sessions this instance drives
+        port: gRPC port to listen on
+        host: Interface to bind the gRPC server to
+        audio_cache_dir: Audio cache directory, defaults to config.audio_cache_dir
+        peer_cache_path: Peer cache file, defaults to config.peer_cache_path
+        journal_path: Call journal file, defaults to config.journal_path
+        client_prefix: Prefix of the Pyrogram client names
+        metrics_port: Port for the metrics endpoint, 0 to disable
+        load_queue: Queue to report load to the supervisor on (worker mode)
+        worker_index: Index of this worker (worker mode)
+    """
+    logger.info(f"Initializing {len(session_strings)} Pyrogram client(s) with user sessions...")
+
+    # Initialize Pyrogram clients with user sessions (not bot token!)
+    # This avoids conflicts with the main bot and provides better voice chat support
+    apps = [
+        Client(
+            name=f"{client_prefix}_{index}",
+            api_id=int(config.api_id),
+            api_hash=config.api_hash,
+            session_string=session_string,
+            workdir="/tmp"
+        )
+        for index, session_string in enumerate(session_strings)
+    ]
+    logger.info(f"app_id: {config.api_id}")
+
+    # Initialize voice chat manager
+    voice_chat_manager = create_voice_chat_manager(
+        config,
+        apps,
+        audio_cache_dir or config.audio_cache_dir,
+        peer_cache_path if peer_cache_path is not None else config.peer_cache_path,
+        journal_path if journal_path is not None else config.journal_path
+    )
+    load_reporter = None
+    metrics_runner = None
+
+    try:
+        if metrics_port:
+            metrics_runner = await start_metrics_server(metrics_port)
+
+        # Start Pyrogram clients
+        logger.info("Starting Pyrogram clients...")
+        try:
+            await asyncio.gather(*(app.start() for app in apps))
+        except struct.error as e:
+            logger.error("Session string is corrupted or incompatible with current Pyrogram version")
+            logger.error("Please regenerate the session string by running:")
+            logger.error("  cd services/voice-chat-service && python generate_session.py")
+            sys.exit(1)
+        logger.info("Pyrogram clients started")
+
+        # Start PyTgCalls
+        logger.info("Starting PyTgCalls...")
+        await voice_chat_manager.start()
+        logger.info("PyTgCalls started")
+
+        if load_queue is not None:
+            load_reporter = asyncio.create_task(
+                report_load(
+                    voice_chat_manager,
+                    load_queue,
+                    worker_index,
+                    config.worker_load_report_seconds
+                )
+            )
+
+        # Start gRPC server
+        logger.info(f"Starting gRPC server on port {port}...")
+        await serve(voice_chat_manager, port, host, config.drain_timeout_seconds)
+
+    except Exception as e:
+        logger.error(f"Error in main: {e}", exc_info=True)
+    finally:
+        # Cleanup
+        logger.info("Shutting down...")
+        if load_reporter is not None:
+            load_reporter.cancel()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        try:
+            await voice_chat_manager.stop()
+            for app in apps:
+                if app.is_connected:
+                    await app.stop()
+            logger.info("Shutdown complete")
+        except Exception as e:
+            logger.error(f"Error during shutdown: {e}")
+
+
+async def report_load(
+    voice_chat_manager: VoiceChatManager,
+    load_queue,
+    worker_index: int,
+    interval: float,
+):
+    """Periodically send the chats and users this worker holds calls for to the supervisor."""
+    while True:
+        try:
+            load_queue.put({
+                'worker': worker_index,
+                'reported_at': time.time(),
+                # Chats waiting to be pre-warmed or with queued clips stick to this worker like active ones
+                'chats': [
+                    *voice_chat_manager.calls.chat_ids(),
+                    *voice_chat_manager.prewarm_scheduled,
+                    *voice_chat_manager.playlists.chat_ids(),
+                ],
+                'users': voice_chat_manager.calls.user_ids(),
+                'streams': voice_chat_manager.stream_jobs.active_count(),
+                # Lets the router steer new calls away while sessions are flood-waited or joins are saturated
+                'ready': voice_chat_manager.is_ready(),
+                'available': voice_chat_manager.admission.available,
+            })
+        except Exception as e:
+            logger.warning(f"Failed to report load: {e}")
+        await asyncio.sleep(interval)
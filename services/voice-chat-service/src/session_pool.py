@@ -0,0 +1,138 @@
+"""Sharding of voice calls across several Telegram user sessions."""
+
+import bisect
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, Set
+
+from pyrogram import Client
+from pytgcalls import PyTgCalls
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceSession:
+    """One Telegram user account with its own pytgcalls instance."""
+
+    def __init__(self, index: int, client: Client, pytgcalls: PyTgCalls):
+        self.index = index
+        self.name = f"session-{index}"
+        self.client = client
+        self.pytgcalls = pytgcalls
+        self.chats: Set[int] = set()  # chats and users with a call on this session
+        self.flood_until = 0.0
+
+    @property
+    def load(self) -> int:
+        return len(self.chats)
+
+    @property
+    def flood_wait_remaining(self) -> float:
+        return max(0.0, self.flood_until - time.time())
+
+    def is_flood_waited(self) -> bool:
+        return self.flood_until > time.time()
+
+    def is_connected(self) -> bool:
+        return bool(self.client.is_connected)
+
+    def is_usable(self) -> bool:
+        """Whether the session can place new calls now: connected and out of FloodWait."""
+        return self.is_connected() and not self.is_flood_waited()
+
+
+class SessionPool:
+    """
+    Assigns chats to sessions by consistent hashing with bounded load.
+
+    A chat normally lands on the same session every time, which keeps peer
+    and group-call state warm on that account. If its session is in a
+    FloodWait or already carries more than its share of calls, the least
+    loaded available session is used instead. Assignments stick while a call
+    is active and are dropped when it ends.
+    """
+
+    def __init__(
+        self,
+        sessions: List[VoiceSession],
+        virtual_nodes: int = 64,
+        load_factor: float = 1.25,
+    ):
+        if not sessions:
+            raise ValueError("At least one voice session is required")
+
+        self.sessions = sessions
+        self.load_factor = load_factor
+        self._assignments: Dict[int, VoiceSession] = {}
+
+        self._ring: List[int] = []
+        self._ring_sessions: List[VoiceSession] = []
+        points = sorted(
+            (self._hash(f"{session.name}#{i}"), session.index)
+            for session in sessions
+            for i in range(virtual_nodes)
+        )
+        for point, index in points:
+            self._ring.append(point)
+            self._ring_sessions.append(sessions[index])
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions)
+
+    def get(self, chat_id: int) -> Optional[VoiceSession]:
+        """Return the session currently holding a call for chat_id, if any."""
+        return self._assignments.get(chat_id)
+
+    def session_for(self, chat_id: int) -> VoiceSession:
+        """Pick the session that should handle chat_id, without assigning it."""
+        assigned = self._assignments.get(chat_id)
+        if assigned is not None:
+            return assigned
+
+        preferred = self._ring_lookup(chat_id)
+        if not preferred.is_flood_waited() and preferred.load < self._load_limit():
+            return preferred
+
+        available = [s for s in self.sessions if not s.is_flood_waited()]
+        if not available:
+            # Everyone is waiting; pick whoever is free soonest
+            return min(self.sessions, key=lambda s: s.flood_until)
+        return min(available, key=lambda s: s.load)
+
+    def assign(self, chat_id: int, session: Optional[VoiceSession] = None) -> VoiceSession:
+        """Record that a session (picked here unless given) now holds a call for chat_id."""
+        session = session or self.session_for(chat_id)
+        previous = self._assignments.get(chat_id)
+        if previous is not None and previous is not session:
+            previous.chats.discard(chat_id)
+        self._assignments[chat_id] = session
+        session.chats.add(chat_id)
+        return session
+
+    def release(self, chat_id: int):
+        """Forget the assignment of chat_id once its call is over."""
+        session = self._assignments.pop(chat_id, None)
+        if session is not None:
+            session.chats.discard(chat_id)
+
+    def report_flood_wait(self, session: VoiceSession, seconds: float):
+        """Take a session out of rotation for new calls for the given time."""
+        session.flood_until = max(session.flood_until, time.time() + seconds)
+        logger.warning(f"{session.name} is in FloodWait for {seconds}s, routing new calls elsewhere")
+
+    def _load_limit(self) -> float:
+        """Calls a session may carry before new chats spill over to others."""
+        total = sum(s.load for s in self.sessions) + 1
+        return max(1.0, self.load_factor * total / len(self.sessions))
+
+    def _ring_lookup(self, chat_id: int) -> VoiceSession:
+        position = bisect.bisect(self._ring, self._hash(str(chat_id))) % len(self._ring)
+        return self._ring_sessions[position]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
@@ -0,0 +1,107 @@
+"""Tracking of group voice chat streams that outlive the RPC that started them."""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class StreamJob:
+    """Lifecycle of one audio stream to one group voice chat."""
+
+    QUEUED = 'queued'  # waiting in a chat's playback queue
+    JOINING = 'joining'
+    PLAYING = 'playing'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'  # removed from the queue or cut off before it finished
+
+    FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+    def __init__(
+        self,
+        chat_id: int,
+        audio_url: str,
+        on_update: Optional[Callable[['StreamJob'], None]] = None,
+        job_id: Optional[str] = None,
+    ):
+        self.job_id = job_id or str(uuid.uuid4())
+        self.chat_id = chat_id
+        self.audio_url = audio_url
+        self.state = self.JOINING
+        self.message = "Joining voice chat"
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.started_at: Optional[float] = None
+        self.version = 0
+        self._changed = asyncio.Event()
+        self._on_update = on_update
+
+    @property
+    def finished(self) -> bool:
+        return self.state in self.FINISHED_STATES
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Seconds of playback so far, or total playback once finished."""
+        if self.started_at is None:
+            return 0.0
+        end = self.updated_at if self.finished else time.time()
+        return max(0.0, end - self.started_at)
+
+    def update(self, state: str, message: str):
+        """Move the job to a new state and wake anyone watching it."""
+        now = time.time()
+        if state == self.PLAYING and self.started_at is None:
+            self.started_at = now
+        self.state = state
+        self.message = message
+        self.updated_at = now
+        self.version += 1
+
+        # Swap the event so waiters of this version wake and later ones block
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        if self._on_update is not None:
+            self._on_update(self)
+
+    async def wait_for_change(self, version: int):
+        """Wait until the job moves past the given version."""
+        while self.version == version:
+            await self._changed.wait()
+
+
+class StreamJobRegistry:
+    """Keeps stream jobs addressable by ID until they have been finished for a while."""
+
+    def __init__(
+        self,
+        retention_seconds: float = 3600.0,
+        on_update: Optional[Callable[[StreamJob], None]] = None,
+    ):
+        self.retention_seconds = retention_seconds
+        self.on_update = on_update  # called after every job state change
+        self._jobs: "OrderedDict[str, StreamJob]" = OrderedDict()
+
+    def create(self, chat_id: int, audio_url: str, job_id: Optional[str] = None) -> StreamJob:
+        """Start tracking a job, under a given ID when resuming one from before a restart."""
+        self._prune()
+        job = StreamJob(chat_id, audio_url, self.on_update, job_id)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[StreamJob]:
+        return self._jobs.get(job_id)
+
+    def active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune(self):
+        """Drop the oldest jobs once they have been finished longer than the retention."""
+        cutoff = time.time() - self.retention_seconds
+        while self._jobs:
+            job = next(iter(self._jobs.values()))
+            if not job.finished or job.updated_at > cutoff:
+                break
+            self._jobs.popitem(last=False)
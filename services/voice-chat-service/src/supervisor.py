@@ -0,0 +1,234 @@
+"""Supervisor that runs voice chat workers in separate processes behind a router."""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Dict, List, Optional
+
+from config import ServiceConfig
+from metrics import start_metrics_server
+from router import VoiceChatRouter, WorkerHandle, serve_router
+from service import run_service
+
+logger = logging.getLogger(__name__)
+
+# Delay before restarting a worker that exited, doubled on each crash
+RESTART_DELAY_SECONDS = 1.0
+MAX_RESTART_DELAY_SECONDS = 60.0
+
+# Time a drained worker gets to tear down its remaining calls and exit
+WORKER_TEARDOWN_SECONDS = 30.0
+
+
+class Supervisor:
+    """
+    Runs one VoiceChatManager per worker process and routes gRPC to them.
+
+    Session strings are dealt out to workers round-robin, so every worker
+    drives its own Telegram accounts on its own core. Workers serve gRPC on
+    localhost and report which chats they hold calls for over a queue; the
+    router uses those reports for affinity and load balancing. A worker that
+    exits is restarted with exponential backoff.
+    """
+
+    def __init__(self, config: ServiceConfig):
+        self.config = config
+        worker_count = min(config.workers, len(config.session_strings))
+        if worker_count < config.workers:
+            logger.warning(
+                f"Only {len(config.session_strings)} session strings for "
+                f"{config.workers} workers, starting {worker_count} workers"
+            )
+
+        self._context = multiprocessing.get_context('spawn')
+        self.load_queue = self._context.Queue()
+        self.workers = [
+            WorkerHandle(index, config.worker_base_port + index)
+            for index in range(worker_count)
+        ]
+        self._session_slices: List[List[str]] = [
+            config.session_strings[index::worker_count]
+            for index in range(worker_count)
+        ]
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._restart_delays: Dict[int, float] = {}
+        self._restart_at: Dict[int, float] = {}
+        self._running = False
+
+    async def run(self):
+        """Start the workers and serve the router until shutdown."""
+        self._running = True
+        for worker in self.workers:
+            self._spawn(worker)
+
+        router = VoiceChatRouter(
+            self.workers,
+            stale_after=self.config.worker_load_report_seconds * 3
+        )
+        tasks = [
+            asyncio.create_task(self._collect_load()),
+            asyncio.create_task(self._monitor()),
+        ]
+        metrics_runner = None
+
+        try:
+            if self.config.metrics_port:
+                metrics_runner = await start_metrics_server(self.config.metrics_port)
+            await serve_router(router, self.config.grpc_port, lambda: self.drain(router))
+        finally:
+            self._running = False
+            for task in tasks:
+                task.cancel()
+            await router.close()
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            self.stop()
+
+    async def drain(self, router: VoiceChatRouter):
+        """
+        Forward SIGTERM to every worker and wait for them to drain and exit.
+
+        Workers exiting now are not restarted. Workers still running after
+        their drain timeout and teardown time are left to stop().
+        """
+        self._running = False
+        now = time.time()
+        router.draining = True
+        router.drain_deadline = now + self.config.drain_timeout_seconds
+        exit_by = router.drain_deadline + WORKER_TEARDOWN_SECONDS
+
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        while time.time() < exit_by and any(process.is_alive() for process in self._processes.values()):
+            await asyncio.sleep(1.0)
+
+    def stop(self):
+        """Terminate every worker process."""
+        for process in self._processes.values():
+            if process.is_alive():
+                process.terminate()
+        for index, process in self._processes.items():
+            process.join(10)
+            if process.is_alive():
+                logger.warning(f"worker-{index} did not exit, killing it")
+                process.kill()
+                process.join()
+        logger.info("All workers stopped")
+
+    def _spawn(self, worker: WorkerHandle):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                worker.index,
+                self.config,
+                self._session_slices[worker.index],
+                worker.port,
+                self.load_queue,
+            ),
+            name=worker.name,
+            daemon=True,
+        )
+        process.start()
+        self._processes[worker.index] = process
+        logger.info(
+            f"Started {worker.name} (pid {process.pid}) on port {worker.port} "
+            f"with {len(self._session_slices[worker.index])} session(s)"
+        )
+
+    async def _collect_load(self):
+        """Apply load reports from workers as they arrive."""
+        loop = asyncio.get_running_loop()
+        while True:
+            report = await loop.run_in_executor(None, self._next_report)
+            if report is None:
+                continue
+            index = report.get('worker')
+            if index is None or not 0 <= index < len(self.workers):
+                continue
+            process = self._processes.get(index)
+            if process is None or not process.is_alive():
+                continue
+            self.workers[index].apply_report(report)
+            self._restart_delays.pop(index, None)
+
+    def _next_report(self) -> Optional[dict]:
+        try:
+            return self.load_queue.get(timeout=1.0)
+        except queue.Empty:
+            return None
+
+    async def _monitor(self):
+        """Restart workers that exited, backing off if they keep crashing."""
+        while self._running:
+            now = time.time()
+            for worker in self.workers:
+                process = self._processes.get(worker.index)
+                if process is None or process.is_alive():
+                    continue
+
+                if worker.index not in self._restart_at:
+                    delay = self._restart_delays.get(worker.index, RESTART_DELAY_SECONDS)
+                    self._restart_delays[worker.index] = min(delay * 2, MAX_RESTART_DELAY_SECONDS)
+                    self._restart_at[worker.index] = now + delay
+                    worker.mark_down()
+                    logger.error(
+                        f"{worker.name} exited with code {process.exitcode}, "
+                        f"restarting in {delay:.0f}s"
+                    )
+                elif now >= self._restart_at[worker.index]:
+                    del self._restart_at[worker.index]
+                    self._spawn(worker)
+
+            await asyncio.sleep(1.0)
+
+
+def _worker_main(
+    index: int,
+    config: ServiceConfig,
+    session_strings: List[str],
+    port: int,
+    load_queue,
+):
+    """Entry point of a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - worker-{index} - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout)
+        ],
+        force=True
+    )
+
+    # Workers drive different accounts, so each keeps its own peer cache and journal file
+    peer_cache_path = config.peer_cache_path
+    if peer_cache_path:
+        root, ext = os.path.splitext(peer_cache_path)
+        peer_cache_path = f"{root}.worker-{index}{ext}"
+    journal_path = config.journal_path
+    if journal_path:
+        root, ext = os.path.splitext(journal_path)
+        journal_path = f"{root}.worker-{index}{ext}"
+
+    try:
+        asyncio.run(run_service(
+            config,
+            session_strings,
+            port,
+            host='127.0.0.1',
+            # Each worker keeps its own cache index; they must not share a directory
+            audio_cache_dir=os.path.join(config.audio_cache_dir, f"worker-{index}"),
+            peer_cache_path=peer_cache_path,
+            journal_path=journal_path,
+            client_prefix=f"voice_chat_worker_{index}_user",
+            # The router serves METRICS_PORT; workers take the ports after it
+            metrics_port=config.metrics_port + 1 + index if config.metrics_port else 0,
+            load_queue=load_queue,
+            worker_index=index
+        ))
+    except KeyboardInterrupt:
+        pass
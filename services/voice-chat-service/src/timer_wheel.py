@@ -0,0 +1,109 @@
+"""Hashed timer wheel running every call deadline from a single coroutine."""
+
+import asyncio
+import logging
+import math
+from typing import Callable, List, Optional, Set
+
+from background import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    """A scheduled callback; pass it to TimerWheel.cancel() to disarm it."""
+
+    __slots__ = ('tick', 'callback', 'cancelled')
+
+    def __init__(self, tick: int, callback: Callable):
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel with O(1) schedule and cancel.
+
+    Timers are bucketed by the tick they fire on, modulo the wheel size. One
+    coroutine advances the wheel while timers are pending and exits when it
+    is empty, so idle cost does not grow with the number of calls. Deadlines
+    are rounded up to the next tick. Coroutine callbacks run in tasks, held
+    in the given BackgroundTasks so their owner can cancel them.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 512, tasks: Optional[BackgroundTasks] = None):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Set[Timer]] = [set() for _ in range(slots)]
+        self._count = 0
+        self._tick = 0
+        self._origin = 0.0
+        self._runner: Optional[asyncio.Task] = None
+        self._callbacks = tasks or BackgroundTasks()  # coroutine callbacks still running
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule(self, delay: float, callback: Callable) -> Timer:
+        """
+        Run callback after delay seconds.
+
+        The callback may be a plain function or a coroutine function; a
+        returned coroutine is run as a task.
+        """
+        loop = asyncio.get_running_loop()
+        if self._runner is None or self._runner.done():
+            self._origin = loop.time()
+            self._tick = 0
+            self._runner = asyncio.create_task(self._run())
+
+        target = math.ceil((loop.time() + delay - self._origin) / self.tick_seconds)
+        timer = Timer(max(target, self._tick + 1), callback)
+        self._slots[timer.tick % len(self._slots)].add(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer: Optional[Timer]):
+        """Disarm a timer; cancelling a fired or cancelled timer is a no-op."""
+        if timer is None or timer.cancelled:
+            return
+        timer.cancelled = True
+        bucket = self._slots[timer.tick % len(self._slots)]
+        if timer in bucket:
+            bucket.discard(timer)
+            self._count -= 1
+
+    def close(self):
+        """Drop every pending timer and stop the wheel."""
+        for bucket in self._slots:
+            for timer in bucket:
+                timer.cancelled = True
+            bucket.clear()
+        self._count = 0
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._count:
+            self._tick += 1
+            delay = self._origin + self._tick * self.tick_seconds - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            bucket = self._slots[self._tick % len(self._slots)]
+            due = [timer for timer in bucket if timer.tick <= self._tick]
+            for timer in due:
+                bucket.discard(timer)
+                self._count -= 1
+                timer.cancelled = True
+                self._fire(timer)
+
+    def _fire(self, timer: Timer):
+        try:
+            result = timer.callback()
+            if asyncio.iscoroutine(result):
+                self._callbacks.spawn(result)
+        except Exception as e:
+            logger.error(f"Timer callback failed: {e}")
@@ -1,38 +1,215 @@
 """Voice chat streaming logic using Pyrogram and pytgcalls."""
 
 import asyncio
+import hashlib
 import logging
 import os
+import shutil
 import tempfile
+import time
 import uuid
-from typing import Dict, Optional
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from pyrogram import Client
+from pyrogram.errors import FloodWait
 from pytgcalls import PyTgCalls
-from pytgcalls.types import AudioPiped, StreamAudioEnded
+from pytgcalls.types import AudioPiped, HighQualityAudio, InputAudioStream, InputStream, StreamAudioEnded
 from pytgcalls.exceptions import NoActiveGroupCall, AlreadyJoinedError
 import aiohttp
 import random
 import math
 import pyrogram.raw
 
+from admission import AdmissionRejected, AdmissionScheduler, Priority
+from audio_cache import AudioCache
+from background import BackgroundTasks
+from call_events import CallEvent, CallEventBus
+from call_journal import CallJournal, JournalState
+from call_registry import CallRecord, CallRegistry
+from idempotency import KeyedLocks, OperationCache
+from playback_queue import PlaybackQueue, PlaybackQueues, QueuedClip
+from audio_transcoder import PCM_SUFFIX, transcode_to_pcm, write_silence
+from metrics import (
+    ACTIVE_CALLS,
+    ACTIVE_PRIVATE_CALLS,
+    DOWNLOAD_SECONDS,
+    ERRORS,
+    JOIN_SECONDS,
+    PREWARM,
+    RECOVERED,
+    RETRIES,
+    RETRIES_EXHAUSTED,
+    TEMP_FILES,
+    TIME_TO_FIRST_AUDIO_SECONDS,
+)
+from peer_cache import PeerCache
+from progressive_audio import ProgressiveAudio
+from retry import RetryBudget, RetryPolicy, is_transient
+from session_pool import SessionPool, VoiceSession
+from stream_jobs import StreamJob, StreamJobRegistry
+from timer_wheel import TimerWheel
+
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Pre-warmed calls idle on this much silence until the broadcast swaps it out
+SILENCE_SECONDS = 10
+
+# How often a drain checks whether the streams in flight have finished
+DRAIN_POLL_SECONDS = 1.0
+
+# Call events published when a stream job enters a state
+_JOB_EVENTS = {
+    StreamJob.PLAYING: CallEvent.PLAYING,
+    StreamJob.COMPLETED: CallEvent.ENDED,
+    StreamJob.FAILED: CallEvent.FAILED,
+}
+
+# Job message of streams whose request went away before they started
+_REQUEST_CANCELLED = "Request cancelled before the stream started"
+
+# Join outcome recorded when a stream is swapped into a call in this state
+_SWAP_OUTCOMES = {
+    CallRecord.WARM: 'prewarmed',
+    CallRecord.IDLE: 'reused',
+    CallRecord.PLAYING: 'replaced',
+}
+
+
+class ServiceDraining(Exception):
+    """Raised for new work once the service has started draining for shutdown."""
+
+
+class _DownloadFlight:
+    """A download in progress, shared by every caller asking for the same URL."""
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
 
 class VoiceChatManager:
     """Manages voice chat streaming for Telegram groups and 1-on-1 calls."""
 
-    def __init__(self, client: Client):
-        self.client = client
-        self.pytgcalls = PyTgCalls(client)
-        self.active_calls: Dict[int, bool] = {}  # Group voice chats
-        self.active_private_calls: Dict[str, int] = {}  # call_id -> user_id mapping
-        self.temp_files: Dict[int, str] = {}
+    def __init__(
+        self,
+        clients: List[Client],
+        audio_cache: Optional[AudioCache] = None,
+        http_limit: int = 100,
+        http_limit_per_host: int = 8,
+        http_keepalive_seconds: float = 60.0,
+        http_timeout_seconds: float = 30.0,
+        max_audio_bytes: int = 50 * 1024 * 1024,
+        pretranscode: bool = True,
+        progressive_streaming: bool = False,
+        stream_buffer_bytes: int = 256 * 1024,
+        fifo_dir: Optional[str] = None,
+        batch_concurrency: int = 20,
+        job_retention_seconds: float = 3600.0,
+        max_stream_seconds: float = 600.0,
+        max_concurrent_joins: int = 50,
+        max_concurrent_joins_per_session: int = 10,
+        join_rate_per_session: float = 5.0,
+        join_burst_per_session: int = 10,
+        admission_max_wait_seconds: float = 120.0,
+        retry_max_attempts: int = 4,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 15.0,
+        retry_budget_seconds: float = 60.0,
+        max_flood_wait_seconds: float = 60.0,
+        prewarm_lead_seconds: float = 60.0,
+        prewarm_hold_seconds: float = 300.0,
+        peer_cache_path: Optional[str] = None,
+        peer_cache_max_entries: int = 10000,
+        peer_cache_ttl_seconds: float = 7 * 86400.0,
+        group_call_cache_ttl_seconds: float = 600.0,
+        event_buffer_size: int = 256,
+        idempotency_ttl_seconds: float = 600.0,
+        queue_idle_seconds: float = 30.0,
+        journal_path: Optional[str] = None,
+        pytgcalls_factory: Callable[[Client], PyTgCalls] = PyTgCalls,
+    ):
+        self.sessions = SessionPool([
+            VoiceSession(index, client, pytgcalls_factory(client))
+            for index, client in enumerate(clients)
+        ])
+        self.audio_cache = audio_cache or AudioCache('/tmp/voice-chat-audio-cache')
+        self.http_limit = http_limit
+        self.http_limit_per_host = http_limit_per_host
+        self.http_keepalive_seconds = http_keepalive_seconds
+        self.http_timeout_seconds = http_timeout_seconds
+        self.max_audio_bytes = max_audio_bytes
+        self.pretranscode = pretranscode
+        self.progressive_streaming = progressive_streaming
+        self.stream_buffer_bytes = stream_buffer_bytes
+        self.fifo_dir = fifo_dir
+        self._fifo_dir: Optional[str] = None  # created on the first progressive stream
+        self.batch_concurrency = batch_concurrency
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.tasks = BackgroundTasks()  # shared downloads, stream starts and finishers, timer callbacks
+        self.calls = CallRegistry()  # group voice chats and private calls held
+        self.call_locks = KeyedLocks()  # chat or user id -> lock serializing joins and leaves
+        self.events = CallEventBus(event_buffer_size)
+        self.stream_jobs = StreamJobRegistry(job_retention_seconds, self._on_job_update)
+        self.max_stream_seconds = max_stream_seconds
+        self.timer_wheel = TimerWheel(tasks=self.tasks)
+        self.operations = OperationCache(self.timer_wheel, idempotency_ttl_seconds)
+        self.admission = AdmissionScheduler(
+            self.timer_wheel,
+            max_concurrent=max_concurrent_joins,
+            max_concurrent_per_session=max_concurrent_joins_per_session,
+            rate_per_session=join_rate_per_session,
+            burst_per_session=join_burst_per_session,
+            max_wait_seconds=admission_max_wait_seconds,
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=retry_max_attempts,
+            base_delay=retry_base_delay,
+            max_delay=retry_max_delay,
+            budget_seconds=retry_budget_seconds,
+            max_flood_wait_seconds=max_flood_wait_seconds,
+        )
+        for session in self.sessions:
+            session.pytgcalls.on_stream_end()(self._on_stream_end)
+        self._inflight_downloads: Dict[str, _DownloadFlight] = {}  # url -> shared download
+        self._inflight_transcodes: Dict[str, asyncio.Future] = {}  # digest -> shared transcode
+        self.prewarm_lead_seconds = prewarm_lead_seconds
+        self.prewarm_hold_seconds = prewarm_hold_seconds
+        self.prewarm_scheduled: Set[int] = set()  # chats waiting for their pre-warm join
+        self.playlists = PlaybackQueues()
+        self.queue_idle_seconds = queue_idle_seconds
+        self.journal = CallJournal(journal_path)
+        self._recovery: Optional[asyncio.Task] = None
+        self.draining = False
+        self.drain_deadline: Optional[float] = None  # Unix time the drain gives up waiting
+        self.peers = PeerCache(
+            self.timer_wheel,
+            path=peer_cache_path,
+            max_entries=peer_cache_max_entries,
+            peer_ttl=peer_cache_ttl_seconds,
+            group_call_ttl=group_call_cache_ttl_seconds,
+        )
+
+        ACTIVE_CALLS.set_function(lambda: self.calls.count(CallRecord.GROUP))
+        ACTIVE_PRIVATE_CALLS.set_function(
+            lambda: self.calls.count(CallRecord.PRIVATE, CallRecord.PLAYING, CallRecord.ENDING)
+        )
+        TEMP_FILES.set_function(lambda: self.calls.holding_audio)
 
     async def start(self):
-        """Start the pytgcalls client."""
+        """Start the pytgcalls client of every session."""
         try:
-            await self.pytgcalls.start()
-            logger.info("PyTgCalls client started successfully")
+            self._get_http_session()
+            for session in self.sessions:
+                await self.peers.seed(session.client)
+                self.peers.watch(session.client)
+            await asyncio.gather(*(session.pytgcalls.start() for session in self.sessions))
+            logger.info(f"PyTgCalls started successfully on {len(self.sessions)} session(s)")
+
+            recovered = self.journal.open()
+            if recovered:
+                self._recovery = asyncio.create_task(self._recover(recovered))
         except Exception as e:
             logger.error(f"Failed to start PyTgCalls: {e}")
             raise
@@ -40,285 +217,1745 @@ class VoiceChatManager:
     async def stop(self):
         """Stop the pytgcalls client."""
         try:
-            # Leave all active group voice chats
-            for chat_id in list(self.active_calls.keys()):
-                await self.stop_voice_chat(chat_id)
+            if self._recovery is not None:
+                self._recovery.cancel()
+            # Queued clips stay in the journal, to play after a restart
+            for queue in self.playlists.queues():
+                queue.clear("Service stopping")
+                queue.player.cancel()
 
-            # End all active private calls
-            for call_id in list(self.active_private_calls.keys()):
-                await self.end_call(call_id)
+            # Leave all group voice chats and end all private calls; streams
+            # release their own audio once they have left
+            await self._end_calls([
+                record for record in self.calls.records()
+                if record.kind == CallRecord.GROUP or record.state == CallRecord.PLAYING
+            ])
+            # Then nothing may go on using the sessions or the journal
+            self.timer_wheel.close()
+            await self.tasks.cancel_all()
 
-            # Clean up temp files
-            for temp_file in self.temp_files.values():
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except Exception as e:
-                    logger.warning(f"Failed to remove temp file {temp_file}: {e}")
+            if self._fifo_dir is not None:
+                shutil.rmtree(self._fifo_dir, ignore_errors=True)
+                self.journal.record('fifo_removed', dir=self._fifo_dir)
+                self._fifo_dir = None
+            self.peers.save()
+            self.journal.close()
+            self.events.close()
+
+            logger.info(f"Audio cache stats: {self.audio_cache.stats()}")
+
+            if self.http_session is not None:
+                await self.http_session.close()
+                self.http_session = None
 
             # PyTgCalls 0.9.7 doesn't have a stop method, just disconnect from all calls
             logger.info("PyTgCalls cleanup completed")
         except Exception as e:
             logger.error(f"Error stopping PyTgCalls: {e}")
 
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop taking new work and let the streams in flight finish.
+
+        From now on new streams, clips, broadcasts and calls are refused
+        with ServiceDraining. Clips still waiting in playback queues are
+        dropped but stay in the journal, so they play after a restart, and
+        calls idling on silence are left. Streams already joining or
+        playing and private calls already up run to their end.
+
+        Args:
+            timeout: Seconds to wait for the streams in flight
+
+        Returns:
+            True if every stream finished in time, False if some are still running
+        """
+        self.draining = True
+        self.drain_deadline = time.time() + timeout
+        for queue in self.playlists.queues():
+            queue.clear("Service draining")
+        await self._end_calls([
+            record for record in self.calls.records()
+            if record.state in (CallRecord.WARM, CallRecord.IDLE)
+        ])
+
+        logger.info(f"Draining {self.active_streams()} streams and calls for up to {timeout:.0f}s")
+        while self.active_streams():
+            remaining = self.drain_deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"Drain timed out with {self.active_streams()} streams and calls still running")
+                return False
+            await asyncio.sleep(min(DRAIN_POLL_SECONDS, remaining))
+        logger.info("Drain complete")
+        return True
+
+    def active_streams(self) -> int:
+        """Streams joining or playing and private calls dialing or up: what a drain waits for."""
+        return (
+            self.stream_jobs.active_count()
+            + self.calls.count(CallRecord.PRIVATE, CallRecord.STARTING, CallRecord.PLAYING)
+        )
+
+    def is_live(self) -> bool:
+        """Whether any session is connected to Telegram."""
+        return any(session.is_connected() for session in self.sessions)
+
+    def is_ready(self) -> bool:
+        """Whether new calls can start here: not draining, with a session connected and out of FloodWait."""
+        return not self.draining and any(session.is_usable() for session in self.sessions)
+
+    def _check_accepting(self):
+        if self.draining:
+            raise ServiceDraining("Service is shutting down, not accepting new calls")
+
+    async def _end_calls(self, records: List[CallRecord]):
+        """Leave group calls and hang up private calls, batch_concurrency at a time."""
+        limiter = asyncio.Semaphore(self.batch_concurrency)
+
+        async def end(record: CallRecord):
+            async with limiter:
+                if record.kind == CallRecord.GROUP:
+                    await self._leave_group_call(record)
+                else:
+                    await self._end_private_call(record)
+
+        await asyncio.gather(*(end(record) for record in records), return_exceptions=True)
+
+    async def _recover(self, recovered: JournalState):
+        """
+        Settle the work the journal of the last run left open.
+
+        Its FIFO directories are removed and the calls it was in are left,
+        since their streams died with it. Then broadcasts still ahead are
+        pre-warmed again and queued clips that have not expired play, under
+        the job IDs they were queued with.
+        """
+        try:
+            for path in recovered.fifo_dirs:
+                shutil.rmtree(path, ignore_errors=True)
+                self.journal.record('fifo_removed', dir=path)
+                RECOVERED.labels('fifo_dir', 'removed').inc()
+
+            limiter = asyncio.Semaphore(self.batch_concurrency)
+
+            async def leave(chat_id: int, session_index: int):
+                async with limiter:
+                    await self._leave_orphaned_group_call(self._recovered_session(session_index, chat_id), chat_id)
+
+            async def hang_up(call_id: str, user_id: int, session_index: int):
+                async with limiter:
+                    await self._end_orphaned_call(self._recovered_session(session_index, user_id), call_id, user_id)
+
+            await asyncio.gather(
+                *(leave(chat_id, index) for chat_id, index in recovered.group_calls.items()),
+                *(hang_up(call_id, user_id, index) for call_id, (user_id, index) in recovered.private_calls.items()),
+            )
+
+            now = time.time()
+            for start_at, chat_ids in recovered.broadcasts.items():
+                resumed = start_at > now and self.prepare_broadcast(list(chat_ids), start_at)
+                RECOVERED.labels('broadcast', 'resumed' if resumed else 'expired').inc()
+            for job_id, (chat_id, audio_url, priority, deadline) in recovered.clips.items():
+                if deadline is not None and deadline <= now:
+                    self.journal.record('dequeued', job=job_id)
+                    RECOVERED.labels('clip', 'expired').inc()
+                    continue
+                job = self.stream_jobs.create(chat_id, audio_url, job_id)
+                self._queue_clip(self.playlists.open(chat_id), job, priority, deadline)
+                RECOVERED.labels('clip', 'resumed').inc()
+            logger.info(f"Recovered {len(recovered)} entries left open by the last run")
+        except Exception as e:
+            logger.error(f"Failed to recover work of the last run: {e}")
+
+    def _recovered_session(self, index: int, key: int) -> VoiceSession:
+        """The session a journaled call was on, or the one for key if there are fewer sessions now."""
+        if index < len(self.sessions):
+            return self.sessions.sessions[index]
+        return self.sessions.session_for(key)
+
+    async def _leave_orphaned_group_call(self, session: VoiceSession, chat_id: int):
+        """
+        Leave a group call a previous run stayed in.
+
+        pytgcalls does not know a call joined before a restart, so the
+        session's own participant is looked up and removed through the raw
+        API. A chat joined again meanwhile is left alone.
+        """
+        async with self.call_locks.hold(chat_id):
+            if self.calls.chat(chat_id) is not None:
+                RECOVERED.labels('group_call', 'rejoined').inc()
+                return
+            try:
+                client = session.client
+                peer = await self.peers.resolve(client, chat_id)
+                if isinstance(peer, pyrogram.raw.types.InputPeerChannel):
+                    full = await client.invoke(pyrogram.raw.functions.channels.GetFullChannel(
+                        channel=pyrogram.raw.types.InputChannel(
+                            channel_id=peer.channel_id, access_hash=peer.access_hash
+                        )
+                    ))
+                else:
+                    full = await client.invoke(pyrogram.raw.functions.messages.GetFullChat(chat_id=peer.chat_id))
+
+                call = full.full_chat.call
+                self.peers.set_group_call(chat_id, call is not None)
+                if call is not None:
+                    participants = await client.invoke(pyrogram.raw.functions.phone.GetGroupParticipants(
+                        call=call, ids=[pyrogram.raw.types.InputPeerSelf()], sources=[], offset='', limit=1
+                    ))
+                    for participant in participants.participants:
+                        if participant.is_self:
+                            await client.invoke(pyrogram.raw.functions.phone.LeaveGroupCall(
+                                call=call, source=participant.source
+                            ))
+                            logger.info(f"Left voice chat in {chat_id} joined before the restart")
+                RECOVERED.labels('group_call', 'left').inc()
+            except Exception as e:
+                logger.warning(f"Could not leave voice chat in {chat_id} joined before the restart: {e}")
+                RECOVERED.labels('group_call', 'failed').inc()
+            self.journal.record('left', chat=chat_id)
+
+    async def _end_orphaned_call(self, session: VoiceSession, call_id: str, user_id: int):
+        """Hang up a private call a previous run had up, unless the user has been called again."""
+        async with self.call_locks.hold(user_id):
+            if self.calls.user(user_id) is None:
+                try:
+                    await session.pytgcalls.leave_call(user_id)
+                except Exception as e:
+                    logger.warning(f"Error leaving call with user {user_id} from before the restart: {e}")
+            self.journal.record('hung_up', call=call_id)
+            RECOVERED.labels('private_call', 'ended').inc()
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session used for audio downloads, creating it if needed."""
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.http_limit,
+                limit_per_host=self.http_limit_per_host,
+                keepalive_timeout=self.http_keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self.http_timeout_seconds,
+                    sock_connect=min(10.0, self.http_timeout_seconds),
+                ),
+            )
+        return self.http_session
+
     async def download_audio(self, url: str) -> str:
-        """Download audio file from URL to temporary location."""
+        """
+        Return a local path for the audio at url, coalescing concurrent requests.
+
+        The first caller for a URL starts the download; every caller that
+        arrives while it is in flight awaits the same result or error instead
+        of opening its own connection. Each caller receives its own cache
+        reference and must give it back with self.audio_cache.release().
+        """
+        flight = self._inflight_downloads.get(url)
+        if flight is None:
+            flight = _DownloadFlight(asyncio.get_running_loop().create_future())
+            self._inflight_downloads[url] = flight
+            self.tasks.spawn(self._run_download_flight(url, flight))
+        else:
+            logger.info(f"Joining in-flight download of {url}")
+
+        flight.waiters += 1
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        raise Exception(f"Failed to download audio: HTTP {response.status}")
+            # Shielded so one cancelled RPC does not abort the download for the rest
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            flight.future.add_done_callback(self._release_abandoned_download)
+            raise
+
+    async def _run_download_flight(
+        self,
+        url: str,
+        flight: _DownloadFlight,
+        progressive: Optional[ProgressiveAudio] = None,
+    ):
+        """
+        Perform a shared download and hand one cache reference to each waiter.
+
+        With progressive audio, the download is the one already playing in a
+        call, and its copy goes into the cache when it completes. Only when it
+        does not complete is the audio fetched again for the waiters.
+        """
+        try:
+            audio_path = None
+            if progressive is not None:
+                await progressive.download_done.wait()
+                audio_path = self._store_progressive_copy(url, progressive)
+                if audio_path is None and flight.waiters == 0:
+                    del self._inflight_downloads[url]
+                    flight.future.cancel()
+                    return
+            if audio_path is None:
+                audio_path = await self._fetch_audio(url)
+        except asyncio.CancelledError:
+            del self._inflight_downloads[url]
+            flight.future.cancel()
+            raise
+        except Exception as e:
+            del self._inflight_downloads[url]
+            if flight.waiters == 0:
+                # Nobody to hand the error to, and an unretrieved one would be reported
+                flight.future.cancel()
+            else:
+                flight.future.set_exception(e)
+            return
+
+        # No awaits from here on, so no caller can join after references are counted
+        if flight.waiters == 0:
+            self.audio_cache.release(audio_path)
+        elif flight.waiters > 1:
+            self.audio_cache.retain(audio_path, flight.waiters - 1)
+        del self._inflight_downloads[url]
+        flight.future.set_result(audio_path)
+
+    def _store_progressive_copy(self, url: str, progressive: ProgressiveAudio) -> Optional[str]:
+        """Move the copy of a completed progressive download into the audio cache."""
+        if progressive.copy_digest is None:
+            return None
+        try:
+            return self.audio_cache.store(
+                url,
+                progressive.copy_path,
+                etag=progressive.etag,
+                last_modified=progressive.last_modified,
+                digest=progressive.copy_digest,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache progressive download of {url}: {e}")
+            return None
+
+    def _release_abandoned_download(self, future: asyncio.Future):
+        """Give back the reference of a caller that was cancelled while waiting."""
+        if not future.cancelled() and future.exception() is None:
+            self.audio_cache.release(future.result())
 
-                    # Create temp file
-                    temp_file = tempfile.NamedTemporaryFile(
-                        delete=False,
-                        suffix='.mp3'
+    async def _fetch_audio(self, url: str) -> str:
+        """
+        Return a local path for the audio at url, using the audio cache.
+
+        The origin is only contacted when the cached copy is stale, and then
+        with a conditional request so unchanged files are not transferred
+        again. The returned path holds a cache reference that must be given
+        back with self.audio_cache.release().
+        """
+        started = time.perf_counter()
+        try:
+            entry = self.audio_cache.lookup(url)
+            if entry is not None and self.audio_cache.is_fresh(entry):
+                logger.info(f"Serving audio for {url} from cache")
+                DOWNLOAD_SECONDS.labels('hit').observe(time.perf_counter() - started)
+                return self.audio_cache.hit(entry)
+
+            headers = self.audio_cache.conditional_headers(entry)
+            session = self._get_http_session()
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    logger.info(f"Cached audio for {url} is still valid")
+                    DOWNLOAD_SECONDS.labels('revalidated').observe(time.perf_counter() - started)
+                    return self.audio_cache.hit(entry, revalidated=True)
+
+                if response.status != 200:
+                    raise Exception(f"Failed to download audio: HTTP {response.status}")
+
+                if response.content_length and response.content_length > self.max_audio_bytes:
+                    raise Exception(
+                        f"Audio too large: {response.content_length} bytes "
+                        f"(limit {self.max_audio_bytes})"
                     )
-                    temp_path = temp_file.name
 
-                    # Write audio data
-                    content = await response.read()
-                    temp_file.write(content)
-                    temp_file.close()
+                # Stream audio data to disk, hashing as we go
+                temp_path = self.audio_cache.create_temp_file()
+                try:
+                    sha = hashlib.sha256()
+                    size = 0
+                    with open(temp_path, 'wb') as temp_file:
+                        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            size += len(chunk)
+                            if size > self.max_audio_bytes:
+                                raise Exception(
+                                    f"Audio exceeded size limit of {self.max_audio_bytes} bytes"
+                                )
+                            sha.update(chunk)
+                            temp_file.write(chunk)
 
-                    logger.info(f"Downloaded audio to {temp_path}")
-                    return temp_path
+                    audio_path = self.audio_cache.store(
+                        url,
+                        temp_path,
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified'),
+                        digest=sha.hexdigest(),
+                    )
+                except Exception:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+
+                logger.info(f"Downloaded {size} bytes of audio to {audio_path}")
+                DOWNLOAD_SECONDS.labels('downloaded').observe(time.perf_counter() - started)
+                return audio_path
         except Exception as e:
             logger.error(f"Failed to download audio from {url}: {e}")
+            DOWNLOAD_SECONDS.labels('error').observe(time.perf_counter() - started)
             raise
 
-    async def stream_audio(self, chat_id: int, audio_url: str) -> bool:
-        """Stream audio to a voice chat."""
+    def _use_progressive(self, url: str) -> bool:
+        """
+        Whether to play url while it downloads instead of from the audio cache.
+
+        Only the first request for an uncached URL plays progressively; any
+        request arriving while that download is in flight joins it instead.
+        """
+        return (
+            self.progressive_streaming
+            and url not in self._inflight_downloads
+            and self.audio_cache.lookup(url) is None
+        )
+
+    async def open_progressive_audio(self, url: str) -> ProgressiveAudio:
+        """
+        Start downloading the audio at url for playback while it downloads.
+
+        The download becomes the shared download for url: callers asking
+        for the same URL meanwhile join it through download_audio() and get
+        the cached copy once it completes, instead of each opening their own
+        connection and ffmpeg. The caller must close() the returned audio
+        once the call is over.
+        """
+        started = time.perf_counter()
+        if self._fifo_dir is None:
+            self._fifo_dir = tempfile.mkdtemp(prefix='voice-chat-fifo-', dir=self.fifo_dir)
+            self.journal.record('fifo', dir=self._fifo_dir)
+        audio = ProgressiveAudio(
+            url,
+            os.path.join(self._fifo_dir, f"{uuid.uuid4().hex}.pcm"),
+            buffer_bytes=self.stream_buffer_bytes,
+            max_bytes=self.max_audio_bytes,
+            copy_path=self.audio_cache.create_temp_file(),
+        )
+        flight = _DownloadFlight(asyncio.get_running_loop().create_future())
+        self._inflight_downloads[url] = flight
+        self.tasks.spawn(self._run_download_flight(url, flight, audio))
         try:
-            logger.info(f"Starting audio stream for chat {chat_id}")
+            # Reading follows playback, so only stalls count against the timeout
+            await audio.open(
+                self._get_http_session(),
+                aiohttp.ClientTimeout(
+                    total=None,
+                    sock_connect=min(10.0, self.http_timeout_seconds),
+                    sock_read=self.http_timeout_seconds,
+                ),
+            )
+        except asyncio.CancelledError:
+            audio.close()
+            raise
+        except Exception as e:
+            logger.error(f"Failed to download audio from {url}: {e}")
+            DOWNLOAD_SECONDS.labels('error').observe(time.perf_counter() - started)
+            audio.close()
+            raise
+        DOWNLOAD_SECONDS.labels('progressive').observe(time.perf_counter() - started)
+        return audio
+
+    async def prepare_stream(self, audio_path: str) -> InputStream:
+        """
+        Build the pytgcalls input stream for a cached audio file.
+
+        Each distinct file is decoded once into raw PCM stored next to it in
+        the audio cache, so calls play it without spawning their own ffmpeg.
+        Falls back to piping the original file if transcoding fails.
+        """
+        if not self.pretranscode:
+            return AudioPiped(audio_path)
+
+        digest = self.audio_cache.digest_for(audio_path)
+        try:
+            if not self.audio_cache.has_variant(digest, PCM_SUFFIX):
+                transcode = self._inflight_transcodes.get(digest)
+                if transcode is None:
+                    transcode = asyncio.ensure_future(self._transcode_audio(audio_path, digest))
+                    self._inflight_transcodes[digest] = transcode
+                await asyncio.shield(transcode)
+
+            pcm_path = self.audio_cache.variant_path(digest, PCM_SUFFIX)
+            return InputStream(InputAudioStream(pcm_path, HighQualityAudio()))
+        except Exception as e:
+            logger.warning(f"Falling back to piped audio for {audio_path}: {e}")
+            return AudioPiped(audio_path)
+
+    async def _transcode_audio(self, audio_path: str, digest: str):
+        """Transcode a cached file to PCM and register the result with the cache."""
+        try:
+            pcm_path = self.audio_cache.variant_path(digest, PCM_SUFFIX)
+            await transcode_to_pcm(audio_path, pcm_path, HighQualityAudio().bitrate)
+            self.audio_cache.add_variant(digest, PCM_SUFFIX)
+        finally:
+            del self._inflight_transcodes[digest]
+
+    async def stream_audio(
+        self,
+        chat_id: int,
+        audio_url: str,
+        priority: int = Priority.AZAN,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> StreamJob:
+        """
+        Start streaming audio to a voice chat.
+
+        Returns as soon as the group call has been joined (or joining has
+        failed). Playback continues in the background and can be followed
+        through the returned job. The join waits for admission at the given
+        priority and fails if it cannot start before deadline (Unix time).
+        With progressive streaming, audio that is not cached yet plays
+        while it downloads. If another stream is playing in the chat, or
+        clips are queued there, the stream is queued behind them as with
+        enqueue_audio() and its job is returned queued, so it never cuts
+        off the audio playing. A request repeating the idempotency key of
+        one for the same chat that is still joining, queued, or that
+        started streaming, gets that request's job instead of streaming
+        again. The join carries on if the caller goes away, so a call is
+        never left half joined. Raises ServiceDraining once the service is
+        draining.
+        """
+        self._check_accepting()
+        if idempotency_key:
+            return await self.operations.run(
+                ('stream', chat_id, idempotency_key),
+                lambda: self._stream_or_queue(chat_id, audio_url, priority, deadline),
+                lambda job: job.state != StreamJob.FAILED,
+            )
+        return await asyncio.shield(self.tasks.spawn(self._stream_or_queue(chat_id, audio_url, priority, deadline)))
+
+    async def _stream_or_queue(
+        self,
+        chat_id: int,
+        audio_url: str,
+        priority: int,
+        deadline: Optional[float],
+    ) -> StreamJob:
+        """Start a stream in a chat, or queue it behind the audio playing there."""
+        job = self.stream_jobs.create(chat_id, audio_url)
+        if self._chat_busy(chat_id):
+            logger.info(f"Chat {chat_id} is playing audio, queueing job {job.job_id}")
+            return self._queue_clip(self.playlists.open(chat_id), job, priority, deadline)
+        return await self._stream_audio(job, priority, deadline)
+
+    async def _stream_audio(self, job: StreamJob, priority: int, deadline: Optional[float]) -> StreamJob:
+        """Download the audio of a stream job and start it in the job's chat."""
+        chat_id, audio_url = job.chat_id, job.audio_url
+        try:
+            logger.info(f"Starting audio stream for chat {chat_id} (job {job.job_id})")
+
+            if self._use_progressive(audio_url):
+                audio = await self.open_progressive_audio(audio_url)
+                await self._start_prepared_stream(
+                    job, None, audio.stream, priority=priority, deadline=deadline, progressive=audio
+                )
+                return job
 
             # Download audio file
             audio_path = await self.download_audio(audio_url)
-            self.temp_files[chat_id] = audio_path
+        except asyncio.CancelledError:
+            job.update(StreamJob.CANCELLED, _REQUEST_CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream audio in chat {chat_id}: {e}")
+            job.update(StreamJob.FAILED, f"Failed to download audio: {e}")
+            return job
 
+        try:
             # Create audio stream
-            audio_stream = AudioPiped(audio_path)
+            audio_stream = await self.prepare_stream(audio_path)
+            self.audio_cache.retain(audio_path)
+            await self._start_prepared_stream(
+                job, audio_path, audio_stream, priority=priority, deadline=deadline
+            )
+            return job
+        finally:
+            self.audio_cache.release(audio_path)
 
-            # Join voice chat and stream
-            try:
-                await self.pytgcalls.join_group_call(
-                    chat_id,
-                    audio_stream
+    async def stream_audio_batch(
+        self,
+        chat_ids: List[int],
+        audio_url: str,
+        max_concurrency: Optional[int] = None,
+        priority: int = Priority.AZAN,
+        deadline: Optional[float] = None,
+    ) -> Dict[int, StreamJob]:
+        """
+        Start streaming the same audio to many voice chats.
+
+        The audio is downloaded and prepared once, then every chat streams
+        from that one asset. At most max_concurrency chats are joining at any
+        moment; playback itself is not limited. A chat playing other audio
+        gets the stream queued behind it, as in stream_audio(). Returns once
+        every other chat has joined or failed to; the joins carry on if the
+        caller goes away first.
+
+        Args:
+            chat_ids: Group chat IDs to stream to
+            audio_url: URL of audio file to stream
+            max_concurrency: Concurrent joins, defaults to batch_concurrency
+            priority: Admission priority of the joins
+            deadline: Unix time after which chats that have not started are given up
+
+        Returns:
+            Mapping of chat_id to its stream job
+
+        Raises:
+            ServiceDraining: If the service is draining
+        """
+        self._check_accepting()
+        return await asyncio.shield(self.tasks.spawn(
+            self._stream_audio_batch(chat_ids, audio_url, max_concurrency, priority, deadline)
+        ))
+
+    async def _stream_audio_batch(
+        self,
+        chat_ids: List[int],
+        audio_url: str,
+        max_concurrency: Optional[int],
+        priority: int,
+        deadline: Optional[float],
+    ) -> Dict[int, StreamJob]:
+        chat_ids = list(dict.fromkeys(chat_ids))
+        jobs = {chat_id: self.stream_jobs.create(chat_id, audio_url) for chat_id in chat_ids}
+        logger.info(f"Starting batch audio stream for {len(chat_ids)} chats")
+
+        try:
+            audio_path = await self.download_audio(audio_url)
+        except asyncio.CancelledError:
+            for job in jobs.values():
+                job.update(StreamJob.CANCELLED, _REQUEST_CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Failed to prepare batch stream from {audio_url}: {e}")
+            for job in jobs.values():
+                job.update(StreamJob.FAILED, f"Failed to download audio: {e}")
+            return jobs
+
+        try:
+            audio_stream = await self.prepare_stream(audio_path)
+            join_limiter = asyncio.Semaphore(max_concurrency or self.batch_concurrency)
+
+            async def start_one(job: StreamJob):
+                if self._chat_busy(job.chat_id):
+                    self._queue_clip(self.playlists.open(job.chat_id), job, priority, deadline)
+                    return
+                self.audio_cache.retain(audio_path)
+                await self._start_prepared_stream(
+                    job, audio_path, audio_stream, join_limiter, priority, deadline
                 )
-                self.active_calls[chat_id] = True
-                logger.info(f"Successfully started streaming in chat {chat_id}")
 
-                # Wait for stream to complete
-                await self._wait_for_stream_end(chat_id)
+            await asyncio.gather(*(start_one(job) for job in jobs.values()))
+            joined = sum(1 for job in jobs.values() if job.state == StreamJob.PLAYING)
+            logger.info(f"Batch audio stream joined {joined}/{len(chat_ids)} chats")
+            return jobs
+        except asyncio.CancelledError:
+            # Chats whose start was cancelled before it ran; the others settled their own jobs
+            for job in jobs.values():
+                if job.state == StreamJob.JOINING:
+                    job.update(StreamJob.CANCELLED, _REQUEST_CANCELLED)
+            raise
+        finally:
+            self.audio_cache.release(audio_path)
 
-                return True
+    def get_stream_job(self, job_id: str) -> Optional[StreamJob]:
+        """Look up a stream job by ID."""
+        return self.stream_jobs.get(job_id)
 
-            except AlreadyJoinedError:
-                logger.warning(f"Already joined voice chat in {chat_id}, stopping and retrying")
-                await self.stop_voice_chat(chat_id)
-                await asyncio.sleep(1)
-                # Retry
-                await self.pytgcalls.join_group_call(chat_id, audio_stream)
-                self.active_calls[chat_id] = True
-                logger.info(f"Successfully started streaming in chat {chat_id} (retry)")
-                await self._wait_for_stream_end(chat_id)
-                return True
+    def enqueue_audio(
+        self,
+        chat_id: int,
+        audio_urls: List[str],
+        priority: int = Priority.AZAN,
+        deadline: Optional[float] = None,
+    ) -> Tuple[List[StreamJob], int]:
+        """
+        Queue audio clips to play one after another in a chat's voice chat.
 
-            except NoActiveGroupCall:
-                logger.warning(f"No active voice chat in {chat_id}, attempting to start one...")
-                # Try to start a video chat first
-                if await self.start_voice_chat(chat_id):
-                    logger.info(f"Started video chat in {chat_id}, retrying stream...")
-                    await asyncio.sleep(2)  # Give it time to initialize
-
-                    # Retry joining and streaming
-                    try:
-                        await self.pytgcalls.join_group_call(
-                            chat_id,
-                            audio_stream
-                        )
-                        self.active_calls[chat_id] = True
-                        logger.info(f"Successfully started streaming in chat {chat_id} (after creating video chat)")
-                        await self._wait_for_stream_end(chat_id)
-                        return True
-                    except Exception as retry_error:
-                        logger.error(f"Failed to join after creating video chat: {retry_error}")
-                        return False
-                else:
-                    logger.error(f"Could not start video chat in {chat_id}")
-                    logger.info("Bot may not have permission to start video chats. Please ensure bot is admin with 'Manage Video Chats' permission")
-                    return False
+        Clips play in the order queued, each once the stream before it,
+        queued or not, has ended. The chat is joined for the first clip and
+        every later one only swaps the stream; between clips and for
+        queue_idle_seconds after the last one, the call idles on silence
+        instead of being left. Each clip is followed through its stream job.
+
+        Args:
+            chat_id: Group chat ID to play in
+            audio_urls: URLs of the clips, in play order
+            priority: Admission priority if the chat has to be joined
+            deadline: Unix time after which clips that have not started are given up
+
+        Returns:
+            Tuple of (stream jobs of the clips, clips queued or playing ahead of them)
+
+        Raises:
+            ServiceDraining: If the service is draining
+        """
+        self._check_accepting()
+        queue = self.playlists.open(chat_id)
+        ahead = len(queue) + (queue.current is not None and not queue.current.finished)
+        jobs = [
+            self._queue_clip(queue, self.stream_jobs.create(chat_id, audio_url), priority, deadline)
+            for audio_url in audio_urls
+        ]
+        logger.info(f"Queued {len(jobs)} clips in chat {chat_id} behind {ahead}")
+        return jobs, ahead
+
+    def _queue_clip(
+        self,
+        queue: PlaybackQueue,
+        job: StreamJob,
+        priority: int,
+        deadline: Optional[float],
+    ) -> StreamJob:
+        """Add a clip's job to the end of a queue, starting the queue's player if it is not running."""
+        job.update(StreamJob.QUEUED, f"Queued at position {len(queue) + 1}")
+        queue.clips.append(QueuedClip(job, priority, deadline))
+        self.journal.record(
+            'queued', job=job.job_id, chat=job.chat_id, url=job.audio_url, priority=priority, deadline=deadline
+        )
+        if queue.player is None:
+            queue.player = asyncio.create_task(self._play_queue(queue))
+        return job
+
+    def skip_audio(self, chat_id: int) -> bool:
+        """End the queued clip playing in a chat so the next one starts; False if none is playing."""
+        queue = self.playlists.get(chat_id)
+        record = self.calls.chat(chat_id)
+        if queue is None or queue.current is None or record is None or record.job_id != queue.current.job_id:
+            return False
+        logger.info(f"Skipping clip {record.job_id} in chat {chat_id}")
+        self._resolve_stream_end(record.stream_end, "Skipped")
+        return True
+
+    def clear_queue(self, chat_id: int) -> int:
+        """Drop the clips waiting in a chat's queue; the one playing finishes. Returns how many were dropped."""
+        queue = self.playlists.get(chat_id)
+        if queue is None:
+            return 0
+        cleared = queue.clear("Removed from the queue")
+        for job in cleared:
+            self.journal.record('dequeued', job=job.job_id)
+        return len(cleared)
 
+    async def _play_queue(self, queue: PlaybackQueue):
+        """Play the clips of a chat's queue in turn until it runs empty."""
+        chat_id = queue.chat_id
+        try:
+            while True:
+                await self._wait_for_chat_stream(chat_id)
+                if not queue.clips:
+                    break
+                clip = queue.clips.popleft()
+                self.journal.record('dequeued', job=clip.job.job_id)
+                if clip.deadline is not None and time.time() > clip.deadline:
+                    clip.job.update(StreamJob.FAILED, "Deadline passed while queued")
+                    continue
+                queue.current = clip.job
+                clip.job.update(StreamJob.JOINING, "Joining voice chat")
+                await self._stream_audio(clip.job, clip.priority, clip.deadline)
+        except Exception as e:
+            logger.error(f"Playback queue of chat {chat_id} stopped: {e}")
+        finally:
+            self.playlists.close(queue)
+            for job in queue.clear("Playback queue stopped"):
+                self.journal.record('dequeued', job=job.job_id)
+
+    def _chat_busy(self, chat_id: int) -> bool:
+        """Whether a new stream in a chat has to queue behind audio playing or queued there."""
+        return chat_id in self.playlists or self._chat_stream_job(chat_id) is not None
+
+    def _chat_stream_job(self, chat_id: int) -> Optional[StreamJob]:
+        """The stream job still playing in a chat, if any."""
+        record = self.calls.chat(chat_id)
+        job = self.stream_jobs.get(record.job_id) if record is not None else None
+        return job if job is not None and not job.finished else None
+
+    async def _wait_for_chat_stream(self, chat_id: int, deadline: Optional[float] = None):
+        """
+        Wait until no stream job is playing in a chat.
+
+        Raises:
+            AdmissionRejected: If the deadline passes first
+        """
+        while True:
+            job = self._chat_stream_job(chat_id)
+            if job is None:
+                return
+            timeout = None if deadline is None else deadline - time.time()
+            try:
+                if timeout is not None and timeout <= 0:
+                    raise asyncio.TimeoutError()
+                await asyncio.wait_for(job.wait_for_change(job.version), timeout)
+            except asyncio.TimeoutError:
+                raise AdmissionRejected(
+                    f"Deadline passed while another stream played in chat {chat_id}"
+                ) from None
+
+    async def _start_prepared_stream(
+        self,
+        job: StreamJob,
+        audio_path: Optional[str],
+        audio_stream: InputStream,
+        join_limiter: Optional[asyncio.Semaphore] = None,
+        priority: int = Priority.AZAN,
+        deadline: Optional[float] = None,
+        progressive: Optional[ProgressiveAudio] = None,
+    ):
+        """
+        Join a voice chat with a prepared stream and hand playback to a background task.
+
+        Takes ownership of one cache reference on audio_path, which is
+        released when the stream is over, or of the progressive audio
+        playing instead, which is then closed. If the request is cancelled
+        before the stream starts, the job is cancelled and the audio
+        released at once.
+        """
+        chat_id = job.chat_id
+        try:
+            if self._chat_stream_job(chat_id) is not None:
+                # Waited for outside the join limiter, so a batch keeps joining other chats
+                job.update(StreamJob.QUEUED, "Waiting for the stream playing in the chat")
+                await self._wait_for_chat_stream(chat_id, deadline)
+                job.update(StreamJob.JOINING, "Joining voice chat")
+            if join_limiter is None:
+                record = await self._join_group_call(chat_id, audio_stream, priority, deadline)
+            else:
+                async with join_limiter:
+                    record = await self._join_group_call(chat_id, audio_stream, priority, deadline)
+        except AdmissionRejected as e:
+            logger.warning(f"Not joining chat {chat_id}: {e}")
+            job.update(StreamJob.FAILED, str(e))
+            self._release_audio(audio_path, progressive)
+            return
+        except asyncio.CancelledError:
+            job.update(StreamJob.CANCELLED, _REQUEST_CANCELLED)
+            self._release_audio(audio_path, progressive)
+            raise
         except Exception as e:
             logger.error(f"Failed to stream audio in chat {chat_id}: {e}")
-            return False
+            record = None
+
+        if record is None:
+            job.update(StreamJob.FAILED, "Failed to join voice chat")
+            self._release_audio(audio_path, progressive)
+            return
+
+        # Registered before any await so an early end event cannot be missed;
+        # the audio of a stream that played in the chat before is swapped out
+        replaced = record.stream_end
+        previous_audio = self.calls.take_audio(record)
+        self.calls.hold_audio(record, audio_path, progressive)
+        record.job_id = job.job_id
+        record.stream_end = asyncio.get_running_loop().create_future()
+        self._resolve_stream_end(replaced, "Cut off by a newer stream")
+        self._release_audio(*previous_audio)
+        job.update(StreamJob.PLAYING, "Streaming audio")
+        TIME_TO_FIRST_AUDIO_SECONDS.labels('group').observe(job.started_at - job.created_at)
+        self.tasks.spawn(self._finish_stream(job, record))
+
+    async def _finish_stream(self, job: StreamJob, record: CallRecord):
+        """Wait for a stream to end, leave the call and complete its job."""
+        progressive = record.progressive
+        try:
+            cut_off = await self._wait_for_stream_end(record)
+            if cut_off is not None:
+                job.update(StreamJob.CANCELLED, cut_off)
+                return
+            if progressive is not None and progressive.error is not None:
+                raise progressive.error
+            job.update(StreamJob.COMPLETED, "Successfully streamed azan")
+        except asyncio.CancelledError:
+            job.update(StreamJob.CANCELLED, "Service stopping")
+            raise
+        except Exception as e:
+            logger.error(f"Stream in chat {job.chat_id} ended with error: {e}")
+            job.update(StreamJob.FAILED, f"Stream failed: {e}")
         finally:
-            # Cleanup
-            if chat_id in self.temp_files:
+            # A newer stream took over the call and released this one's audio
+            if record.job_id == job.job_id:
+                self._release_audio(*self.calls.take_audio(record))
+
+    def _release_audio(self, audio_path: Optional[str], progressive: Optional[ProgressiveAudio] = None):
+        """Give back the cached audio a call held, or close the download it played from."""
+        if progressive is not None:
+            progressive.close()
+        if audio_path is not None:
+            self.audio_cache.release(audio_path)
+
+    def _on_job_update(self, job: StreamJob):
+        """Publish the call event for a stream job state change."""
+        kind = _JOB_EVENTS.get(job.state)
+        if kind is not None:
+            self.events.publish(CallEvent(kind, chat_id=job.chat_id, job_id=job.job_id, message=job.message))
+
+    async def _join_group_call(
+        self,
+        chat_id: int,
+        audio_stream: InputStream,
+        priority: int = Priority.AZAN,
+        deadline: Optional[float] = None,
+        state: str = CallRecord.PLAYING,
+    ) -> Optional[CallRecord]:
+        """
+        Join a group voice chat on the session assigned to it, retrying failures.
+
+        Joins and leaves of a chat are serialized, so concurrent requests
+        for it never join twice. A stream still playing in the chat is
+        waited for, so it is never cut off. A call already held in the
+        chat, pre-warmed or idle, then only has its stream swapped;
+        pre-warming a chat that has a call returns that call unchanged. Every
+        attempt waits for admission on its session first. A FloodWait
+        pauses the session and moves the chat to another one, a call left
+        over in the chat is left and a missing voice chat is started before
+        joining again, and network or server errors are retried with jittered
+        backoff, all within the chat's retry budget. A chat the peer cache
+        knows has no voice chat gets one started before the first join.
+
+        Returns the registered call, or None if joining gave up.
+
+        Raises:
+            AdmissionRejected: If the deadline passes before the chat is free
+        """
+        while True:
+            async with self.call_locks.hold(chat_id):
+                if state == CallRecord.WARM or self._chat_stream_job(chat_id) is None:
+                    return await self._join_group_call_locked(chat_id, audio_stream, priority, deadline, state)
+            await self._wait_for_chat_stream(chat_id, deadline)
+
+    async def _join_group_call_locked(
+        self,
+        chat_id: int,
+        audio_stream: InputStream,
+        priority: int,
+        deadline: Optional[float],
+        state: str,
+    ) -> Optional[CallRecord]:
+        started = time.perf_counter()
+        record = self.calls.chat(chat_id)
+        if record is not None and state == CallRecord.WARM:
+            return record
+        if record is not None:
+            outcome = _SWAP_OUTCOMES[record.state]
+            if await self._swap_call_stream(record, audio_stream):
+                JOIN_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+                return record
+            if self.calls.holds(record):
+                # Not even leaving worked; joining again takes the chat over
+                self._drop_group_call(record)
+
+        budget = self.retry_policy.budget(deadline)
+        session = self.sessions.assign(chat_id)
+        create_call = self.peers.has_group_call(chat_id) is False
+        cached_no_call = create_call
+        call_started = False
+        try:
+            while True:
                 try:
-                    temp_file = self.temp_files[chat_id]
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                    del self.temp_files[chat_id]
+                    async with self.admission.slot(session, priority, deadline):
+                        if create_call:
+                            await self._create_group_call(session, chat_id)
+                        else:
+                            await session.pytgcalls.join_group_call(chat_id, audio_stream)
+                            joined = True
+                            break
+                    self.peers.set_group_call(chat_id, True)
+                    # A new voice chat needs a moment before it can be joined
+                    create_call = False
+                    call_started = True
+                    reason = 'voice_chat_started'
+                    delay = budget.backoff()
+                except AdmissionRejected:
+                    raise
+                except FloodWait as e:
+                    reason = 'flood_wait'
+                    moved = self._move_after_flood_wait(chat_id, session, e, budget)
+                    delay = None if moved is None else 0.0
+                    session = moved or session
+                except AlreadyJoinedError:
+                    ERRORS.labels('AlreadyJoinedError').inc()
+                    logger.warning(f"Already joined voice chat in {chat_id}, leaving before retrying")
+                    await self._leave_stale_call(session, chat_id)
+                    reason = 'already_joined'
+                    delay = budget.backoff()
+                except NoActiveGroupCall:
+                    ERRORS.labels('NoActiveGroupCall').inc()
+                    reason = 'no_active_group_call'
+                    self.peers.set_group_call(chat_id, False)
+                    cached_no_call = False
+                    if call_started:
+                        delay = budget.backoff()
+                    else:
+                        logger.warning(f"No active voice chat in {chat_id}, attempting to start one...")
+                        create_call = True
+                        delay = 0.0 if budget.wait(0) else None
                 except Exception as e:
-                    logger.warning(f"Failed to cleanup temp file: {e}")
+                    if cached_no_call and not is_transient(e):
+                        # The chat may have a voice chat the cache does not know about
+                        logger.warning(f"Could not start voice chat in {chat_id} ({e}), joining instead")
+                        self.peers.forget_group_call(chat_id)
+                        create_call = cached_no_call = False
+                        reason = 'stale_group_call'
+                        delay = 0.0 if budget.wait(0) else None
+                    elif not is_transient(e):
+                        if create_call:
+                            logger.error(f"Could not start video chat in {chat_id}: {e}")
+                            logger.info("Bot may not have permission to start video chats. Please ensure bot is admin with 'Manage Video Chats' permission")
+                        raise
+                    else:
+                        logger.warning(f"Transient error joining chat {chat_id}: {e}")
+                        reason = 'transient'
+                        delay = budget.backoff()
+
+                if not await self._retry_after(chat_id, session, reason, delay):
+                    joined = False
+                    break
+        except (Exception, asyncio.CancelledError):
+            JOIN_SECONDS.labels('error').observe(time.perf_counter() - started)
+            self.sessions.release(chat_id)
+            raise
+
+        JOIN_SECONDS.labels('joined' if joined else 'failed').observe(time.perf_counter() - started)
+        if not joined:
+            self.sessions.release(chat_id)
+            return None
+
+        record = self.calls.add(CallRecord(
+            CallRecord.GROUP, chat_id=chat_id, state=state, session=session, deadline=deadline
+        ))
+        self.journal.record('joined', chat=chat_id, session=session.index)
+        self.events.publish(CallEvent(CallEvent.JOINED, chat_id=chat_id, message=f"Joined on {session.name}"))
+        self.peers.set_group_call(chat_id, True)
+        await self._remember_peer(session, chat_id)
+        logger.info(f"Successfully started streaming in chat {chat_id} on {session.name}")
+        return record
+
+    def _move_after_flood_wait(
+        self,
+        key: int,
+        session: VoiceSession,
+        error: FloodWait,
+        budget: RetryBudget,
+    ) -> Optional[VoiceSession]:
+        """
+        Pause a session that hit a FloodWait and pick the session to retry key on.
+
+        Returns None if waiting for a free session does not fit the retry
+        budget. Admission holds the retry until the new session's wait, if
+        any, is over.
+        """
+        ERRORS.labels('FloodWait').inc()
+        self.sessions.report_flood_wait(session, error.value)
+        self.sessions.release(key)
+        session = self.sessions.assign(key)
+        if not budget.wait(session.flood_wait_remaining):
+            return None
+        return session
+
+    async def _retry_after(
+        self,
+        key: int,
+        session: VoiceSession,
+        reason: str,
+        delay: Optional[float],
+    ) -> bool:
+        """Sleep before the next attempt for key; False if its retry budget is spent."""
+        if delay is None:
+            RETRIES_EXHAUSTED.labels(reason).inc()
+            logger.error(f"Giving up on {key} after {reason}: retry budget spent")
+            return False
+
+        RETRIES.labels(reason).inc()
+        logger.info(f"Retrying {key} on {session.name} in {delay:.1f}s after {reason}")
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
 
-    async def _wait_for_stream_end(self, chat_id: int):
-        """Wait for stream to end naturally."""
+    async def _leave_stale_call(self, session: VoiceSession, chat_id: int):
+        """Leave a call a session still has in a chat so it can be joined again."""
+        record = self.calls.chat(chat_id)
+        if record is not None:
+            await self._leave_group_call_locked(record)
+            self.sessions.assign(chat_id, session)
+            return
         try:
-            # Wait for stream to complete (max 10 minutes)
-            max_wait = 600  # 10 minutes
-            wait_time = 0
+            await session.pytgcalls.leave_call(chat_id)
+        except Exception as e:
+            logger.warning(f"Error leaving stale call in {chat_id}: {e}")
 
-            while wait_time < max_wait:
-                if chat_id not in self.active_calls:
-                    break
+    def prepare_broadcast(
+        self,
+        chat_ids: List[int],
+        start_at: float,
+        lead_seconds: Optional[float] = None,
+    ) -> int:
+        """
+        Schedule joining group calls ahead of a broadcast.
 
-                # Check if still streaming
-                try:
-                    call = await self.pytgcalls.get_call(chat_id)
-                    if call is None or call.status == "NOT_PLAYING":
-                        break
-                except:
-                    break
+        Each chat is joined lead_seconds before start_at, creating its voice
+        chat if needed, and idles on silence. Streaming to it afterwards only
+        swaps the stream instead of joining. Calls that no stream reaches
+        within the hold time after start_at are left again.
 
-                await asyncio.sleep(1)
-                wait_time += 1
+        Args:
+            chat_ids: Group chat IDs the broadcast will stream to
+            start_at: Unix time the broadcast starts
+            lead_seconds: How long before the start to join, defaults to prewarm_lead_seconds
 
-            # Leave the call
-            await self.stop_voice_chat(chat_id)
+        Returns:
+            Number of chats scheduled for pre-warming
+
+        Raises:
+            ServiceDraining: If the service is draining
+        """
+        self._check_accepting()
+        if lead_seconds is None:
+            lead_seconds = self.prewarm_lead_seconds
+        now = time.time()
+        if start_at <= now:
+            return 0
+
+        chat_ids = [
+            chat_id for chat_id in dict.fromkeys(chat_ids)
+            if self.calls.chat(chat_id) is None and chat_id not in self.prewarm_scheduled
+        ]
+        if not chat_ids:
+            return 0
+
+        self.prewarm_scheduled.update(chat_ids)
+        self.journal.record('broadcast', chats=chat_ids, start_at=start_at)
+        self.timer_wheel.schedule(
+            max(0.0, start_at - lead_seconds - now),
+            lambda: self._prewarm(chat_ids, start_at)
+        )
+        logger.info(f"Scheduled pre-warming of {len(chat_ids)} chats for broadcast at {start_at}")
+        return len(chat_ids)
+
+    async def _prewarm(self, chat_ids: List[int], start_at: float):
+        """Join chats on silence so a broadcast at start_at only swaps streams."""
+        self.prewarm_scheduled.difference_update(chat_ids)
+        if self.draining:
+            # The journal keeps the broadcast for the next run to pre-warm
+            return
+        chat_ids = [chat_id for chat_id in chat_ids if self.calls.chat(chat_id) is None]
+        if not chat_ids:
+            return
+
+        try:
+            silence = self._silence_stream()
+        except Exception as e:
+            logger.error(f"Failed to prepare silence for pre-warming: {e}")
+            return
+
+        join_limiter = asyncio.Semaphore(self.batch_concurrency)
+
+        async def warm(chat_id: int) -> bool:
+            try:
+                async with join_limiter:
+                    record = await self._join_group_call(
+                        chat_id, silence, Priority.PREWARM, start_at, CallRecord.WARM
+                    )
+            except Exception as e:
+                logger.warning(f"Could not pre-warm chat {chat_id}: {e}")
+                record = None
+
+            PREWARM.labels('failed' if record is None else 'joined').inc()
+            if record is None:
+                self.events.publish(CallEvent(CallEvent.FAILED, chat_id=chat_id, message="Pre-warm join failed"))
+                return False
+            if record.state == CallRecord.WARM and record.timer is None:
+                # A stream may already have swapped in while the join finished
+                record.timer = self.timer_wheel.schedule(
+                    max(0.0, start_at + self.prewarm_hold_seconds - time.time()),
+                    lambda: self._expire_idle_call(record)
+                )
+            return True
+
+        warmed = await asyncio.gather(*(warm(chat_id) for chat_id in chat_ids))
+        logger.info(f"Pre-warmed {sum(warmed)}/{len(chat_ids)} chats")
+
+    def _silence_stream(self) -> InputStream:
+        """Input stream of silence for idle pre-warmed calls, written on first use."""
+        path = os.path.join(self.audio_cache.cache_dir, f"silence{PCM_SUFFIX}")
+        if not os.path.exists(path):
+            write_silence(path, SILENCE_SECONDS)
+        return InputStream(InputAudioStream(path, HighQualityAudio()))
+
+    async def _swap_call_stream(self, record: CallRecord, audio_stream: InputStream) -> bool:
+        """Start audio in a call already held, swapping out its silence or previous stream."""
+        chat_id = record.chat_id
+        warm = record.state == CallRecord.WARM
+        self.timer_wheel.cancel(record.timer)
+        record.timer = None
+        self.calls.set_state(record, CallRecord.PLAYING)
+        try:
+            await record.session.pytgcalls.change_stream(chat_id, audio_stream)
+        except Exception as e:
+            logger.warning(f"Could not swap stream in chat {chat_id}, joining again: {e}")
+            if warm:
+                PREWARM.labels('swap_failed').inc()
+            await self._leave_group_call_locked(record)
+            return False
+
+        if warm:
+            PREWARM.labels('swapped').inc()
+            logger.info(f"Started streaming in pre-warmed chat {chat_id} on {record.session.name}")
+        else:
+            logger.info(f"Swapped the stream in chat {chat_id} on {record.session.name}")
+        return True
+
+    async def _idle_group_call_locked(self, record: CallRecord) -> bool:
+        """
+        Keep a call whose stream ended on silence for the next queued clip.
+
+        The call is left if no stream reaches it within queue_idle_seconds.
+        Returns False if the silence could not be swapped in.
+        """
+        chat_id = record.chat_id
+        try:
+            await record.session.pytgcalls.change_stream(chat_id, self._silence_stream())
+        except Exception as e:
+            logger.warning(f"Could not idle the call in chat {chat_id}, leaving it: {e}")
+            return False
+
+        # Nothing plays here any more, so leaving reports its own end
+        record.stream_end = None
+        self.calls.set_state(record, CallRecord.IDLE)
+        record.timer = self.timer_wheel.schedule(
+            self.queue_idle_seconds, lambda: self._expire_idle_call(record)
+        )
+        return True
+
+    async def _expire_idle_call(self, record: CallRecord):
+        """Leave a pre-warmed or idle call no stream reached in time."""
+        record.timer = None
+        async with self.call_locks.hold(record.chat_id):
+            if record.state not in (CallRecord.WARM, CallRecord.IDLE) or not self.calls.holds(record):
+                return
+            if record.state == CallRecord.WARM:
+                logger.info(f"No broadcast reached pre-warmed chat {record.chat_id}, leaving it")
+                PREWARM.labels('expired').inc()
+            else:
+                logger.info(f"Playback queue of chat {record.chat_id} stayed empty, leaving it")
+            await self._leave_group_call_locked(record)
+
+    async def _on_stream_end(self, client: PyTgCalls, update):
+        """pytgcalls handler: resolve the waiter of a chat whose audio finished."""
+        if isinstance(update, StreamAudioEnded):
+            logger.info(f"Stream ended in chat {update.chat_id}")
+            record = self.calls.chat(update.chat_id)
+            if record is not None:
+                self._resolve_stream_end(record.stream_end)
+
+    def _resolve_stream_end(self, waiter: Optional[asyncio.Future], cut_off: Optional[str] = None):
+        """End the wait for a stream, with why it was cut off unless its audio finished."""
+        if waiter is not None and not waiter.done():
+            waiter.set_result(cut_off)
+
+    async def _wait_for_stream_end(self, record: CallRecord) -> Optional[str]:
+        """
+        Wait for stream to end naturally, or for the max stream duration, then leave.
+
+        Returns why the stream was cut off before its audio finished, or
+        None if it played to the end or ran out of time. A call a newer
+        stream took over is left playing. The call of a chat with a
+        playback queue is kept idle instead of left, unless the service is
+        draining.
+        """
+        if record.stream_end is None:
+            record.stream_end = asyncio.get_running_loop().create_future()
+        waiter, job_id = record.stream_end, record.job_id
+
+        watchdog = self.timer_wheel.schedule(
+            self.max_stream_seconds,
+            lambda: self._resolve_stream_end(waiter)
+        )
+        cut_off = None
+        try:
+            cut_off = await waiter
+
+            # Leave the call, unless it has been left or replaced meanwhile
+            async with self.call_locks.hold(record.chat_id):
+                if record.job_id != job_id:
+                    return cut_off or "Cut off by a newer stream"
+                if (
+                    self.draining
+                    or record.chat_id not in self.playlists
+                    or not await self._idle_group_call_locked(record)
+                ):
+                    await self._leave_group_call_locked(record)
 
         except Exception as e:
             logger.error(f"Error waiting for stream end: {e}")
+        finally:
+            self.timer_wheel.cancel(watchdog)
+        return cut_off
 
     async def stop_voice_chat(self, chat_id: int) -> bool:
-        """Stop voice chat in a group."""
-        try:
-            if chat_id in self.active_calls:
-                await self.pytgcalls.leave_call(chat_id)
-                del self.active_calls[chat_id]
-                logger.info(f"Left voice chat in {chat_id}")
+        """Stop voice chat in a group, including one still being joined, and clear its queue."""
+        self.clear_queue(chat_id)
+        async with self.call_locks.hold(chat_id):
+            record = self.calls.chat(chat_id)
+            if record is None:
+                return True
+            return await self._leave_group_call_locked(record)
+
+    async def _leave_group_call(self, record: CallRecord) -> bool:
+        """
+        Leave a group call and unregister it.
+
+        Only a call still registered is left, and only once, so a stream
+        finishing while the call is stopped does not leave it again, nor
+        leave a newer call in the same chat. Waits for a join in progress
+        in the chat to finish first.
+        """
+        async with self.call_locks.hold(record.chat_id):
+            return await self._leave_group_call_locked(record)
+
+    async def _leave_group_call_locked(self, record: CallRecord) -> bool:
+        chat_id = record.chat_id
+        if record.state == CallRecord.ENDING or not self.calls.holds(record):
             return True
+
+        # A stream playing here reports its own end through its job
+        streaming = record.stream_end is not None
+        self._resolve_stream_end(record.stream_end, "Left the voice chat")
+        self.timer_wheel.cancel(record.timer)
+        record.timer = None
+        state = record.state
+        self.calls.set_state(record, CallRecord.ENDING)
+        try:
+            await record.session.pytgcalls.leave_call(chat_id)
         except Exception as e:
             logger.error(f"Failed to leave voice chat {chat_id}: {e}")
+            self.calls.set_state(record, state)
             return False
 
+        self.calls.remove(record)
+        self.journal.record('left', chat=chat_id)
+        self.sessions.release(chat_id)
+        logger.info(f"Left voice chat in {chat_id}")
+        if not streaming:
+            self.events.publish(CallEvent(CallEvent.ENDED, chat_id=chat_id, message="Left voice chat"))
+        return True
+
+    def _drop_group_call(self, record: CallRecord):
+        """Unregister a group call without leaving it and give back its audio."""
+        self._resolve_stream_end(record.stream_end, "Call was dropped")
+        self.timer_wheel.cancel(record.timer)
+        record.timer = None
+        self.calls.remove(record)
+        self._release_audio(*self.calls.take_audio(record))
+
     async def start_voice_chat(self, chat_id: int) -> bool:
-        """Start a video chat (group call) in a group."""
-        try:
-            # Create a group call
-            await self.client.invoke(
-                pyrogram.raw.functions.phone.CreateGroupCall(
-                    peer=await self.client.resolve_peer(chat_id),
-                    random_id= math.ceil(random.random()*1e8)
-                )
+        """Start a video chat (group call) in a group, retrying transient failures."""
+        budget = self.retry_policy.budget()
+        session = self.sessions.session_for(chat_id)
+        while True:
+            try:
+                await self._create_group_call(session, chat_id)
+                self.peers.set_group_call(chat_id, True)
+                return True
+            except FloodWait as e:
+                ERRORS.labels('FloodWait').inc()
+                self.sessions.report_flood_wait(session, e.value)
+                reason = 'flood_wait'
+                session = self.sessions.session_for(chat_id)
+                wait = session.flood_wait_remaining
+                delay = wait if budget.wait(wait) else None
+            except Exception as e:
+                if not is_transient(e):
+                    logger.error(f"Failed to start voice chat in {chat_id}: {e}")
+                    return False
+                logger.warning(f"Transient error starting voice chat in {chat_id}: {e}")
+                reason = 'transient'
+                delay = budget.backoff()
+
+            if not await self._retry_after(chat_id, session, reason, delay):
+                return False
+
+    async def _create_group_call(self, session: VoiceSession, chat_id: int):
+        """Create a group call in a chat from a session."""
+        await session.client.invoke(
+            pyrogram.raw.functions.phone.CreateGroupCall(
+                peer=await self.peers.resolve(session.client, chat_id),
+                random_id= math.ceil(random.random()*1e8)
             )
-            logger.info(f"Created voice chat in {chat_id}")
-            return True
+        )
+        logger.info(f"Created voice chat in {chat_id}")
+
+    async def _remember_peer(self, session: VoiceSession, chat_id: int):
+        """Cache the peer a session resolved while joining, so it survives a restart."""
+        try:
+            await self.peers.resolve(session.client, chat_id)
         except Exception as e:
-            logger.error(f"Failed to start voice chat in {chat_id}: {e}")
-            return False
+            logger.warning(f"Failed to cache peer {chat_id}: {e}")
 
-    async def start_call(self, user_id: int, audio_url: str, duration_seconds: int = 180) -> tuple[bool, str]:
+    async def start_call(
+        self,
+        user_id: int,
+        audio_url: str,
+        duration_seconds: int = 180,
+        priority: int = Priority.REMINDER,
+        deadline: Optional[float] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> tuple[bool, str]:
         """
         Start a 1-on-1 call with a user and play audio.
 
+        A call already up with the user is waited for first, until it ends
+        or the deadline passes.
+
         Args:
             user_id: Telegram user ID to call
             audio_url: URL of audio file to play during call
             duration_seconds: Maximum call duration in seconds
+            priority: Admission priority of the call
+            deadline: Unix time after which the call is given up if it has not started
+            idempotency_key: Requests for the same user with this key share one call
 
         Returns:
             Tuple of (success, call_id)
+
+        Raises:
+            ServiceDraining: If the service is draining
         """
-        call_id = str(uuid.uuid4())
+        self._check_accepting()
+        if idempotency_key:
+            return await self.operations.run(
+                ('call', user_id, idempotency_key),
+                lambda: self._start_call(user_id, audio_url, duration_seconds, priority, deadline),
+                lambda result: result[0],
+            )
+        return await self._start_call(user_id, audio_url, duration_seconds, priority, deadline)
+
+    async def _start_call(
+        self,
+        user_id: int,
+        audio_url: str,
+        duration_seconds: int,
+        priority: int,
+        deadline: Optional[float],
+    ) -> tuple[bool, str]:
+        record = self.calls.add(CallRecord(
+            CallRecord.PRIVATE,
+            user_id=user_id,
+            call_id=str(uuid.uuid4()),
+            state=CallRecord.STARTING,
+            deadline=deadline,
+        ))
 
         try:
-            logger.info(f"Starting call {call_id} to user {user_id}")
+            logger.info(f"Starting call {record.call_id} to user {user_id}")
 
-            # Download audio file
+            if self._use_progressive(audio_url):
+                audio = await self.open_progressive_audio(audio_url)
+                self.calls.hold_audio(record, None, audio)
+                audio_stream = audio.stream
+            else:
+                # Download audio file
+                audio_path = await self.download_audio(audio_url)
+                self.calls.hold_audio(record, audio_path)
+
+                # Create audio stream
+                audio_stream = await self.prepare_stream(audio_path)
+
+        except Exception as e:
+            logger.error(f"Failed to prepare call for user {user_id}: {e}")
+            self._drop_private_call(record)
+            self.events.publish(CallEvent(
+                CallEvent.FAILED, user_id=user_id, call_id=record.call_id, message=f"Failed to prepare call: {e}"
+            ))
+            return False, ""
+
+        try:
+            await self._place_call(record, audio_stream, duration_seconds, priority)
+            return True, record.call_id
+        except Exception:
+            return False, ""
+
+    async def start_call_batch(
+        self,
+        user_ids: List[int],
+        audio_url: str,
+        duration_seconds: int = 180,
+        max_concurrency: Optional[int] = None,
+        priority: int = Priority.REMINDER,
+        deadline: Optional[float] = None,
+        idempotency_keys: Optional[Dict[int, str]] = None,
+    ) -> AsyncIterator[Tuple[int, str, str]]:
+        """
+        Call many users and play them the same audio.
+
+        The audio is downloaded and prepared once for every call. A pool of
+        max_concurrency dialers works through the users, each call still
+        waiting for admission, so per-session rate limits apply as for
+        single calls. Results are yielded as each call starts or fails;
+        if the caller stops iterating, users not dialed yet are skipped.
+        A user with an idempotency key is deduplicated against start_call()
+        with the same key, so a retried batch does not call them twice.
+
+        Args:
+            user_ids: Telegram user IDs to call
+            audio_url: URL of audio file to play during the calls
+            duration_seconds: Maximum duration of each call in seconds
+            max_concurrency: Users dialed at once, defaults to batch_concurrency
+            priority: Admission priority of the calls
+            deadline: Unix time after which users not called yet are given up
+            idempotency_keys: Idempotency key per user, as for start_call()
+
+        Yields:
+            Tuples of (user_id, call_id, message); call_id is empty if the call failed
+
+        Raises:
+            ServiceDraining: If the service is draining
+        """
+        self._check_accepting()
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return
+        logger.info(f"Starting batch of {len(user_ids)} calls")
+
+        try:
             audio_path = await self.download_audio(audio_url)
-            self.temp_files[user_id] = audio_path
+        except Exception as e:
+            logger.error(f"Failed to prepare batch calls from {audio_url}: {e}")
+            for user_id in user_ids:
+                self.events.publish(CallEvent(
+                    CallEvent.FAILED, user_id=user_id, message=f"Failed to prepare call: {e}"
+                ))
+                yield user_id, "", f"Failed to download audio: {e}"
+            return
 
-            # Create audio stream
-            audio_stream = AudioPiped(audio_path)
+        pending = deque(user_ids)
+        results: asyncio.Queue = asyncio.Queue()
+        idempotency_keys = idempotency_keys or {}
 
-            # Start the call and play audio
+        async def call(user_id: int) -> Tuple[bool, str]:
+            record = self.calls.add(CallRecord(
+                CallRecord.PRIVATE,
+                user_id=user_id,
+                call_id=str(uuid.uuid4()),
+                state=CallRecord.STARTING,
+                deadline=deadline,
+            ))
+            self.audio_cache.retain(audio_path)
+            self.calls.hold_audio(record, audio_path)
             try:
-                await self.pytgcalls.play(
-                    user_id,
-                    audio_stream
-                )
-                self.active_private_calls[call_id] = user_id
-                logger.info(f"Successfully started call {call_id} with user {user_id}")
+                await self._place_call(record, audio_stream, duration_seconds, priority)
+                return True, record.call_id
+            except Exception as e:
+                return False, f"Failed to start call: {e}"
 
-                # Schedule auto-hangup after duration
-                asyncio.create_task(self._auto_end_call(call_id, duration_seconds))
+        async def dial():
+            while pending:
+                user_id = pending.popleft()
+                key = idempotency_keys.get(user_id)
+                if key:
+                    success, result = await self.operations.run(
+                        ('call', user_id, key),
+                        lambda: call(user_id),
+                        lambda result: result[0],
+                    )
+                else:
+                    success, result = await call(user_id)
+                if success:
+                    results.put_nowait((user_id, result, "Successfully started call"))
+                else:
+                    results.put_nowait((user_id, "", result or "Failed to start call"))
 
-                return True, call_id
+        try:
+            audio_stream = await self.prepare_stream(audio_path)
+            concurrency = min(max_concurrency or self.batch_concurrency, len(user_ids))
+            dialers = [asyncio.create_task(dial()) for _ in range(concurrency)]
 
-            except Exception as e:
-                logger.error(f"Failed to start call with user {user_id}: {e}")
-                # Clean up temp file
-                if user_id in self.temp_files:
-                    try:
-                        if os.path.exists(self.temp_files[user_id]):
-                            os.remove(self.temp_files[user_id])
-                        del self.temp_files[user_id]
-                    except:
-                        pass
-                return False, ""
+            started = 0
+            for _ in user_ids:
+                result = await results.get()
+                started += bool(result[1])
+                yield result
+            logger.info(f"Batch calls started {started}/{len(user_ids)} calls")
+            await asyncio.gather(*dialers)
+        finally:
+            # Calls in progress keep their own reference to the audio
+            pending.clear()
+            self.audio_cache.release(audio_path)
 
-        except Exception as e:
-            logger.error(f"Failed to prepare call for user {user_id}: {e}")
-            return False, ""
+    async def _place_call(
+        self,
+        record: CallRecord,
+        audio_stream: InputStream,
+        duration_seconds: int,
+        priority: int = Priority.REMINDER,
+    ):
+        """
+        Call the user of a starting call with a prepared stream and schedule the hang-up.
+
+        Calls to the same user are placed one at a time, and a call already
+        up with the user is waited for rather than hung up. The call is
+        dropped, releasing its audio, if it fails.
+
+        Raises:
+            AdmissionRejected: If the deadline passes before the user is free
+            Exception: If the call could not be started
+        """
+        user_id = record.user_id
+        while True:
+            async with self.call_locks.hold(user_id):
+                previous = self.calls.user(user_id)
+                if previous is None or previous.state != CallRecord.PLAYING:
+                    return await self._place_call_locked(record, audio_stream, duration_seconds, priority)
+
+            logger.info(f"Waiting for call {previous.call_id} to end before calling user {user_id} again")
+            try:
+                await self._wait_for_call_end(previous, record.deadline)
+            except AdmissionRejected as e:
+                self._drop_private_call(record)
+                self.events.publish(CallEvent(
+                    CallEvent.FAILED, user_id=user_id, call_id=record.call_id, message=f"Failed to start call: {e}"
+                ))
+                raise
+
+    async def _wait_for_call_end(self, record: CallRecord, deadline: Optional[float]):
+        """
+        Wait until a private call is over.
+
+        Raises:
+            AdmissionRejected: If the deadline passes first
+        """
+        timeout = None if deadline is None else deadline - time.time()
+        try:
+            if timeout is not None and timeout <= 0:
+                raise asyncio.TimeoutError()
+            await asyncio.wait_for(asyncio.shield(record.stream_end), timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(
+                f"Deadline passed while user {record.user_id} was in another call"
+            ) from None
 
-    async def _auto_end_call(self, call_id: str, duration_seconds: int):
-        """Automatically end call after specified duration."""
+    async def _place_call_locked(
+        self,
+        record: CallRecord,
+        audio_stream: InputStream,
+        duration_seconds: int,
+        priority: int,
+    ):
+        user_id = record.user_id
+        session = self.sessions.assign(user_id)
+        budget = self.retry_policy.budget(record.deadline)
         try:
-            await asyncio.sleep(duration_seconds)
+            while True:
+                try:
+                    async with self.admission.slot(session, priority, record.deadline):
+                        await session.pytgcalls.play(
+                            user_id,
+                            audio_stream
+                        )
+                    break
+                except AdmissionRejected:
+                    raise
+                except FloodWait as e:
+                    moved = self._move_after_flood_wait(user_id, session, e, budget)
+                    if not await self._retry_after(user_id, moved or session, 'flood_wait', None if moved is None else 0.0):
+                        raise
+                    session = moved
+                except Exception as e:
+                    if not is_transient(e):
+                        raise
+                    logger.warning(f"Transient error calling user {user_id}: {e}")
+                    if not await self._retry_after(user_id, session, 'transient', budget.backoff()):
+                        raise
+
+        except Exception as e:
+            logger.error(f"Failed to start call with user {user_id}: {e}")
+            self.sessions.release(user_id)
+            self._drop_private_call(record)
+            self.events.publish(CallEvent(
+                CallEvent.FAILED, user_id=user_id, call_id=record.call_id, message=f"Failed to start call: {e}"
+            ))
+            raise
+
+        record.session = session
+        record.stream_end = asyncio.get_running_loop().create_future()
+        self.calls.set_state(record, CallRecord.PLAYING)
+        self.calls.connect(record)
+        self.journal.record('called', call=record.call_id, user=user_id, session=session.index)
+        # Hang up once the duration runs out, unless the call is ended first
+        record.timer = self.timer_wheel.schedule(
+            duration_seconds, lambda: self._auto_end_call(record, duration_seconds)
+        )
+        TIME_TO_FIRST_AUDIO_SECONDS.labels('private').observe(time.time() - record.created_at)
+        logger.info(f"Successfully started call {record.call_id} with user {user_id} on {session.name}")
+        self.events.publish(CallEvent(
+            CallEvent.PLAYING, user_id=user_id, call_id=record.call_id, message="Call started"
+        ))
+        await self._remember_peer(session, user_id)
 
-            if call_id in self.active_private_calls:
-                logger.info(f"Auto-ending call {call_id} after {duration_seconds}s")
-                await self.end_call(call_id)
+    async def _auto_end_call(self, record: CallRecord, duration_seconds: int):
+        """End a call whose duration ran out; run by its timer."""
+        record.timer = None
+        try:
+            logger.info(f"Auto-ending call {record.call_id} after {duration_seconds}s")
+            await self._end_private_call(record, CallEvent.AUTO_ENDED)
         except Exception as e:
             logger.error(f"Error in auto-end call: {e}")
 
-    async def end_call(self, call_id: str) -> bool:
+    def _drop_private_call(self, record: CallRecord):
+        """Unregister a private call, waking calls to the user waiting for it, and give back its audio."""
+        self._resolve_stream_end(record.stream_end)
+        self.calls.remove(record)
+        self._release_audio(*self.calls.take_audio(record))
+
+    async def end_call(self, call_id: str, event: str = CallEvent.ENDED) -> bool:
         """
         End an active 1-on-1 call.
 
         Args:
             call_id: The call identifier
+            event: Call event to publish for the hang-up
 
         Returns:
             True if successful, False otherwise
         """
-        try:
-            if call_id not in self.active_private_calls:
-                logger.warning(f"Call {call_id} not found in active calls")
-                return False
+        record = self.calls.call(call_id)
+        if record is None or record.state != CallRecord.PLAYING:
+            logger.warning(f"Call {call_id} not found in active calls")
+            return False
+        return await self._end_private_call(record, event)
+
+    async def _end_private_call(self, record: CallRecord, event: str = CallEvent.ENDED) -> bool:
+        """Hang up a private call and release everything it held."""
+        async with self.call_locks.hold(record.user_id):
+            return await self._end_private_call_locked(record, event)
 
-            user_id = self.active_private_calls[call_id]
+    async def _end_private_call_locked(self, record: CallRecord, event: str = CallEvent.ENDED) -> bool:
+        call_id, user_id = record.call_id, record.user_id
+        if record.state != CallRecord.PLAYING or not self.calls.holds(record):
+            return False
+        try:
             logger.info(f"Ending call {call_id} with user {user_id}")
+            self.timer_wheel.cancel(record.timer)
+            record.timer = None
+            self.calls.set_state(record, CallRecord.ENDING)
 
             # Leave the call
             try:
-                await self.pytgcalls.leave_call(user_id)
+                await record.session.pytgcalls.leave_call(user_id)
             except Exception as e:
                 logger.warning(f"Error leaving call: {e}")
 
             # Clean up
-            del self.active_private_calls[call_id]
-
-            if user_id in self.temp_files:
-                try:
-                    temp_file = self.temp_files[user_id]
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                    del self.temp_files[user_id]
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup temp file: {e}")
+            if self.calls.user(user_id) is record:
+                self.sessions.release(user_id)
+            self._drop_private_call(record)
+            self.journal.record('hung_up', call=call_id)
+            self.events.publish(CallEvent(event, user_id=user_id, call_id=call_id, message="Call ended"))
 
             logger.info(f"Successfully ended call {call_id}")
             return True
@@ -14,37 +14,85 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10voice-chat.proto\x12\tvoicechat\"7\n\x11StreamAzanRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\"6\n\x12StreamAzanResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"(\n\x15StartVoiceChatRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\":\n\x16StartVoiceChatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\'\n\x14StopVoiceChatRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\"9\n\x15StopVoiceChatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"P\n\x10StartCallRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\x12\x18\n\x10\x64uration_seconds\x18\x03 \x01(\x05\"F\n\x11StartCallResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07\x63\x61ll_id\x18\x03 \x01(\t\"!\n\x0e\x45ndCallRequest\x12\x0f\n\x07\x63\x61ll_id\x18\x01 \x01(\t\"3\n\x0f\x45ndCallResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x14\n\x12HealthCheckRequest\"&\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x32\xe0\x03\n\x10VoiceChatService\x12I\n\nStreamAzan\x12\x1c.voicechat.StreamAzanRequest\x1a\x1d.voicechat.StreamAzanResponse\x12U\n\x0eStartVoiceChat\x12 .voicechat.StartVoiceChatRequest\x1a!.voicechat.StartVoiceChatResponse\x12R\n\rStopVoiceChat\x12\x1f.voicechat.StopVoiceChatRequest\x1a .voicechat.StopVoiceChatResponse\x12\x46\n\tStartCall\x12\x1b.voicechat.StartCallRequest\x1a\x1c.voicechat.StartCallResponse\x12@\n\x07\x45ndCall\x12\x19.voicechat.EndCallRequest\x1a\x1a.voicechat.EndCallResponse\x12L\n\x0bHealthCheck\x12\x1d.voicechat.HealthCheckRequest\x1a\x1e.voicechat.HealthCheckResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10voice-chat.proto\x12\tvoicechat\"\x95\x01\n\x11StreamAzanRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\x12)\n\x08priority\x18\x03 \x01(\x0e\x32\x17.voicechat.CallPriority\x12\x18\n\x10\x64\x65\x61\x64line_unix_ms\x18\x04 \x01(\x03\x12\x17\n\x0fidempotency_key\x18\x05 \x01(\t\"F\n\x12StreamAzanResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0e\n\x06job_id\x18\x03 \x01(\t\"\x9b\x01\n\x16StreamAzanBatchRequest\x12\x10\n\x08\x63hat_ids\x18\x01 \x03(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\x12\x17\n\x0fmax_concurrency\x18\x03 \x01(\x05\x12)\n\x08priority\x18\x04 \x01(\x0e\x32\x17.voicechat.CallPriority\x12\x18\n\x10\x64\x65\x61\x64line_unix_ms\x18\x05 \x01(\x03\"U\n\x10\x43hatStreamResult\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x0e\n\x06job_id\x18\x04 \x01(\t\"i\n\x17StreamAzanBatchResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12,\n\x07results\x18\x03 \x03(\x0b\x32\x1b.voicechat.ChatStreamResult\"(\n\x16GetStreamStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"$\n\x12WatchStreamRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\xb0\x01\n\x14StreamStatusResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0e\n\x06job_id\x18\x03 \x01(\t\x12\x0f\n\x07\x63hat_id\x18\x04 \x01(\x03\x12%\n\x05state\x18\x05 \x01(\x0e\x32\x16.voicechat.StreamState\x12\x17\n\x0f\x65lapsed_seconds\x18\x06 \x01(\x01\x12\x15\n\rupdated_at_ms\x18\x07 \x01(\x03\"(\n\x15StartVoiceChatRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\":\n\x16StartVoiceChatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\'\n\x14StopVoiceChatRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\"9\n\x15StopVoiceChatResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x7f\n\x13\x45nqueueAudioRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\x12\x12\n\naudio_urls\x18\x02 \x03(\t\x12)\n\x08priority\x18\x03 \x01(\x0e\x32\x17.voicechat.CallPriority\x12\x18\n\x10\x64\x65\x61\x64line_unix_ms\x18\x04 \x01(\x03\"X\n\x14\x45nqueueAudioResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07job_ids\x18\x03 \x03(\t\x12\r\n\x05\x61head\x18\x04 \x01(\x05\"#\n\x10SkipAudioRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\"5\n\x11SkipAudioResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x11\x43learQueueRequest\x12\x0f\n\x07\x63hat_id\x18\x01 \x01(\x03\"G\n\x12\x43learQueueResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07\x63leared\x18\x03 \x01(\x05\"X\n\x17PrepareBroadcastRequest\x12\x10\n\x08\x63hat_ids\x18\x01 \x03(\x03\x12\x15\n\rstart_unix_ms\x18\x02 \x01(\x03\x12\x14\n\x0clead_seconds\x18\x03 \x01(\x05\"O\n\x18PrepareBroadcastResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tscheduled\x18\x03 \x01(\x05\"\xae\x01\n\x10StartCallRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\x12\x18\n\x10\x64uration_seconds\x18\x03 \x01(\x05\x12)\n\x08priority\x18\x04 \x01(\x0e\x32\x17.voicechat.CallPriority\x12\x18\n\x10\x64\x65\x61\x64line_unix_ms\x18\x05 \x01(\x03\x12\x17\n\x0fidempotency_key\x18\x06 \x01(\t\"F\n\x11StartCallResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07\x63\x61ll_id\x18\x03 \x01(\t\"\xbd\x02\n\x15StartCallBatchRequest\x12\x10\n\x08user_ids\x18\x01 \x03(\x03\x12\x11\n\taudio_url\x18\x02 \x01(\t\x12\x18\n\x10\x64uration_seconds\x18\x03 \x01(\x05\x12\x17\n\x0fmax_concurrency\x18\x04 \x01(\x05\x12)\n\x08priority\x18\x05 \x01(\x0e\x32\x17.voicechat.CallPriority\x12\x18\n\x10\x64\x65\x61\x64line_unix_ms\x18\x06 \x01(\x03\x12O\n\x10idempotency_keys\x18\x07 \x03(\x0b\x32\x35.voicechat.StartCallBatchRequest.IdempotencyKeysEntry\x1a\x36\n\x14IdempotencyKeysEntry\x12\x0b\n\x03key\x18\x01 \x01(\x03\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"T\n\x0eUserCallResult\x12\x0f\n\x07user_id\x18\x01 \x01(\x03\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\x12\x0f\n\x07\x63\x61ll_id\x18\x04 \x01(\t\"!\n\x0e\x45ndCallRequest\x12\x0f\n\x07\x63\x61ll_id\x18\x01 \x01(\t\"3\n\x0f\x45ndCallResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"C\n\x1aSubscribeCallEventsRequest\x12\x10\n\x08\x63hat_ids\x18\x01 \x03(\x03\x12\x13\n\x0b\x62uffer_size\x18\x02 \x01(\x05\"\xac\x01\n\tCallEvent\x12&\n\x04type\x18\x01 \x01(\x0e\x32\x18.voicechat.CallEventType\x12\x0f\n\x07\x63hat_id\x18\x02 \x01(\x03\x12\x0f\n\x07user_id\x18\x03 \x01(\x03\x12\x0e\n\x06job_id\x18\x04 \x01(\t\x12\x0f\n\x07\x63\x61ll_id\x18\x05 \x01(\t\x12\x0f\n\x07message\x18\x06 \x01(\t\x12\x12\n\nat_unix_ms\x18\x07 \x01(\x03\x12\x0f\n\x07\x64ropped\x18\x08 \x01(\r\"\x14\n\x12HealthCheckRequest\"\x98\x01\n\rSessionHealth\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x11\n\tconnected\x18\x02 \x01(\x08\x12\r\n\x05\x63\x61lls\x18\x03 \x01(\x05\x12\x1b\n\x13\x61\x64mission_in_flight\x18\x04 \x01(\x05\x12\x18\n\x10\x61\x64mission_queued\x18\x05 \x01(\x05\x12 \n\x18\x66lood_wait_until_unix_ms\x18\x06 \x01(\x03\"\xb9\x02\n\x13HealthCheckResponse\x12\x0f\n\x07healthy\x18\x01 \x01(\x08\x12\x10\n\x08\x64raining\x18\x02 \x01(\x08\x12\x16\n\x0e\x61\x63tive_streams\x18\x03 \x01(\x05\x12\x1e\n\x16\x64rain_deadline_unix_ms\x18\x04 \x01(\x03\x12\x0c\n\x04live\x18\x05 \x01(\x08\x12\r\n\x05ready\x18\x06 \x01(\x08\x12\x13\n\x0bgroup_calls\x18\x07 \x01(\x05\x12\x15\n\rprivate_calls\x18\x08 \x01(\x05\x12\x1b\n\x13\x61\x64mission_in_flight\x18\t \x01(\x05\x12\x18\n\x10\x61\x64mission_queued\x18\n \x01(\x05\x12\x1b\n\x13\x61\x64mission_available\x18\x0b \x01(\x05\x12*\n\x08sessions\x18\x0c \x03(\x0b\x32\x18.voicechat.SessionHealth*{\n\x0c\x43\x61llPriority\x12\x18\n\x14PRIORITY_UNSPECIFIED\x10\x00\x12\x11\n\rPRIORITY_AZAN\x10\x01\x12\x15\n\x11PRIORITY_REMINDER\x10\x02\x12\x11\n\rPRIORITY_TEST\x10\x03\x12\x14\n\x10PRIORITY_PREWARM\x10\x04*\xa1\x01\n\x0bStreamState\x12\x18\n\x14STREAM_STATE_UNKNOWN\x10\x00\x12\x12\n\x0eSTREAM_JOINING\x10\x01\x12\x12\n\x0eSTREAM_PLAYING\x10\x02\x12\x14\n\x10STREAM_COMPLETED\x10\x03\x12\x11\n\rSTREAM_FAILED\x10\x04\x12\x11\n\rSTREAM_QUEUED\x10\x05\x12\x14\n\x10STREAM_CANCELLED\x10\x06*\x9e\x01\n\rCallEventType\x12\x16\n\x12\x43\x41LL_EVENT_UNKNOWN\x10\x00\x12\x15\n\x11\x43\x41LL_EVENT_JOINED\x10\x01\x12\x16\n\x12\x43\x41LL_EVENT_PLAYING\x10\x02\x12\x14\n\x10\x43\x41LL_EVENT_ENDED\x10\x03\x12\x15\n\x11\x43\x41LL_EVENT_FAILED\x10\x04\x12\x19\n\x15\x43\x41LL_EVENT_AUTO_ENDED\x10\x05\x32\xca\t\n\x10VoiceChatService\x12I\n\nStreamAzan\x12\x1c.voicechat.StreamAzanRequest\x1a\x1d.voicechat.StreamAzanResponse\x12X\n\x0fStreamAzanBatch\x12!.voicechat.StreamAzanBatchRequest\x1a\".voicechat.StreamAzanBatchResponse\x12U\n\x0fGetStreamStatus\x12!.voicechat.GetStreamStatusRequest\x1a\x1f.voicechat.StreamStatusResponse\x12O\n\x0bWatchStream\x12\x1d.voicechat.WatchStreamRequest\x1a\x1f.voicechat.StreamStatusResponse0\x01\x12U\n\x0eStartVoiceChat\x12 .voicechat.StartVoiceChatRequest\x1a!.voicechat.StartVoiceChatResponse\x12R\n\rStopVoiceChat\x12\x1f.voicechat.StopVoiceChatRequest\x1a .voicechat.StopVoiceChatResponse\x12[\n\x10PrepareBroadcast\x12\".voicechat.PrepareBroadcastRequest\x1a#.voicechat.PrepareBroadcastResponse\x12O\n\x0c\x45nqueueAudio\x12\x1e.voicechat.EnqueueAudioRequest\x1a\x1f.voicechat.EnqueueAudioResponse\x12\x46\n\tSkipAudio\x12\x1b.voicechat.SkipAudioRequest\x1a\x1c.voicechat.SkipAudioResponse\x12I\n\nClearQueue\x12\x1c.voicechat.ClearQueueRequest\x1a\x1d.voicechat.ClearQueueResponse\x12\x46\n\tStartCall\x12\x1b.voicechat.StartCallRequest\x1a\x1c.voicechat.StartCallResponse\x12O\n\x0eStartCallBatch\x12 .voicechat.StartCallBatchRequest\x1a\x19.voicechat.UserCallResult0\x01\x12@\n\x07\x45ndCall\x12\x19.voicechat.EndCallRequest\x1a\x1a.voicechat.EndCallResponse\x12T\n\x13SubscribeCallEvents\x12%.voicechat.SubscribeCallEventsRequest\x1a\x14.voicechat.CallEvent0\x01\x12L\n\x0bHealthCheck\x12\x1d.voicechat.HealthCheckRequest\x1a\x1e.voicechat.HealthCheckResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'voice_chat_pb2', _globals)
 if _descriptor._USE_C_DESCRIPTORS == False:
   DESCRIPTOR._options = None
-  _globals['_STREAMAZANREQUEST']._serialized_start=31
-  _globals['_STREAMAZANREQUEST']._serialized_end=86
-  _globals['_STREAMAZANRESPONSE']._serialized_start=88
-  _globals['_STREAMAZANRESPONSE']._serialized_end=142
-  _globals['_STARTVOICECHATREQUEST']._serialized_start=144
-  _globals['_STARTVOICECHATREQUEST']._serialized_end=184
-  _globals['_STARTVOICECHATRESPONSE']._serialized_start=186
-  _globals['_STARTVOICECHATRESPONSE']._serialized_end=244
-  _globals['_STOPVOICECHATREQUEST']._serialized_start=246
-  _globals['_STOPVOICECHATREQUEST']._serialized_end=285
-  _globals['_STOPVOICECHATRESPONSE']._serialized_start=287
-  _globals['_STOPVOICECHATRESPONSE']._serialized_end=344
-  _globals['_STARTCALLREQUEST']._serialized_start=346
-  _globals['_STARTCALLREQUEST']._serialized_end=426
-  _globals['_STARTCALLRESPONSE']._serialized_start=428
-  _globals['_STARTCALLRESPONSE']._serialized_end=498
-  _globals['_ENDCALLREQUEST']._serialized_start=500
-  _globals['_ENDCALLREQUEST']._serialized_end=533
-  _globals['_ENDCALLRESPONSE']._serialized_start=535
-  _globals['_ENDCALLRESPONSE']._serialized_end=586
-  _globals['_HEALTHCHECKREQUEST']._serialized_start=588
-  _globals['_HEALTHCHECKREQUEST']._serialized_end=608
-  _globals['_HEALTHCHECKRESPONSE']._serialized_start=610
-  _globals['_HEALTHCHECKRESPONSE']._serialized_end=648
-  _globals['_VOICECHATSERVICE']._serialized_start=651
-  _globals['_VOICECHATSERVICE']._serialized_end=1131
+  _globals['_STARTCALLBATCHREQUEST_IDEMPOTENCYKEYSENTRY']._options = None
+  _globals['_STARTCALLBATCHREQUEST_IDEMPOTENCYKEYSENTRY']._serialized_options = b'8\001'
+  _globals['_CALLPRIORITY']._serialized_start=3141
+  _globals['_CALLPRIORITY']._serialized_end=3264
+  _globals['_STREAMSTATE']._serialized_start=3267
+  _globals['_STREAMSTATE']._serialized_end=3428
+  _globals['_CALLEVENTTYPE']._serialized_start=3431
+  _globals['_CALLEVENTTYPE']._serialized_end=3589
+  _globals['_STREAMAZANREQUEST']._serialized_start=32
+  _globals['_STREAMAZANREQUEST']._serialized_end=181
+  _globals['_STREAMAZANRESPONSE']._serialized_start=183
+  _globals['_STREAMAZANRESPONSE']._serialized_end=253
+  _globals['_STREAMAZANBATCHREQUEST']._serialized_start=256
+  _globals['_STREAMAZANBATCHREQUEST']._serialized_end=411
+  _globals['_CHATSTREAMRESULT']._serialized_start=413
+  _globals['_CHATSTREAMRESULT']._serialized_end=498
+  _globals['_STREAMAZANBATCHRESPONSE']._serialized_start=500
+  _globals['_STREAMAZANBATCHRESPONSE']._serialized_end=605
+  _globals['_GETSTREAMSTATUSREQUEST']._serialized_start=607
+  _globals['_GETSTREAMSTATUSREQUEST']._serialized_end=647
+  _globals['_WATCHSTREAMREQUEST']._serialized_start=649
+  _globals['_WATCHSTREAMREQUEST']._serialized_end=685
+  _globals['_STREAMSTATUSRESPONSE']._serialized_start=688
+  _globals['_STREAMSTATUSRESPONSE']._serialized_end=864
+  _globals['_STARTVOICECHATREQUEST']._serialized_start=866
+  _globals['_STARTVOICECHATREQUEST']._serialized_end=906
+  _globals['_STARTVOICECHATRESPONSE']._serialized_start=908
+  _globals['_STARTVOICECHATRESPONSE']._serialized_end=966
+  _globals['_STOPVOICECHATREQUEST']._serialized_start=968
+  _globals['_STOPVOICECHATREQUEST']._serialized_end=1007
+  _globals['_STOPVOICECHATRESPONSE']._serialized_start=1009
+  _globals['_STOPVOICECHATRESPONSE']._serialized_end=1066
+  _globals['_ENQUEUEAUDIOREQUEST']._serialized_start=1068
+  _globals['_ENQUEUEAUDIOREQUEST']._serialized_end=1195
+  _globals['_ENQUEUEAUDIORESPONSE']._serialized_start=1197
+  _globals['_ENQUEUEAUDIORESPONSE']._serialized_end=1285
+  _globals['_SKIPAUDIOREQUEST']._serialized_start=1287
+  _globals['_SKIPAUDIOREQUEST']._serialized_end=1322
+  _globals['_SKIPAUDIORESPONSE']._serialized_start=1324
+  _globals['_SKIPAUDIORESPONSE']._serialized_end=1377
+  _globals['_CLEARQUEUEREQUEST']._serialized_start=1379
+  _globals['_CLEARQUEUEREQUEST']._serialized_end=1415
+  _globals['_CLEARQUEUERESPONSE']._serialized_start=1417
+  _globals['_CLEARQUEUERESPONSE']._serialized_end=1488
+  _globals['_PREPAREBROADCASTREQUEST']._serialized_start=1490
+  _globals['_PREPAREBROADCASTREQUEST']._serialized_end=1578
+  _globals['_PREPAREBROADCASTRESPONSE']._serialized_start=1580
+  _globals['_PREPAREBROADCASTRESPONSE']._serialized_end=1659
+  _globals['_STARTCALLREQUEST']._serialized_start=1662
+  _globals['_STARTCALLREQUEST']._serialized_end=1836
+  _globals['_STARTCALLRESPONSE']._serialized_start=1838
+  _globals['_STARTCALLRESPONSE']._serialized_end=1908
+  _globals['_STARTCALLBATCHREQUEST']._serialized_start=1911
+  _globals['_STARTCALLBATCHREQUEST']._serialized_end=2228
+  _globals['_STARTCALLBATCHREQUEST_IDEMPOTENCYKEYSENTRY']._serialized_start=2174
+  _globals['_STARTCALLBATCHREQUEST_IDEMPOTENCYKEYSENTRY']._serialized_end=2228
+  _globals['_USERCALLRESULT']._serialized_start=2230
+  _globals['_USERCALLRESULT']._serialized_end=2314
+  _globals['_ENDCALLREQUEST']._serialized_start=2316
+  _globals['_ENDCALLREQUEST']._serialized_end=2349
+  _globals['_ENDCALLRESPONSE']._serialized_start=2351
+  _globals['_ENDCALLRESPONSE']._serialized_end=2402
+  _globals['_SUBSCRIBECALLEVENTSREQUEST']._serialized_start=2404
+  _globals['_SUBSCRIBECALLEVENTSREQUEST']._serialized_end=2471
+  _globals['_CALLEVENT']._serialized_start=2474
+  _globals['_CALLEVENT']._serialized_end=2646
+  _globals['_HEALTHCHECKREQUEST']._serialized_start=2648
+  _globals['_HEALTHCHECKREQUEST']._serialized_end=2668
+  _globals['_SESSIONHEALTH']._serialized_start=2671
+  _globals['_SESSIONHEALTH']._serialized_end=2823
+  _globals['_HEALTHCHECKRESPONSE']._serialized_start=2826
+  _globals['_HEALTHCHECKRESPONSE']._serialized_end=3139
+  _globals['_VOICECHATSERVICE']._serialized_start=3592
+  _globals['_VOICECHATSERVICE']._serialized_end=4818
 # @@protoc_insertion_point(module_scope)
@@ -19,6 +19,21 @@ class VoiceChatServiceStub(object):
                 request_serializer=voice__chat__pb2.StreamAzanRequest.SerializeToString,
                 response_deserializer=voice__chat__pb2.StreamAzanResponse.FromString,
                 )
+        self.StreamAzanBatch = channel.unary_unary(
+                '/voicechat.VoiceChatService/StreamAzanBatch',
+                request_serializer=voice__chat__pb2.StreamAzanBatchRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.StreamAzanBatchResponse.FromString,
+                )
+        self.GetStreamStatus = channel.unary_unary(
+                '/voicechat.VoiceChatService/GetStreamStatus',
+                request_serializer=voice__chat__pb2.GetStreamStatusRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.StreamStatusResponse.FromString,
+                )
+        self.WatchStream = channel.unary_stream(
+                '/voicechat.VoiceChatService/WatchStream',
+                request_serializer=voice__chat__pb2.WatchStreamRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.StreamStatusResponse.FromString,
+                )
         self.StartVoiceChat = channel.unary_unary(
                 '/voicechat.VoiceChatService/StartVoiceChat',
                 request_serializer=voice__chat__pb2.StartVoiceChatRequest.SerializeToString,
@@ -29,16 +44,46 @@ class VoiceChatServiceStub(object):
                 request_serializer=voice__chat__pb2.StopVoiceChatRequest.SerializeToString,
                 response_deserializer=voice__chat__pb2.StopVoiceChatResponse.FromString,
                 )
+        self.PrepareBroadcast = channel.unary_unary(
+                '/voicechat.VoiceChatService/PrepareBroadcast',
+                request_serializer=voice__chat__pb2.PrepareBroadcastRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.PrepareBroadcastResponse.FromString,
+                )
+        self.EnqueueAudio = channel.unary_unary(
+                '/voicechat.VoiceChatService/EnqueueAudio',
+                request_serializer=voice__chat__pb2.EnqueueAudioRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.EnqueueAudioResponse.FromString,
+                )
+        self.SkipAudio = channel.unary_unary(
+                '/voicechat.VoiceChatService/SkipAudio',
+                request_serializer=voice__chat__pb2.SkipAudioRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.SkipAudioResponse.FromString,
+                )
+        self.ClearQueue = channel.unary_unary(
+                '/voicechat.VoiceChatService/ClearQueue',
+                request_serializer=voice__chat__pb2.ClearQueueRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.ClearQueueResponse.FromString,
+                )
         self.StartCall = channel.unary_unary(
                 '/voicechat.VoiceChatService/StartCall',
                 request_serializer=voice__chat__pb2.StartCallRequest.SerializeToString,
                 response_deserializer=voice__chat__pb2.StartCallResponse.FromString,
                 )
+        self.StartCallBatch = channel.unary_stream(
+                '/voicechat.VoiceChatService/StartCallBatch',
+                request_serializer=voice__chat__pb2.StartCallBatchRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.UserCallResult.FromString,
+                )
         self.EndCall = channel.unary_unary(
                 '/voicechat.VoiceChatService/EndCall',
                 request_serializer=voice__chat__pb2.EndCallRequest.SerializeToString,
                 response_deserializer=voice__chat__pb2.EndCallResponse.FromString,
                 )
+        self.SubscribeCallEvents = channel.unary_stream(
+                '/voicechat.VoiceChatService/SubscribeCallEvents',
+                request_serializer=voice__chat__pb2.SubscribeCallEventsRequest.SerializeToString,
+                response_deserializer=voice__chat__pb2.CallEvent.FromString,
+                )
         self.HealthCheck = channel.unary_unary(
                 '/voicechat.VoiceChatService/HealthCheck',
                 request_serializer=voice__chat__pb2.HealthCheckRequest.SerializeToString,
@@ -56,6 +101,24 @@ class VoiceChatServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamAzanBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetStreamStatus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchStream(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def StartVoiceChat(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -68,6 +131,31 @@ class VoiceChatServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def PrepareBroadcast(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EnqueueAudio(self, request, context):
+        """Playback queue of a group voice chat, played without rejoining between clips
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SkipAudio(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ClearQueue(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def StartCall(self, request, context):
         """1-on-1 call methods
         """
@@ -75,12 +163,25 @@ class VoiceChatServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StartCallBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def EndCall(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubscribeCallEvents(self, request, context):
+        """Lifecycle events of group and 1-on-1 calls as they happen
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def HealthCheck(self, request, context):
         """Health check
         """
@@ -96,6 +197,21 @@ def add_VoiceChatServiceServicer_to_server(servicer, server):
                     request_deserializer=voice__chat__pb2.StreamAzanRequest.FromString,
                     response_serializer=voice__chat__pb2.StreamAzanResponse.SerializeToString,
             ),
+            'StreamAzanBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.StreamAzanBatch,
+                    request_deserializer=voice__chat__pb2.StreamAzanBatchRequest.FromString,
+                    response_serializer=voice__chat__pb2.StreamAzanBatchResponse.SerializeToString,
+            ),
+            'GetStreamStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStreamStatus,
+                    request_deserializer=voice__chat__pb2.GetStreamStatusRequest.FromString,
+                    response_serializer=voice__chat__pb2.StreamStatusResponse.SerializeToString,
+            ),
+            'WatchStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchStream,
+                    request_deserializer=voice__chat__pb2.WatchStreamRequest.FromString,
+                    response_serializer=voice__chat__pb2.StreamStatusResponse.SerializeToString,
+            ),
             'StartVoiceChat': grpc.unary_unary_rpc_method_handler(
                     servicer.StartVoiceChat,
                     request_deserializer=voice__chat__pb2.StartVoiceChatRequest.FromString,
@@ -106,16 +222,46 @@ def add_VoiceChatServiceServicer_to_server(servicer, server):
                     request_deserializer=voice__chat__pb2.StopVoiceChatRequest.FromString,
                     response_serializer=voice__chat__pb2.StopVoiceChatResponse.SerializeToString,
             ),
+            'PrepareBroadcast': grpc.unary_unary_rpc_method_handler(
+                    servicer.PrepareBroadcast,
+                    request_deserializer=voice__chat__pb2.PrepareBroadcastRequest.FromString,
+                    response_serializer=voice__chat__pb2.PrepareBroadcastResponse.SerializeToString,
+            ),
+            'EnqueueAudio': grpc.unary_unary_rpc_method_handler(
+                    servicer.EnqueueAudio,
+                    request_deserializer=voice__chat__pb2.EnqueueAudioRequest.FromString,
+                    response_serializer=voice__chat__pb2.EnqueueAudioResponse.SerializeToString,
+            ),
+            'SkipAudio': grpc.unary_unary_rpc_method_handler(
+                    servicer.SkipAudio,
+                    request_deserializer=voice__chat__pb2.SkipAudioRequest.FromString,
+                    response_serializer=voice__chat__pb2.SkipAudioResponse.SerializeToString,
+            ),
+            'ClearQueue': grpc.unary_unary_rpc_method_handler(
+                    servicer.ClearQueue,
+                    request_deserializer=voice__chat__pb2.ClearQueueRequest.FromString,
+                    response_serializer=voice__chat__pb2.ClearQueueResponse.SerializeToString,
+            ),
             'StartCall': grpc.unary_unary_rpc_method_handler(
                     servicer.StartCall,
                     request_deserializer=voice__chat__pb2.StartCallRequest.FromString,
                     response_serializer=voice__chat__pb2.StartCallResponse.SerializeToString,
             ),
+            'StartCallBatch': grpc.unary_stream_rpc_method_handler(
+                    servicer.StartCallBatch,
+                    request_deserializer=voice__chat__pb2.StartCallBatchRequest.FromString,
+                    response_serializer=voice__chat__pb2.UserCallResult.SerializeToString,
+            ),
             'EndCall': grpc.unary_unary_rpc_method_handler(
                     servicer.EndCall,
                     request_deserializer=voice__chat__pb2.EndCallRequest.FromString,
                     response_serializer=voice__chat__pb2.EndCallResponse.SerializeToString,
             ),
+            'SubscribeCallEvents': grpc.unary_stream_rpc_method_handler(
+                    servicer.SubscribeCallEvents,
+                    request_deserializer=voice__chat__pb2.SubscribeCallEventsRequest.FromString,
+                    response_serializer=voice__chat__pb2.CallEvent.SerializeToString,
+            ),
             'HealthCheck': grpc.unary_unary_rpc_method_handler(
                     servicer.HealthCheck,
                     request_deserializer=voice__chat__pb2.HealthCheckRequest.FromString,
@@ -148,6 +294,57 @@ class VoiceChatService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StreamAzanBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/StreamAzanBatch',
+            voice__chat__pb2.StreamAzanBatchRequest.SerializeToString,
+            voice__chat__pb2.StreamAzanBatchResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetStreamStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/GetStreamStatus',
+            voice__chat__pb2.GetStreamStatusRequest.SerializeToString,
+            voice__chat__pb2.StreamStatusResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/voicechat.VoiceChatService/WatchStream',
+            voice__chat__pb2.WatchStreamRequest.SerializeToString,
+            voice__chat__pb2.StreamStatusResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def StartVoiceChat(request,
             target,
@@ -182,6 +379,74 @@ class VoiceChatService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def PrepareBroadcast(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/PrepareBroadcast',
+            voice__chat__pb2.PrepareBroadcastRequest.SerializeToString,
+            voice__chat__pb2.PrepareBroadcastResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def EnqueueAudio(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/EnqueueAudio',
+            voice__chat__pb2.EnqueueAudioRequest.SerializeToString,
+            voice__chat__pb2.EnqueueAudioResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SkipAudio(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/SkipAudio',
+            voice__chat__pb2.SkipAudioRequest.SerializeToString,
+            voice__chat__pb2.SkipAudioResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ClearQueue(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/voicechat.VoiceChatService/ClearQueue',
+            voice__chat__pb2.ClearQueueRequest.SerializeToString,
+            voice__chat__pb2.ClearQueueResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def StartCall(request,
             target,
@@ -199,6 +464,23 @@ class VoiceChatService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def StartCallBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/voicechat.VoiceChatService/StartCallBatch',
+            voice__chat__pb2.StartCallBatchRequest.SerializeToString,
+            voice__chat__pb2.UserCallResult.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def EndCall(request,
             target,
@@ -216,6 +498,23 @@ class VoiceChatService(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def SubscribeCallEvents(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/voicechat.VoiceChatService/SubscribeCallEvents',
+            voice__chat__pb2.SubscribeCallEventsRequest.SerializeToString,
+            voice__chat__pb2.CallEvent.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def HealthCheck(request,
             target,
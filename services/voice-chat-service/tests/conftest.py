@@ -0,0 +1,7 @@
+"""Put src/ on the import path, as running src/main.py does, and benchmark/ for its fakes."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmark'))
@@ -0,0 +1,62 @@
+"""VoiceChatManager on the fake Telegram backend of the benchmark, shared by the manager tests."""
+
+import asyncio
+import hashlib
+
+from audio_cache import AudioCache
+from fakes import FakeBehavior, FakeClient, FakePyTgCalls
+from voice_chat import VoiceChatManager
+
+URL = 'https://audio.example/azan.mp3'
+
+
+class FakeOrigin:
+    """Stands in for VoiceChatManager._fetch_audio, storing fixed bytes in the cache."""
+
+    def __init__(self, cache: AudioCache, data: bytes = b'audio'):
+        self.cache = cache
+        self.data = data
+        self.error = None
+        self.fetches = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, url: str) -> str:
+        self.fetches += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        temp_path = self.cache.create_temp_file()
+        with open(temp_path, 'wb') as f:
+            f.write(self.data)
+        return self.cache.store(url, temp_path, digest=hashlib.sha256(self.data).hexdigest())
+
+
+def make_manager(tmp_path, sessions: int = 1, behavior: FakeBehavior = None, **options) -> VoiceChatManager:
+    behavior = behavior or FakeBehavior(join_latency=0.02, join_jitter=0, stream_seconds=0.3, rpc_latency=0)
+    options.setdefault('pretranscode', False)
+    options.setdefault('join_rate_per_session', 1000.0)
+    options.setdefault('join_burst_per_session', 1000)
+    manager = VoiceChatManager(
+        [FakeClient(f'client-{index}', behavior) for index in range(sessions)],
+        audio_cache=AudioCache(str(tmp_path / 'cache')),
+        pytgcalls_factory=FakePyTgCalls,
+        **options,
+    )
+    manager.timer_wheel.tick_seconds = 0.02
+    manager.origin = FakeOrigin(manager.audio_cache)
+    manager._fetch_audio = manager.origin
+    return manager
+
+
+async def settle(manager: VoiceChatManager, timeout: float = 5.0):
+    """Wait until every stream has ended and its audio was given back."""
+    loop = asyncio.get_running_loop()
+    until = loop.time() + timeout
+    while manager.active_streams() or manager.calls.holding_audio or len(manager.tasks):
+        assert loop.time() < until, "streams did not settle"
+        await asyncio.sleep(0.02)
+
+
+def pinned(manager: VoiceChatManager) -> int:
+    return manager.audio_cache.stats()['pinned']
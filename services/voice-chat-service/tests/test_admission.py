@@ -0,0 +1,170 @@
+"""Tests for the admission scheduler."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from admission import AdmissionRejected, AdmissionScheduler, Priority, TokenBucket
+from session_pool import VoiceSession
+from timer_wheel import TimerWheel
+
+
+def make_session(index: int) -> VoiceSession:
+    return VoiceSession(index, SimpleNamespace(is_connected=True), None)
+
+
+def make_scheduler(**limits) -> AdmissionScheduler:
+    limits.setdefault('rate_per_session', 1000.0)
+    limits.setdefault('burst_per_session', 1000)
+    return AdmissionScheduler(TimerWheel(tick_seconds=0.01), **limits)
+
+
+async def admit_queued(scheduler: AdmissionScheduler, session: VoiceSession, requests) -> list:
+    """Queue requests behind a held slot, then release slots one by one and record the order."""
+    order = []
+
+    async def request(name, priority, deadline):
+        await scheduler.acquire(session, priority, deadline)
+        order.append(name)
+
+    await scheduler.acquire(session)
+    tasks = [asyncio.create_task(request(*args)) for args in requests]
+    await asyncio.sleep(0)
+    for _ in requests + [None]:
+        scheduler.release(session)
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_higher_priority_is_admitted_first():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=1)
+        return await admit_queued(scheduler, make_session(0), [
+            ('test', Priority.TEST, None),
+            ('reminder', Priority.REMINDER, None),
+            ('azan', Priority.AZAN, None),
+        ])
+
+    assert asyncio.run(main()) == ['azan', 'reminder', 'test']
+
+
+def test_earlier_deadline_breaks_priority_ties():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=1)
+        now = time.time()
+        return await admit_queued(scheduler, make_session(0), [
+            ('none', Priority.AZAN, None),
+            ('late', Priority.AZAN, now + 60),
+            ('soon', Priority.AZAN, now + 30),
+        ])
+
+    assert asyncio.run(main())[:2] == ['soon', 'late']
+
+
+def test_per_session_cap_leaves_other_sessions_free():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=10, max_concurrent_per_session=1)
+        first, second = make_session(0), make_session(1)
+        await scheduler.acquire(first)
+
+        blocked = asyncio.create_task(scheduler.acquire(first))
+        await asyncio.wait_for(scheduler.acquire(second), 1)
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert scheduler.session_queued(first) == 1
+        assert scheduler.session_in_flight(second) == 1
+
+        scheduler.release(first)
+        await asyncio.wait_for(blocked, 1)
+        assert scheduler.in_flight == 2
+
+    asyncio.run(main())
+
+
+def test_passed_deadline_is_rejected_at_once():
+    async def main():
+        scheduler = make_scheduler()
+        with pytest.raises(AdmissionRejected):
+            await scheduler.acquire(make_session(0), deadline=time.time() - 1)
+        assert scheduler.shed == 1
+        assert scheduler.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_deadline_passing_while_queued_sheds_the_request():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=1)
+        session = make_session(0)
+        await scheduler.acquire(session)
+
+        with pytest.raises(AdmissionRejected):
+            await scheduler.acquire(session, deadline=time.time() + 0.05)
+        assert scheduler.shed == 1
+        assert scheduler.queued == 0
+
+        scheduler.release(session)
+        assert scheduler.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def main():
+        scheduler = make_scheduler(max_concurrent=1)
+        session = make_session(0)
+        await scheduler.acquire(session)
+        waiter = asyncio.create_task(scheduler.acquire(session))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release(session)
+
+        assert scheduler.in_flight == 0
+        assert scheduler.queued == 0
+        assert scheduler.available == 1
+
+    asyncio.run(main())
+
+
+def test_flood_waited_session_admits_nothing_until_the_wait_is_over():
+    async def main():
+        scheduler = make_scheduler()
+        session = make_session(0)
+        session.flood_until = time.time() + 0.1
+
+        started = time.monotonic()
+        await asyncio.wait_for(scheduler.acquire(session), 1)
+        assert time.monotonic() - started >= 0.08
+
+    asyncio.run(main())
+
+
+def test_slot_releases_on_error():
+    async def main():
+        scheduler = make_scheduler()
+        session = make_session(0)
+        with pytest.raises(RuntimeError):
+            async with scheduler.slot(session):
+                assert scheduler.in_flight == 1
+                raise RuntimeError("join failed")
+        assert scheduler.in_flight == 0
+        assert scheduler.session_in_flight(session) == 0
+
+    asyncio.run(main())
+
+
+def test_token_bucket_limits_the_rate_after_the_burst():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    now = bucket.updated
+
+    for _ in range(2):
+        assert bucket.wait_time(now) == 0
+        bucket.take()
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+    assert bucket.wait_time(now + 0.1) == 0
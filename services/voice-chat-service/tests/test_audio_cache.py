@@ -0,0 +1,162 @@
+"""Tests for the content-addressed audio cache."""
+
+import json
+import os
+
+import pytest
+
+from audio_cache import INDEX_FILE, AudioCache
+
+
+def store_bytes(cache: AudioCache, url: str, data: bytes, **validators) -> str:
+    temp_path = cache.create_temp_file()
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    return cache.store(url, temp_path, **validators)
+
+
+def test_store_holds_one_reference_until_released(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    path = store_bytes(cache, 'http://a/1.mp3', b'x' * 10)
+
+    assert os.path.exists(path)
+    assert cache.stats()['pinned'] == 1
+    cache.release(path)
+    assert cache.stats()['pinned'] == 0
+
+
+def test_retain_and_release_are_counted(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    path = store_bytes(cache, 'http://a/1.mp3', b'x' * 10)
+    cache.retain(path, 2)
+
+    cache.release(path)
+    cache.release(path)
+    assert cache.stats()['pinned'] == 1
+    cache.release(path)
+    assert cache.stats()['pinned'] == 0
+
+
+def test_retain_requires_a_held_path(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    path = store_bytes(cache, 'http://a/1.mp3', b'x' * 10)
+    cache.release(path)
+
+    with pytest.raises(KeyError):
+        cache.retain(path)
+
+
+def test_identical_bytes_share_one_blob(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    first = store_bytes(cache, 'http://a/1.mp3', b'same')
+    second = store_bytes(cache, 'http://b/2.mp3', b'same')
+
+    assert first == second
+    assert cache.stats()['blobs'] == 1
+    assert cache.stats()['entries'] == 2
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+
+
+def test_least_recently_used_blob_is_evicted(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=250)
+    for name in ('1', '2'):
+        cache.release(store_bytes(cache, f'http://a/{name}.mp3', name.encode() * 100))
+    # Touch the first blob so the second becomes the oldest
+    cache.release(cache.hit(cache.lookup('http://a/1.mp3')))
+
+    cache.release(store_bytes(cache, 'http://a/3.mp3', b'3' * 100))
+
+    assert cache.lookup('http://a/1.mp3') is not None
+    assert cache.lookup('http://a/2.mp3') is None
+    assert cache.lookup('http://a/3.mp3') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] == 200
+
+
+def test_held_blob_is_not_evicted_until_released(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=150)
+    held = store_bytes(cache, 'http://a/1.mp3', b'1' * 100)
+    cache.release(store_bytes(cache, 'http://a/2.mp3', b'2' * 100))
+    assert os.path.exists(held)
+    assert cache.lookup('http://a/2.mp3') is None
+
+    # Both held: the cache stays over budget rather than drop either
+    newer = store_bytes(cache, 'http://a/3.mp3', b'3' * 100)
+    assert cache.stats()['bytes'] == 200
+
+    cache.release(held)
+    assert not os.path.exists(held)
+    assert os.path.exists(newer)
+    assert cache.stats()['bytes'] == 100
+
+
+def test_variants_are_evicted_with_their_blob(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    path = store_bytes(cache, 'http://a/1.mp3', b'1' * 100)
+    digest = cache.digest_for(path)
+    with open(cache.variant_path(digest, '.pcm'), 'wb') as f:
+        f.write(b'p' * 400)
+    variant = cache.add_variant(digest, '.pcm')
+    cache.release(path)
+    assert cache.has_variant(digest, '.pcm')
+    assert cache.stats()['bytes'] == 500
+
+    cache.release(store_bytes(cache, 'http://a/2.mp3', b'2' * 600))
+
+    assert not os.path.exists(variant)
+    assert not cache.has_variant(digest, '.pcm')
+
+
+def test_conditional_headers_use_stored_validators(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    cache.release(store_bytes(
+        cache, 'http://a/1.mp3', b'x', etag='"v1"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT'
+    ))
+
+    assert cache.conditional_headers(cache.lookup('http://a/1.mp3')) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    }
+    assert cache.conditional_headers(None) == {}
+
+
+def test_revalidation_refreshes_an_entry(tmp_path):
+    cache = AudioCache(str(tmp_path), revalidate_after=60)
+    cache.release(store_bytes(cache, 'http://a/1.mp3', b'x'))
+    entry = cache.lookup('http://a/1.mp3')
+    entry.validated_at -= 120
+    assert not cache.is_fresh(entry)
+
+    cache.release(cache.hit(entry, revalidated=True))
+
+    assert cache.is_fresh(entry)
+    assert cache.stats()['revalidations'] == 1
+
+
+def test_index_survives_a_restart(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    path = store_bytes(cache, 'http://a/1.mp3', b'x' * 10, etag='"v1"')
+    cache.release(path)
+    partial = cache.create_temp_file()
+    stray = os.path.join(tmp_path, 'unknown.mp3')
+    open(stray, 'wb').close()
+
+    reloaded = AudioCache(str(tmp_path))
+
+    entry = reloaded.lookup('http://a/1.mp3')
+    assert entry is not None and entry.etag == '"v1"'
+    assert reloaded.stats()['bytes'] == 10
+    assert not os.path.exists(partial)
+    assert not os.path.exists(stray)
+
+
+def test_unreadable_index_starts_empty(tmp_path):
+    with open(os.path.join(tmp_path, INDEX_FILE), 'w') as f:
+        f.write('{not json')
+
+    cache = AudioCache(str(tmp_path))
+    assert cache.stats()['entries'] == 0
+
+    cache.release(store_bytes(cache, 'http://a/1.mp3', b'x'))
+    with open(os.path.join(tmp_path, INDEX_FILE)) as f:
+        assert list(json.load(f)['entries']) == ['http://a/1.mp3']
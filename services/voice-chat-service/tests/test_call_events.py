@@ -0,0 +1,75 @@
+"""Tests for the call event bus."""
+
+import asyncio
+
+from call_events import CallEvent, CallEventBus
+
+
+def test_subscribers_get_only_the_chats_and_users_they_asked_for():
+    async def main():
+        bus = CallEventBus()
+        everything = bus.subscribe()
+        chat = bus.subscribe(keys=[-1])
+        user = bus.subscribe(keys=[7])
+        bus.publish(CallEvent(CallEvent.JOINED, chat_id=-1))
+        bus.publish(CallEvent(CallEvent.PLAYING, user_id=7))
+        bus.close()
+
+        async def drain(subscription):
+            kinds = []
+            while (item := await subscription.get()) is not None:
+                kinds.append(item[0].kind)
+            return kinds
+
+        assert await drain(everything) == [CallEvent.JOINED, CallEvent.PLAYING]
+        assert await drain(chat) == [CallEvent.JOINED]
+        assert await drain(user) == [CallEvent.PLAYING]
+
+    asyncio.run(main())
+
+
+def test_slow_subscriber_loses_the_oldest_events_and_is_told_how_many():
+    async def main():
+        bus = CallEventBus()
+        subscription = bus.subscribe(buffer_size=2)
+        for index in range(5):
+            bus.publish(CallEvent(CallEvent.PLAYING, chat_id=-1, message=str(index)))
+
+        event, dropped = await subscription.get()
+        assert (event.message, dropped) == ('3', 3)
+        event, dropped = await subscription.get()
+        assert (event.message, dropped) == ('4', 0)
+
+    asyncio.run(main())
+
+
+def test_drops_are_carried_when_the_buffer_holds_one_event():
+    async def main():
+        subscription = CallEventBus().subscribe(buffer_size=1)
+        for index in range(3):
+            subscription.put(CallEvent(CallEvent.PLAYING, message=str(index)))
+
+        event, dropped = await subscription.get()
+        assert (event.message, dropped) == ('2', 2)
+
+    asyncio.run(main())
+
+
+def test_get_waits_for_an_event_and_ends_on_unsubscribe():
+    async def main():
+        bus = CallEventBus()
+        subscription = bus.subscribe()
+        waiter = asyncio.create_task(subscription.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        bus.publish(CallEvent(CallEvent.ENDED, chat_id=-1))
+        event, _ = await asyncio.wait_for(waiter, 1)
+        assert event.kind == CallEvent.ENDED
+
+        bus.unsubscribe(subscription)
+        assert await asyncio.wait_for(subscription.get(), 1) is None
+        bus.publish(CallEvent(CallEvent.ENDED, chat_id=-1))
+        assert await subscription.get() is None
+
+    asyncio.run(main())
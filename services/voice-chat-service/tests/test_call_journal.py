@@ -0,0 +1,101 @@
+"""Tests for the call journal."""
+
+import json
+import time
+
+import call_journal
+from call_journal import CallJournal
+
+
+def read_entries(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_reopened_journal_recovers_what_was_left_open(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CallJournal(str(path))
+    journal.open()
+    start_at = time.time() + 60
+    journal.record('joined', chat=-1, session=0)
+    journal.record('joined', chat=-2, session=1)
+    journal.record('left', chat=-2)
+    journal.record('called', call='c1', user=7, session=0)
+    journal.record('broadcast', chats=[-1, -3], start_at=start_at)
+    journal.record('queued', job='j1', chat=-1, url='http://a', priority=1, deadline=None)
+    journal.record('queued', job='j2', chat=-1, url='http://b', priority=0, deadline=start_at)
+    journal.record('dequeued', job='j1')
+    journal.record('fifo', dir='/tmp/fifo-1')
+    journal.close()
+
+    recovered = CallJournal(str(path)).open()
+    assert recovered.group_calls == {-1: 0}
+    assert recovered.private_calls == {'c1': (7, 0)}
+    assert recovered.broadcasts == {start_at: {-1, -3}}
+    assert list(recovered.clips.items()) == [('j2', (-1, 'http://b', 0, start_at))]
+    assert recovered.fifo_dirs == {'/tmp/fifo-1'}
+
+
+def test_clips_keep_their_queue_order(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CallJournal(str(path))
+    journal.open()
+    for job_id in ('j3', 'j1', 'j2'):
+        journal.record('queued', job=job_id, chat=-1, url='http://a', priority=1, deadline=None)
+    journal.close()
+
+    assert list(CallJournal(str(path)).open().clips) == ['j3', 'j1', 'j2']
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    path.write_text(
+        json.dumps({'op': 'joined', 'chat': -1, 'session': 0}) + '\n'
+        + json.dumps({'op': 'called'}) + '\n'
+        + '{"op": "left", "ch'
+    )
+
+    recovered = CallJournal(str(path)).open()
+    assert recovered.group_calls == {-1: 0}
+    assert recovered.private_calls == {}
+
+
+def test_open_rewrites_the_journal_with_only_open_entries(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CallJournal(str(path))
+    journal.open()
+    journal.record('broadcast', chats=[-1], start_at=time.time() - 60)
+    journal.record('called', call='c1', user=7, session=0)
+    journal.record('hung_up', call='c1')
+    journal.record('joined', chat=-1, session=2)
+    journal.close()
+
+    reopened = CallJournal(str(path))
+    reopened.open()
+    assert read_entries(path) == [{'op': 'joined', 'chat': -1, 'session': 2}]
+
+    reopened.record('left', chat=-1)
+    reopened.close()
+    assert len(CallJournal(str(path)).open()) == 0
+
+
+def test_journal_is_compacted_once_it_grows(tmp_path, monkeypatch):
+    monkeypatch.setattr(call_journal, 'COMPACT_AFTER_LINES', 10)
+    path = tmp_path / 'journal.jsonl'
+    journal = CallJournal(str(path))
+    journal.open()
+    journal.record('joined', chat=-1, session=0)
+    for index in range(20):
+        journal.record('called', call=f'c{index}', user=index, session=0)
+        journal.record('hung_up', call=f'c{index}')
+    journal.close()
+
+    assert len(read_entries(path)) <= 12
+    assert CallJournal(str(path)).open().group_calls == {-1: 0}
+
+
+def test_journal_without_a_path_records_nothing():
+    journal = CallJournal()
+    assert len(journal.open()) == 0
+    journal.record('joined', chat=-1, session=0)
+    assert len(journal.state) == 0
+    journal.close()
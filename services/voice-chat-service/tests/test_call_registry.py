@@ -0,0 +1,116 @@
+"""Tests for the call registry."""
+
+import pytest
+
+from call_registry import CallRecord, CallRegistry
+
+
+def group(chat_id: int, state: str = CallRecord.PLAYING) -> CallRecord:
+    return CallRecord(CallRecord.GROUP, chat_id=chat_id, state=state)
+
+
+def private(call_id: str, user_id: int, state: str = CallRecord.STARTING) -> CallRecord:
+    return CallRecord(CallRecord.PRIVATE, user_id=user_id, call_id=call_id, state=state)
+
+
+def test_calls_are_indexed_by_chat_call_and_user():
+    calls = CallRegistry()
+    chat = calls.add(group(-1))
+    call = calls.add(private('c1', 7))
+
+    assert calls.chat(-1) is chat
+    assert calls.call('c1') is call
+    assert calls.user(7) is None
+    calls.connect(call)
+    assert calls.user(7) is call
+    assert len(calls) == 2
+    assert calls.chat_ids() == [-1]
+    assert calls.user_ids() == [7]
+
+
+def test_add_refuses_a_second_group_call_for_a_chat():
+    calls = CallRegistry()
+    first = calls.add(group(-1))
+
+    with pytest.raises(ValueError):
+        calls.add(group(-1))
+    assert calls.chat(-1) is first
+    assert calls.count(CallRecord.GROUP, CallRecord.PLAYING) == 1
+
+    calls.remove(first)
+    calls.add(group(-1))
+    assert calls.count(CallRecord.GROUP) == 1
+
+
+def test_counts_follow_state_changes_and_removal():
+    calls = CallRegistry()
+    record = calls.add(group(-1, CallRecord.WARM))
+    calls.add(group(-2))
+
+    assert calls.count(CallRecord.GROUP, CallRecord.WARM) == 1
+    assert calls.count(CallRecord.GROUP, CallRecord.WARM, CallRecord.PLAYING) == 2
+    calls.set_state(record, CallRecord.PLAYING)
+    assert calls.count(CallRecord.GROUP, CallRecord.WARM) == 0
+    assert calls.count(CallRecord.GROUP, CallRecord.PLAYING) == 2
+
+    assert calls.remove(record)
+    assert not calls.remove(record)
+    assert calls.count(CallRecord.GROUP, CallRecord.PLAYING) == 1
+    assert calls.count(CallRecord.GROUP) == 1
+
+
+def test_state_of_an_unregistered_record_is_not_counted():
+    calls = CallRegistry()
+    record = group(-1)
+    calls.set_state(record, CallRecord.ENDING)
+
+    assert record.state == CallRecord.ENDING
+    assert calls.count(CallRecord.GROUP, CallRecord.ENDING) == 0
+
+
+def test_removed_call_only_unindexes_its_own_user():
+    calls = CallRegistry()
+    old = calls.add(private('c1', 7, CallRecord.PLAYING))
+    calls.connect(old)
+    new = calls.add(private('c2', 7, CallRecord.PLAYING))
+    calls.connect(new)
+
+    calls.remove(old)
+    assert calls.user(7) is new
+    assert calls.call('c1') is None
+    assert calls.count(CallRecord.PRIVATE, CallRecord.PLAYING) == 1
+
+
+def test_audio_is_taken_back_once():
+    calls = CallRegistry()
+    record = calls.add(group(-1))
+    calls.hold_audio(record, None)
+    assert calls.holding_audio == 0
+
+    calls.hold_audio(record, '/cache/a')
+    calls.hold_audio(record, '/cache/b')
+    assert calls.holding_audio == 1
+    assert calls.take_audio(record) == ('/cache/b', None)
+    assert calls.take_audio(record) == (None, None)
+    assert calls.holding_audio == 0
+
+
+def test_progressive_audio_counts_as_held():
+    calls = CallRegistry()
+    record = calls.add(group(-1))
+    download = object()
+    calls.hold_audio(record, None, download)
+
+    assert calls.holding_audio == 1
+    assert calls.take_audio(record) == (None, download)
+    assert calls.holding_audio == 0
+
+
+def test_records_is_a_snapshot():
+    calls = CallRegistry()
+    calls.add(group(-1))
+    calls.add(private('c1', 7))
+
+    for record in calls.records():
+        calls.remove(record)
+    assert len(calls) == 0
@@ -0,0 +1,96 @@
+"""Tests for the gRPC servicer of a single voice chat service process."""
+
+import asyncio
+import os
+import signal
+
+import pytest
+
+import voice_chat_pb2
+from fakes import FakeBehavior
+from grpc_server import VoiceChatServicer, wait_for_shutdown_signal
+from helpers import URL, make_manager
+from stream_jobs import StreamJob
+
+
+def test_stream_azan_reports_a_queued_stream_as_queued(tmp_path):
+    async def main():
+        behavior = FakeBehavior(join_latency=0.02, join_jitter=0, stream_seconds=30, rpc_latency=0)
+        manager = make_manager(tmp_path, behavior=behavior)
+        await manager.start()
+        servicer = VoiceChatServicer(manager)
+        request = voice_chat_pb2.StreamAzanRequest(chat_id=-1, audio_url=URL)
+
+        first = await servicer.StreamAzan(request, None)
+        second = await servicer.StreamAzan(request, None)
+        assert (first.success, first.message) == (True, "Started streaming azan")
+        assert (second.success, second.message) == (True, "Queued behind the audio playing in the chat")
+        assert manager.get_stream_job(second.job_id).state == StreamJob.QUEUED
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize('sig', [signal.SIGTERM, signal.SIGINT])
+def test_shutdown_waits_for_sigterm_or_sigint(sig):
+    async def main():
+        waiting = asyncio.create_task(wait_for_shutdown_signal())
+        await asyncio.sleep(0)
+        os.kill(os.getpid(), sig)
+        return await asyncio.wait_for(waiting, 1)
+
+    assert asyncio.run(main()) == sig.name
+    # The handlers are removed again once the signal arrived
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+def test_health_check_separates_liveness_from_readiness(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path, sessions=2, max_concurrent_joins=8)
+        servicer = VoiceChatServicer(manager)
+        request = voice_chat_pb2.HealthCheckRequest()
+        first, second = manager.sessions
+
+        health = await servicer.HealthCheck(request, None)
+        assert (health.healthy, health.live, health.ready) == (False, False, False)
+
+        first.client.is_connected = second.client.is_connected = True
+        health = await servicer.HealthCheck(request, None)
+        assert (health.healthy, health.live, health.ready) == (True, True, True)
+        assert health.admission_available == 8
+        assert [session.connected for session in health.sessions] == [True, True]
+
+        # Every session in FloodWait: still alive, but not ready for new calls
+        manager.sessions.report_flood_wait(first, 60)
+        manager.sessions.report_flood_wait(second, 60)
+        health = await servicer.HealthCheck(request, None)
+        assert (health.healthy, health.live, health.ready) == (True, True, False)
+        assert all(session.flood_wait_until_unix_ms > 0 for session in health.sessions)
+
+        first.flood_until = second.flood_until = 0
+        await manager.drain(0)
+        health = await servicer.HealthCheck(request, None)
+        assert (health.healthy, health.ready, health.draining) == (True, False, True)
+        assert health.drain_deadline_unix_ms > 0
+
+    asyncio.run(main())
+
+
+def test_health_check_reports_calls_and_admission_load(tmp_path):
+    async def main():
+        behavior = FakeBehavior(join_latency=0.02, join_jitter=0, stream_seconds=30, rpc_latency=0)
+        manager = make_manager(tmp_path, behavior=behavior, max_concurrent_joins=8)
+        await manager.start()
+        servicer = VoiceChatServicer(manager)
+        await manager.stream_audio(-1, URL)
+        await manager.admission.acquire(manager.sessions.sessions[0])
+
+        health = await servicer.HealthCheck(voice_chat_pb2.HealthCheckRequest(), None)
+        assert (health.group_calls, health.private_calls, health.active_streams) == (1, 0, 1)
+        assert (health.admission_in_flight, health.admission_available) == (1, 7)
+        assert health.sessions[0].calls == 1
+        assert health.sessions[0].admission_in_flight == 1
+        manager.admission.release(manager.sessions.sessions[0])
+        await manager.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""Tests for keyed locks and the idempotency operation cache."""
+
+import asyncio
+
+import pytest
+
+from idempotency import KeyedLocks, OperationCache
+from timer_wheel import TimerWheel
+
+
+class Counter:
+    """An operation counting its runs, finishing when released."""
+
+    def __init__(self, result=True, error=None):
+        self.result = result
+        self.error = error
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_duplicate_requests_share_one_run():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01))
+        operation = Counter(result='job-1')
+        first = asyncio.create_task(cache.run('key', operation))
+        second = asyncio.create_task(cache.run('key', operation))
+        await asyncio.sleep(0)
+        operation.release.set()
+
+        assert await asyncio.gather(first, second) == ['job-1', 'job-1']
+        assert operation.runs == 1
+        assert await cache.run('key', operation) == 'job-1'
+        assert operation.runs == 1
+
+    asyncio.run(main())
+
+
+def test_different_keys_run_separately():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01))
+        operation = Counter()
+        operation.release.set()
+        await cache.run('a', operation)
+        await cache.run('b', operation)
+        assert operation.runs == 2
+        assert len(cache) == 2
+
+    asyncio.run(main())
+
+
+def test_success_is_forgotten_after_the_ttl():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01), ttl_seconds=0.05)
+        operation = Counter()
+        operation.release.set()
+        await cache.run('key', operation)
+        await asyncio.sleep(0.15)
+
+        assert len(cache) == 0
+        await cache.run('key', operation)
+        assert operation.runs == 2
+
+    asyncio.run(main())
+
+
+def test_failed_result_is_forgotten_at_once():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01))
+        operation = Counter(result=(False, "busy"))
+        operation.release.set()
+
+        assert await cache.run('key', operation, lambda result: result[0]) == (False, "busy")
+        assert len(cache) == 0
+        await cache.run('key', operation, lambda result: result[0])
+        assert operation.runs == 2
+
+    asyncio.run(main())
+
+
+def test_exception_reaches_every_waiter_and_is_forgotten():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01))
+        operation = Counter(error=RuntimeError("origin down"))
+        waiters = [asyncio.create_task(cache.run('key', operation)) for _ in range(2)]
+        await asyncio.sleep(0)
+        operation.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert operation.runs == 1
+        assert len(cache) == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_the_operation():
+    async def main():
+        cache = OperationCache(TimerWheel(tick_seconds=0.01))
+        operation = Counter(result='done')
+        first = asyncio.create_task(cache.run('key', operation))
+        second = asyncio.create_task(cache.run('key', operation))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        operation.release.set()
+        assert await second == 'done'
+
+    asyncio.run(main())
+
+
+def test_keyed_locks_serialize_one_key_and_are_dropped_when_free():
+    async def main():
+        locks = KeyedLocks()
+        order = []
+
+        async def hold(key, name):
+            async with locks.hold(key):
+                order.append(f'{name} in')
+                await asyncio.sleep(0.01)
+                order.append(f'{name} out')
+
+        await asyncio.gather(hold('a', 'first'), hold('a', 'second'), hold('b', 'other'))
+        assert order.index('first out') < order.index('second in')
+        assert order.index('other in') < order.index('first out')
+        assert len(locks) == 0
+        assert not locks.locked('a')
+
+    asyncio.run(main())
+
+
+def test_keyed_lock_is_dropped_after_an_error():
+    async def main():
+        locks = KeyedLocks()
+        with pytest.raises(ValueError):
+            async with locks.hold('a'):
+                assert locks.locked('a')
+                raise ValueError
+        assert len(locks) == 0
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""Tests for the metrics endpoint and gRPC interceptor."""
+
+import asyncio
+import socket
+from types import SimpleNamespace
+
+import aiohttp
+import grpc
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+
+from metrics import MetricsInterceptor, start_metrics_server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def observed(method: str) -> float:
+    return REGISTRY.get_sample_value('voice_chat_grpc_request_seconds_count', {'method': method}) or 0.0
+
+
+def test_endpoint_serves_the_registry():
+    async def main():
+        registry = CollectorRegistry()
+        Counter('test_requests', 'Requests', registry=registry).inc(3)
+        port = free_port()
+        runner = await start_metrics_server(port, '127.0.0.1', registry)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                    assert response.status == 200
+                    assert response.headers['Content-Type'].startswith('text/plain')
+                    body = await response.text()
+        finally:
+            await runner.cleanup()
+        assert 'test_requests_total 3.0' in body
+
+    asyncio.run(main())
+
+
+def test_interceptor_times_unary_calls_by_method():
+    async def main():
+        async def behavior(request, context):
+            return request * 2
+
+        async def continuation(details):
+            return grpc.unary_unary_rpc_method_handler(behavior)
+
+        details = SimpleNamespace(method='/voicechat.VoiceChatService/TestMethod')
+        before = observed('TestMethod')
+        handler = await MetricsInterceptor().intercept_service(continuation, details)
+        assert await handler.unary_unary(21, None) == 42
+        assert observed('TestMethod') == before + 1
+
+    asyncio.run(main())
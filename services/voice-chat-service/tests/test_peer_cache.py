@@ -0,0 +1,169 @@
+"""Tests for the peer cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pyrogram.raw
+from pyrogram import utils
+from pyrogram.dispatcher import Dispatcher
+from pyrogram.handlers import RawUpdateHandler
+
+from peer_cache import PeerCache
+from timer_wheel import TimerWheel
+
+
+class FakeClient:
+    """A client resolving every chat to a channel peer, counting resolutions."""
+
+    def __init__(self, account_id: int):
+        self.name = f'client-{account_id}'
+        self.me = SimpleNamespace(id=account_id)
+        self.resolved = 0
+
+    async def resolve_peer(self, chat_id: int):
+        self.resolved += 1
+        channel_id = utils.get_channel_id(chat_id)
+        return pyrogram.raw.types.InputPeerChannel(channel_id=channel_id, access_hash=self.me.id * 1000 + channel_id)
+
+
+def channel(channel_id: int) -> int:
+    return utils.get_peer_id(pyrogram.raw.types.PeerChannel(channel_id=channel_id))
+
+
+def make_cache(path=None, **options) -> PeerCache:
+    return PeerCache(TimerWheel(tick_seconds=0.01), str(path) if path else None, **options)
+
+
+def test_resolved_peer_is_served_from_the_cache():
+    async def main():
+        cache = make_cache()
+        client = FakeClient(1)
+        first = await cache.resolve(client, channel(1))
+        second = await cache.resolve(client, channel(1))
+
+        assert client.resolved == 1
+        assert second.channel_id == first.channel_id
+        assert second.access_hash == first.access_hash
+
+    asyncio.run(main())
+
+
+def test_peers_are_cached_per_account():
+    async def main():
+        cache = make_cache()
+        first, second = FakeClient(1), FakeClient(2)
+        await cache.resolve(first, channel(1))
+        peer = await cache.resolve(second, channel(1))
+
+        assert second.resolved == 1
+        assert peer.access_hash == 2001
+
+    asyncio.run(main())
+
+
+def test_expired_peer_is_resolved_again():
+    async def main():
+        cache = make_cache(peer_ttl=0)
+        client = FakeClient(1)
+        await cache.resolve(client, channel(1))
+        await cache.resolve(client, channel(1))
+        assert client.resolved == 2
+
+    asyncio.run(main())
+
+
+def test_least_recently_used_peer_is_dropped_first():
+    async def main():
+        cache = make_cache(max_entries=2)
+        client = FakeClient(1)
+        for chat_id in (channel(1), channel(2)):
+            await cache.resolve(client, chat_id)
+        await cache.resolve(client, channel(1))
+        await cache.resolve(client, channel(3))
+
+        await cache.resolve(client, channel(1))
+        assert client.resolved == 3
+        await cache.resolve(client, channel(2))
+        assert client.resolved == 4
+
+    asyncio.run(main())
+
+
+def test_group_call_state_expires():
+    cache = make_cache(group_call_ttl=60)
+    assert cache.has_group_call(channel(1)) is None
+    cache.set_group_call(channel(1), False)
+    assert cache.has_group_call(channel(1)) is False
+
+    cache.group_call_ttl = 0
+    cache.set_group_call(channel(1), True)
+    assert cache.has_group_call(channel(1)) is None
+
+
+def test_channel_update_forgets_the_channel():
+    async def main():
+        cache = make_cache()
+        client = FakeClient(1)
+        await cache.resolve(client, channel(1))
+        cache.set_group_call(channel(1), True)
+
+        update = pyrogram.raw.types.UpdateChannel(channel_id=1)
+        await cache.on_raw_update(client, update, {}, {})
+        assert cache.has_group_call(channel(1)) is None
+        await cache.resolve(client, channel(1))
+        assert client.resolved == 2
+
+    asyncio.run(main())
+
+
+def test_cache_survives_a_restart(tmp_path):
+    path = tmp_path / 'peers.json'
+
+    async def main():
+        cache = make_cache(path)
+        await cache.resolve(FakeClient(1), channel(1))
+        cache.set_group_call(channel(1), True)
+        cache.save()
+
+        restarted = make_cache(path)
+        client = FakeClient(1)
+        peer = await restarted.resolve(client, channel(1))
+        assert client.resolved == 0
+        assert peer.access_hash == 1001
+        assert restarted.has_group_call(channel(1)) is True
+
+    asyncio.run(main())
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / 'peers.json'
+    path.write_text('{"peers": [')
+    assert make_cache(path).has_group_call(channel(1)) is None
+
+
+def test_watch_sees_updates_alongside_the_pytgcalls_handler():
+    async def main():
+        client = FakeClient(1)
+        client.no_updates, client.workers = False, 1
+        dispatcher = Dispatcher(client)
+        client.add_handler = dispatcher.add_handler
+        await dispatcher.start()
+
+        pytgcalls_updates = []
+
+        async def pytgcalls_handler(client, update, users, chats):
+            pytgcalls_updates.append(update)
+
+        # PyTgCalls registers its raw update handler in the default group
+        client.add_handler(RawUpdateHandler(pytgcalls_handler), 0)
+        cache = make_cache()
+        cache.watch(client)
+        cache.set_group_call(channel(1), True)
+        await asyncio.sleep(0)
+
+        dispatcher.updates_queue.put_nowait((pyrogram.raw.types.UpdateChannel(channel_id=1), {}, {}))
+        await dispatcher.stop()
+        assert len(pytgcalls_updates) == 1
+        assert cache.has_group_call(channel(1)) is None
+
+    asyncio.run(main())
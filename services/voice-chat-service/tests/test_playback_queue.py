@@ -0,0 +1,38 @@
+"""Tests for per-chat playback queues."""
+
+from playback_queue import PlaybackQueues, QueuedClip
+from stream_jobs import StreamJob
+
+
+def test_open_returns_the_chat_queue_until_it_is_closed():
+    queues = PlaybackQueues()
+    queue = queues.open(-1)
+
+    assert queues.open(-1) is queue
+    assert -1 in queues
+    assert queues.chat_ids() == [-1]
+    queues.close(queue)
+    assert queues.get(-1) is None
+    assert len(queues) == 0
+
+
+def test_closing_a_replaced_queue_keeps_the_new_one():
+    queues = PlaybackQueues()
+    old = queues.open(-1)
+    queues.close(old)
+    new = queues.open(-1)
+
+    queues.close(old)
+    assert queues.get(-1) is new
+
+
+def test_clear_cancels_waiting_clips_in_order():
+    queue = PlaybackQueues().open(-1)
+    jobs = [StreamJob(-1, f'http://clip/{i}') for i in range(3)]
+    for job in jobs:
+        queue.clips.append(QueuedClip(job, 1, None))
+
+    assert queue.clear("Left the voice chat") == jobs
+    assert len(queue) == 0
+    assert all(job.state == StreamJob.CANCELLED for job in jobs)
+    assert jobs[0].message == "Left the voice chat"
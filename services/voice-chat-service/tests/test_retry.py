@@ -0,0 +1,52 @@
+"""Tests for retry budgets."""
+
+import asyncio
+import time
+
+import pytest
+
+from retry import RetryPolicy, is_transient
+
+
+def test_network_hiccups_are_transient_and_refusals_are_not():
+    assert is_transient(ConnectionResetError())
+    assert is_transient(asyncio.TimeoutError())
+    assert not is_transient(ValueError())
+
+
+def test_backoff_grows_with_jitter_up_to_the_cap():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    for retry, ceiling in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 4.0)):
+        for _ in range(20):
+            assert ceiling / 2 <= policy.backoff_delay(retry) <= ceiling
+
+
+def test_budget_runs_out_of_attempts():
+    budget = RetryPolicy(max_attempts=3, base_delay=0.01).budget()
+    assert budget.backoff() is not None
+    assert budget.backoff() is not None
+    assert budget.backoff() is None
+    assert budget.attempts == 3
+
+
+def test_budget_never_sleeps_past_the_deadline():
+    policy = RetryPolicy(base_delay=2.0)
+    assert policy.budget(deadline=time.time() + 0.5).backoff() is None
+    assert policy.budget(deadline=time.time() + 60).backoff() is not None
+
+
+def test_budget_is_capped_by_its_time_limit():
+    policy = RetryPolicy(budget_seconds=10)
+    budget = policy.budget(deadline=time.time() + 3600)
+    assert budget.deadline == pytest.approx(time.time() + 10, abs=1)
+
+
+def test_flood_wait_goes_ahead_only_if_it_fits():
+    policy = RetryPolicy(max_attempts=3, max_flood_wait_seconds=30)
+    budget = policy.budget(deadline=time.time() + 20)
+
+    assert not budget.wait(45)
+    assert not budget.wait(25)
+    assert budget.wait(5)
+    assert budget.wait(5)
+    assert not budget.wait(5)
@@ -0,0 +1,136 @@
+"""Tests for routing calls across worker processes."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import router as router_module
+import voice_chat_pb2
+from call_events import EventSubscription
+from router import VoiceChatRouter, WorkerHandle
+
+
+def make_router(count: int = 3) -> VoiceChatRouter:
+    workers = [WorkerHandle(index, 50100 + index) for index in range(count)]
+    for worker in workers:
+        worker.apply_report({'reported_at': time.time()})
+    return VoiceChatRouter(workers, stale_after=10)
+
+
+class FakeStub:
+    """Worker stub answering StreamAzan and GetStreamStatus for the jobs it started."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.requests = 0
+
+    async def StreamAzan(self, request, timeout=None):
+        self.requests += 1
+        return voice_chat_pb2.StreamAzanResponse(success=True, job_id=f'{self.name}-{request.chat_id}')
+
+    async def GetStreamStatus(self, request, timeout=None):
+        return voice_chat_pb2.StreamStatusResponse(success=request.job_id.startswith(self.name), job_id=request.job_id)
+
+
+def test_chat_goes_to_the_same_worker_every_time():
+    async def main():
+        router, other = make_router(), make_router()
+        for chat_id in range(-50, 0):
+            assert router.worker_for(chat_id).index == other.worker_for(chat_id).index
+        await router.close()
+        await other.close()
+
+    asyncio.run(main())
+
+
+def test_chat_with_a_call_stays_on_the_worker_holding_it():
+    async def main():
+        router = make_router()
+        holder = next(worker for worker in router.workers if worker is not router.worker_for(-1))
+        holder.apply_report({'chats': [-1], 'ready': False, 'reported_at': time.time()})
+        assert router.worker_for(-1) is holder
+        await router.close()
+
+    asyncio.run(main())
+
+
+def test_new_chats_avoid_stale_busy_and_overloaded_workers():
+    async def main():
+        router = make_router()
+        preferred = router.worker_for(-1)
+
+        preferred.reported_at = time.time() - 60
+        assert router.worker_for(-1) is not preferred
+
+        preferred.apply_report({'reported_at': time.time(), 'available': 0})
+        assert router.worker_for(-1) is not preferred
+
+        preferred.apply_report({'reported_at': time.time(), 'chats': list(range(1, 20))})
+        assert router.worker_for(-1) is not preferred
+        await router.close()
+
+    asyncio.run(main())
+
+
+def test_no_ready_worker_fails_the_request():
+    async def main():
+        router = make_router()
+        for worker in router.workers:
+            worker.mark_down()
+        assert router.worker_for(-1) is None
+
+        response = await router.StreamAzan(voice_chat_pb2.StreamAzanRequest(chat_id=-1), None)
+        assert not response.success
+        assert response.message == "No voice chat workers available"
+        await router.close()
+
+    asyncio.run(main())
+
+
+def test_follow_up_requests_reach_the_worker_running_the_job():
+    async def main():
+        router = make_router()
+        for worker in router.workers:
+            worker.stub = FakeStub(worker.name)
+        context = SimpleNamespace(time_remaining=lambda: None)
+
+        response = await router.StreamAzan(voice_chat_pb2.StreamAzanRequest(chat_id=-1), context)
+        worker = router.worker_for(-1)
+        assert worker.stub.requests == 1
+        assert worker.holds(-1)
+        assert await router._find_job_worker(response.job_id) is worker
+
+        router._jobs.clear()
+        assert await router._find_job_worker(response.job_id) is worker
+        await router.close()
+
+    asyncio.run(main())
+
+
+def test_event_relay_resubscribes_after_any_failure(monkeypatch):
+    monkeypatch.setattr(router_module, 'EVENT_RESUBSCRIBE_SECONDS', 0.01)
+
+    class FlakyStub:
+        def __init__(self):
+            self.subscriptions = 0
+
+        async def SubscribeCallEvents(self, request):
+            self.subscriptions += 1
+            if self.subscriptions == 1:
+                raise RuntimeError("channel closed")
+            yield voice_chat_pb2.CallEvent(chat_id=-1)
+
+    async def main():
+        router = make_router(1)
+        worker = router.workers[0]
+        worker.stub = FlakyStub()
+        subscription = EventSubscription(8)
+        relay = asyncio.create_task(router._relay_events(worker, voice_chat_pb2.SubscribeCallEventsRequest(), subscription))
+
+        event, _ = await asyncio.wait_for(subscription.get(), 1)
+        assert event.chat_id == -1
+        assert worker.stub.subscriptions >= 2
+        relay.cancel()
+        await router.close()
+
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Tests for session sharding."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from session_pool import SessionPool, VoiceSession
+
+
+def make_pool(count: int, **options) -> SessionPool:
+    return SessionPool([VoiceSession(i, SimpleNamespace(is_connected=True), None) for i in range(count)], **options)
+
+
+def test_chat_lands_on_the_same_session_every_time():
+    pool = make_pool(4)
+    other = make_pool(4)
+    for chat_id in range(-100, 0):
+        assert pool.session_for(chat_id).index == other.session_for(chat_id).index
+
+
+def test_chats_are_spread_across_sessions():
+    pool = make_pool(4)
+    for chat_id in range(-400, 0):
+        pool.assign(chat_id)
+    loads = [session.load for session in pool]
+    assert sum(loads) == 400
+    assert max(loads) <= 1.25 * 400 / 4 + 1
+
+
+def test_assignment_sticks_until_released():
+    pool = make_pool(3)
+    session = pool.assign(-1)
+    pool.report_flood_wait(session, 60)
+
+    assert pool.get(-1) is session
+    assert pool.session_for(-1) is session
+    pool.release(-1)
+    assert pool.get(-1) is None
+    assert -1 not in session.chats
+    assert pool.session_for(-1) is not session
+
+
+def test_reassigning_moves_the_chat():
+    pool = make_pool(2)
+    first, second = pool.sessions
+    pool.assign(-1, first)
+    pool.assign(-1, second)
+
+    assert first.load == 0
+    assert second.chats == {-1}
+
+
+def test_flood_waited_session_is_skipped():
+    pool = make_pool(2)
+    preferred = pool.session_for(-1)
+    pool.report_flood_wait(preferred, 30)
+
+    assert preferred.is_flood_waited()
+    assert not preferred.is_usable()
+    assert preferred.flood_wait_remaining == pytest.approx(30, abs=1)
+    assert pool.session_for(-1) is not preferred
+
+
+def test_session_free_soonest_is_used_when_all_are_waiting():
+    pool = make_pool(3)
+    for session, seconds in zip(pool, (60, 10, 30)):
+        pool.report_flood_wait(session, seconds)
+    assert pool.session_for(-1).index == 1
+
+
+def test_flood_wait_is_never_shortened():
+    pool = make_pool(1)
+    session = pool.sessions[0]
+    pool.report_flood_wait(session, 60)
+    pool.report_flood_wait(session, 5)
+    assert session.flood_until > time.time() + 50
+
+
+def test_pool_needs_a_session():
+    with pytest.raises(ValueError):
+        SessionPool([])
@@ -0,0 +1,58 @@
+"""Tests for stream job tracking."""
+
+import asyncio
+import time
+
+from stream_jobs import StreamJob, StreamJobRegistry
+
+
+def test_update_wakes_watchers_and_reports_changes():
+    async def main():
+        updates = []
+        job = StreamJobRegistry(on_update=lambda job: updates.append(job.state)).create(-1, 'http://a')
+        watcher = asyncio.create_task(job.wait_for_change(job.version))
+        await asyncio.sleep(0)
+        assert not watcher.done()
+
+        job.update(StreamJob.PLAYING, "Streaming audio")
+        await asyncio.wait_for(watcher, 1)
+        job.update(StreamJob.COMPLETED, "Stream finished")
+        assert updates == [StreamJob.PLAYING, StreamJob.COMPLETED]
+        assert job.finished
+        await asyncio.wait_for(job.wait_for_change(0), 1)
+
+    asyncio.run(main())
+
+
+def test_elapsed_time_counts_from_the_start_of_playback():
+    job = StreamJob(-1, 'http://a')
+    assert job.elapsed_seconds == 0.0
+
+    job.update(StreamJob.PLAYING, "Streaming audio")
+    job.started_at -= 5
+    job.update(StreamJob.COMPLETED, "Stream finished")
+    assert 5 <= job.elapsed_seconds < 6
+
+
+def test_finished_jobs_are_pruned_after_the_retention():
+    jobs = StreamJobRegistry(retention_seconds=60)
+    old = jobs.create(-1, 'http://a')
+    old.update(StreamJob.COMPLETED, "Stream finished")
+    old.updated_at = time.time() - 120
+    running = jobs.create(-2, 'http://b', job_id='resumed')
+
+    jobs.create(-3, 'http://c')
+    assert jobs.get(old.job_id) is None
+    assert jobs.get('resumed') is running
+    assert jobs.active_count() == 2
+
+
+def test_pruning_stops_at_an_unfinished_job():
+    jobs = StreamJobRegistry(retention_seconds=0)
+    running = jobs.create(-1, 'http://a')
+    done = jobs.create(-2, 'http://b')
+    done.update(StreamJob.FAILED, "Join failed")
+
+    jobs.create(-3, 'http://c')
+    assert jobs.get(running.job_id) is running
+    assert jobs.get(done.job_id) is done
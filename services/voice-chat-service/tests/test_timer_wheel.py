@@ -0,0 +1,95 @@
+"""Tests for the timer wheel."""
+
+import asyncio
+
+from timer_wheel import TimerWheel
+
+
+def test_timers_fire_in_deadline_order():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01)
+        fired = []
+        for delay in (0.05, 0.01, 0.03):
+            wheel.schedule(delay, lambda delay=delay: fired.append(delay))
+        await asyncio.sleep(0.1)
+        assert fired == [0.01, 0.03, 0.05]
+        assert len(wheel) == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_timer_does_not_fire():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01)
+        fired = []
+        timer = wheel.schedule(0.02, lambda: fired.append('cancelled'))
+        wheel.schedule(0.02, lambda: fired.append('kept'))
+        wheel.cancel(timer)
+        wheel.cancel(timer)
+        wheel.cancel(None)
+        assert len(wheel) == 1
+
+        await asyncio.sleep(0.06)
+        assert fired == ['kept']
+        assert len(wheel) == 0
+
+    asyncio.run(main())
+
+
+def test_delays_longer_than_the_wheel_wait_for_their_round():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01, slots=4)
+        fired = []
+        wheel.schedule(0.09, lambda: fired.append('late'))
+        wheel.schedule(0.01, lambda: fired.append('early'))
+        await asyncio.sleep(0.05)
+        assert fired == ['early']
+        await asyncio.sleep(0.08)
+        assert fired == ['early', 'late']
+
+    asyncio.run(main())
+
+
+def test_coroutine_callbacks_run_as_tasks():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01)
+        done = asyncio.Event()
+
+        async def callback():
+            done.set()
+
+        wheel.schedule(0.01, callback)
+        await asyncio.wait_for(done.wait(), 1)
+
+    asyncio.run(main())
+
+
+def test_failing_callback_does_not_stop_the_wheel():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01)
+        fired = []
+        wheel.schedule(0.01, lambda: 1 / 0)
+        wheel.schedule(0.03, lambda: fired.append('after'))
+        await asyncio.sleep(0.08)
+        assert fired == ['after']
+
+    asyncio.run(main())
+
+
+def test_wheel_restarts_after_going_idle_and_close_drops_timers():
+    async def main():
+        wheel = TimerWheel(tick_seconds=0.01)
+        fired = []
+        wheel.schedule(0.01, lambda: fired.append(1))
+        await asyncio.sleep(0.05)
+        wheel.schedule(0.01, lambda: fired.append(2))
+        await asyncio.sleep(0.05)
+        assert fired == [1, 2]
+
+        wheel.schedule(0.01, lambda: fired.append(3))
+        wheel.close()
+        await asyncio.sleep(0.05)
+        assert fired == [1, 2]
+        assert len(wheel) == 0
+
+    asyncio.run(main())
@@ -0,0 +1,305 @@
+"""Tests for VoiceChatManager against the fake Telegram backend of the benchmark."""
+
+import asyncio
+import gc
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from call_registry import CallRecord
+from fakes import FakeBehavior
+from helpers import URL, make_manager, pinned, settle
+from stream_jobs import StreamJob
+from voice_chat import ServiceDraining, _DownloadFlight
+
+
+def test_batch_keeps_joining_when_the_caller_goes_away(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        await manager.start()
+        request = asyncio.create_task(manager.stream_audio_batch([-1, -2, -3], URL))
+        await asyncio.sleep(0.01)
+        request.cancel()
+        await asyncio.sleep(0.1)
+
+        jobs = [manager.stream_jobs.get(record.job_id) for record in manager.calls.records()]
+        assert len(jobs) == 3
+        assert all(job.state == StreamJob.PLAYING for job in jobs)
+        await settle(manager)
+        assert all(job.state == StreamJob.COMPLETED for job in jobs)
+        assert pinned(manager) == 0
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_cancelled_stream_starts_release_their_audio(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        await manager.start()
+        request = asyncio.create_task(manager.stream_audio_batch([-1, -2], URL))
+        await asyncio.sleep(0.01)
+        await manager.tasks.cancel_all()
+
+        jobs = await asyncio.gather(request, return_exceptions=True)
+        assert isinstance(jobs[0], asyncio.CancelledError)
+        assert manager.active_streams() == 0
+        assert pinned(manager) == 0
+        assert manager.sessions.get(-1) is None
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_leaves_no_background_work_behind(tmp_path):
+    async def main():
+        behavior = FakeBehavior(join_latency=0.02, join_jitter=0, stream_seconds=30, rpc_latency=0)
+        manager = make_manager(tmp_path, behavior=behavior)
+        await manager.start()
+        job = await manager.stream_audio(-1, URL)
+        manager.origin.release.clear()
+        starting = asyncio.create_task(manager.stream_audio(-2, URL + '?other'))
+        await asyncio.sleep(0.01)
+        assert len(manager.tasks) >= 2
+
+        await manager.stop()
+        assert len(manager.tasks) == 0
+        assert job.state == StreamJob.CANCELLED
+        assert manager.stream_jobs.active_count() == 0
+        assert isinstance((await asyncio.gather(starting, return_exceptions=True))[0], asyncio.CancelledError)
+        assert pinned(manager) == 0
+
+    asyncio.run(main())
+
+
+def test_concurrent_downloads_share_one_fetch_and_hold_a_reference_each(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        paths = await asyncio.gather(*(manager.download_audio(URL) for _ in range(5)))
+
+        assert manager.origin.fetches == 1
+        assert len(set(paths)) == 1
+        for path in paths[:4]:
+            manager.audio_cache.release(path)
+        assert pinned(manager) == 1
+        manager.audio_cache.release(paths[4])
+        assert pinned(manager) == 0
+        assert not manager._inflight_downloads
+
+    asyncio.run(main())
+
+
+def test_cancelled_download_waiter_gives_back_its_reference(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        manager.origin.release.clear()
+        cancelled = asyncio.create_task(manager.download_audio(URL))
+        waiting = asyncio.create_task(manager.download_audio(URL))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        manager.origin.release.set()
+
+        path = await waiting
+        assert cancelled.cancelled()
+        assert manager.origin.fetches == 1
+        manager.audio_cache.release(path)
+        assert pinned(manager) == 0
+
+    asyncio.run(main())
+
+
+def test_failed_download_reaches_every_waiter_and_is_tried_again(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        manager.origin.error = OSError("origin down")
+        results = await asyncio.gather(*(manager.download_audio(URL) for _ in range(3)), return_exceptions=True)
+
+        assert all(isinstance(result, OSError) for result in results)
+        assert manager.origin.fetches == 1
+        assert not manager._inflight_downloads
+        manager.origin.error = None
+        manager.audio_cache.release(await manager.download_audio(URL))
+        assert manager.origin.fetches == 2
+
+    asyncio.run(main())
+
+
+def test_failed_download_with_every_waiter_gone_reports_nothing(tmp_path):
+    async def main():
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        manager = make_manager(tmp_path)
+        manager.origin.release.clear()
+        manager.origin.error = OSError("origin down")
+        waiter = asyncio.create_task(manager.download_audio(URL))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        manager.origin.release.set()
+        await asyncio.sleep(0.01)
+
+        del waiter
+        gc.collect()
+        assert unhandled == []
+        assert not manager._inflight_downloads
+
+    asyncio.run(main())
+
+
+def test_progressive_flight_without_waiters_settles_quietly(tmp_path):
+    async def main():
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        manager = make_manager(tmp_path)
+        progressive = SimpleNamespace(download_done=asyncio.Event(), copy_digest=None)
+        progressive.download_done.set()
+
+        flight = _DownloadFlight(loop.create_future())
+        manager._inflight_downloads[URL] = flight
+        await manager._run_download_flight(URL, flight, progressive)
+        assert flight.future.cancelled()
+        assert not manager._inflight_downloads
+        assert manager.origin.fetches == 0
+
+        # A caller that joined the flight gets the audio fetched again instead
+        flight = _DownloadFlight(loop.create_future())
+        flight.waiters = 1
+        manager._inflight_downloads[URL] = flight
+        await manager._run_download_flight(URL, flight, progressive)
+        manager.audio_cache.release(flight.future.result())
+        assert manager.origin.fetches == 1
+        assert pinned(manager) == 0
+
+        del flight
+        gc.collect()
+        assert unhandled == []
+
+    asyncio.run(main())
+
+
+def long_streams() -> FakeBehavior:
+    return FakeBehavior(join_latency=0.02, join_jitter=0, stream_seconds=30, rpc_latency=0)
+
+
+def test_draining_refuses_new_work_and_drops_queued_clips(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path, behavior=long_streams())
+        await manager.start()
+        playing = await manager.stream_audio(-1, URL)
+        queued, _ = manager.enqueue_audio(-1, [URL + '?next'])
+
+        assert not await manager.drain(0.05)
+        assert queued[0].state == StreamJob.CANCELLED
+        assert playing.state == StreamJob.PLAYING
+        with pytest.raises(ServiceDraining):
+            await manager.stream_audio(-2, URL)
+        with pytest.raises(ServiceDraining):
+            manager.enqueue_audio(-2, [URL])
+        with pytest.raises(ServiceDraining):
+            await manager.start_call(7, URL)
+        with pytest.raises(ServiceDraining):
+            manager.prepare_broadcast([-3], time.time() + 60)
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_drain_gives_up_at_its_timeout(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path, behavior=long_streams())
+        await manager.start()
+        await manager.stream_audio(-1, URL)
+
+        started = time.monotonic()
+        assert not await manager.drain(0.2)
+        assert 0.15 <= time.monotonic() - started < 1
+        assert manager.active_streams() == 1
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_drain_waits_for_streams_to_finish_and_leaves_idle_calls(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        await manager.start()
+        job = await manager.stream_audio(-1, URL)
+        manager.prepare_broadcast([-2], time.time() + 0.5, lead_seconds=0.5)
+        await asyncio.sleep(0.2)
+        assert manager.calls.chat(-2).state == CallRecord.WARM
+
+        assert await manager.drain(5)
+        assert job.state == StreamJob.COMPLETED
+        assert manager.calls.chat(-2) is None
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def count_joins(manager) -> list:
+    """Record the chats each fake pytgcalls joins, as opposed to swapping streams in."""
+    joins = []
+    for session in manager.sessions:
+        join = session.pytgcalls.join_group_call
+
+        async def counted(chat_id, *args, join=join, **kwargs):
+            joins.append(chat_id)
+            return await join(chat_id, *args, **kwargs)
+
+        session.pytgcalls.join_group_call = counted
+    return joins
+
+
+def test_broadcast_to_a_prewarmed_chat_swaps_the_stream_in(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        await manager.start()
+        joins = count_joins(manager)
+        start_at = time.time() + 0.2
+        assert manager.prepare_broadcast([-1, -1, -2], start_at, lead_seconds=0.2) == 2
+        assert manager.prepare_broadcast([-1], start_at) == 0
+        await asyncio.sleep(0.15)
+
+        warm = manager.calls.chat(-1)
+        assert warm.state == CallRecord.WARM
+        job = await manager.stream_audio(-1, URL)
+        assert job.state == StreamJob.PLAYING
+        assert manager.calls.chat(-1) is warm
+        assert warm.state == CallRecord.PLAYING
+        assert sorted(joins) == [-2, -1]
+
+        await settle(manager)
+        assert job.state == StreamJob.COMPLETED
+        assert manager.calls.chat(-1) is None
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_prewarmed_call_no_stream_reaches_is_left_after_the_hold(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path, prewarm_hold_seconds=0.1)
+        await manager.start()
+        manager.prepare_broadcast([-1], time.time() + 0.1, lead_seconds=0.1)
+        await asyncio.sleep(0.1)
+        assert manager.calls.chat(-1).state == CallRecord.WARM
+
+        await asyncio.sleep(0.3)
+        assert manager.calls.chat(-1) is None
+        assert manager.sessions.get(-1) is None
+        await manager.stop()
+
+    asyncio.run(main())
+
+
+def test_broadcast_in_the_past_is_not_prewarmed(tmp_path):
+    async def main():
+        manager = make_manager(tmp_path)
+        assert manager.prepare_broadcast([-1], time.time() - 1) == 0
+        assert len(manager.timer_wheel) == 0
+
+    asyncio.run(main())
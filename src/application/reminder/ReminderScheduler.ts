@@ -6,6 +6,8 @@ import { NotificationService } from '../../infrastructure/telegram/NotificationS
 import { DateTime } from '../../domain/shared/DateTime';
 import { PrayerName, ALL_PRAYERS } from '../../domain/prayer/PrayerName';
 
+const AZAN_URL = 'https://cdn.aladhan.com/audio/adhans/a1.mp3';
+
 /**
  * Reminder Scheduler
  * Manages scheduled prayer time reminders for subscribed users
@@ -60,6 +62,13 @@ export class ReminderScheduler {
       const currentTime = DateTime.getCurrentTimeInMinutes();
       const currentDate = DateTime.today();
 
+      // Group azans are collected and broadcast in one batch per prayer
+      const azanBroadcasts = new Map<PrayerName, number[]>();
+      // Groups to get voice chats ready for, by prayer time
+      const azanPreparations = new Map<number, number[]>();
+      // Call reminders are placed in one batch per prayer, with the text to send if a call fails
+      const callReminders = new Map<PrayerName, Map<number, string>>();
+
       for (const user of subscribedUsers) {
         if (!user.location) continue;
 
@@ -81,6 +90,15 @@ export class ReminderScheduler {
                 prayer.name,
                 user.language.code
               );
+
+              // Group chat IDs are negative; skip the chat lookup for private chats
+              if (user.id.value < 0 && (await this.notificationService.isGroup(user.id.value))) {
+                const startAt = new Date(Date.now() + (prayerTimeInMinutes - currentTime) * 60_000);
+                startAt.setSeconds(0, 0);
+                const chatIds = azanPreparations.get(startAt.getTime()) ?? [];
+                chatIds.push(user.id.value);
+                azanPreparations.set(startAt.getTime(), chatIds);
+              }
             }
 
             // At prayer time
@@ -89,7 +107,9 @@ export class ReminderScheduler {
                 user.id.value,
                 prayer.name,
                 user.language.code,
-                user
+                user,
+                azanBroadcasts,
+                callReminders
               );
             }
 
@@ -106,6 +126,10 @@ export class ReminderScheduler {
           console.error(`Error processing reminders for user ${user.id.value}:`, error);
         }
       }
+
+      await this.broadcastQueuedAzans(azanBroadcasts);
+      await this.callQueuedReminders(callReminders);
+      await this.prepareQueuedAzans(azanPreparations);
     } catch (error) {
       console.error('Error in reminder scheduler:', error);
     }
@@ -161,7 +185,9 @@ export class ReminderScheduler {
     userId: number,
     prayer: PrayerName,
     languageCode: string,
-    user?: any
+    user?: any,
+    azanBroadcasts?: Map<PrayerName, number[]>,
+    callReminders?: Map<PrayerName, Map<number, string>>
   ): Promise<void> {
     try {
       let message: string;
@@ -179,22 +205,30 @@ export class ReminderScheduler {
         await this.notificationService.sendMessage(userId, message);
 
         // Broadcast azan in groups (voice chat streaming or voice message)
-        const azanUrl = 'https://cdn.aladhan.com/audio/adhans/a1.mp3';
-        const method = await this.notificationService.broadcastAzan(
-          userId,
-          azanUrl,
-          `🕌 ${prayer} Azan`
-        );
-        console.log(`📢 Broadcasted azan for ${prayer} via ${method} in group ${userId}`);
+        if (azanBroadcasts) {
+          const chatIds = azanBroadcasts.get(prayer) ?? [];
+          chatIds.push(userId);
+          azanBroadcasts.set(prayer, chatIds);
+        } else {
+          const method = await this.notificationService.broadcastAzan(
+            userId,
+            AZAN_URL,
+            `🕌 ${prayer} Azan`
+          );
+          console.log(`📢 Broadcasted azan for ${prayer} via ${method} in group ${userId}`);
+        }
       } else {
         // For private chats, check if user wants call reminders
         const remindByCall = user?.functionalities?.remindByCall || false;
 
-        if (remindByCall) {
+        if (remindByCall && callReminders) {
+          const messages = callReminders.get(prayer) ?? new Map<number, string>();
+          messages.set(userId, message);
+          callReminders.set(prayer, messages);
+        } else if (remindByCall) {
           // Make a voice call with azan
           console.log(`📞 Making call reminder for ${prayer} to user ${userId}`);
-          const azanUrl = 'https://cdn.aladhan.com/audio/adhans/a1.mp3';
-          const callId = await this.notificationService.callUser(userId, azanUrl, 180);
+          const callId = await this.notificationService.callUser(userId, AZAN_URL, 180);
 
           if (callId) {
             console.log(`✅ Initiated call reminder for ${prayer} to user ${userId} (Call ID: ${callId})`);
@@ -218,6 +252,68 @@ export class ReminderScheduler {
     }
   }
 
+  /**
+   * Broadcast the azans collected during a scheduler run, one batch per prayer
+   */
+  private async broadcastQueuedAzans(azanBroadcasts: Map<PrayerName, number[]>): Promise<void> {
+    for (const [prayer, chatIds] of azanBroadcasts) {
+      try {
+        const methods = await this.notificationService.broadcastAzanBatch(
+          chatIds,
+          AZAN_URL,
+          `🕌 ${prayer} Azan`
+        );
+        for (const [chatId, method] of methods) {
+          console.log(`📢 Broadcasted azan for ${prayer} via ${method} in group ${chatId}`);
+        }
+      } catch (error) {
+        console.error(`Failed to broadcast azan for ${prayer} to ${chatIds.length} groups:`, error);
+      }
+    }
+  }
+
+  /**
+   * Place the call reminders collected during a scheduler run, one batch per prayer
+   * Users whose call fails get the text reminder instead
+   */
+  private async callQueuedReminders(callReminders: Map<PrayerName, Map<number, string>>): Promise<void> {
+    for (const [prayer, messages] of callReminders) {
+      try {
+        const callIds = await this.notificationService.callUsers([...messages.keys()], AZAN_URL, 180);
+        for (const [userId, message] of messages) {
+          const callId = callIds.get(userId);
+          if (callId) {
+            console.log(`✅ Initiated call reminder for ${prayer} to user ${userId} (Call ID: ${callId})`);
+            continue;
+          }
+
+          // Fallback to text message if call fails
+          console.warn(`⚠️  Call failed for user ${userId}, sending text message instead`);
+          try {
+            await this.notificationService.sendMessage(userId, message);
+          } catch (error) {
+            console.error(`Failed to send prayer time reminder for ${prayer} to user ${userId}:`, error);
+          }
+        }
+      } catch (error) {
+        console.error(`Failed to place call reminders for ${prayer} to ${messages.size} users:`, error);
+      }
+    }
+  }
+
+  /**
+   * Ask the voice chat service to get the collected groups ready for their azan
+   */
+  private async prepareQueuedAzans(azanPreparations: Map<number, number[]>): Promise<void> {
+    for (const [startAt, chatIds] of azanPreparations) {
+      try {
+        await this.notificationService.prepareAzanBroadcast(chatIds, new Date(startAt));
+      } catch (error) {
+        console.error(`Failed to prepare azan broadcast for ${chatIds.length} groups:`, error);
+      }
+    }
+  }
+
   /**
    * Send 5-minute after prayer reminder
    */
@@ -1,6 +1,27 @@
 import { Telegraf } from 'telegraf';
 import { BotContext } from './Session';
-import { VoiceChatService } from './VoiceChatService';
+import { CallOptions, VoiceChatService } from './VoiceChatService';
+
+/**
+ * How long after it is requested an azan stream may still start;
+ * later than that the voice message fallback is sent instead
+ */
+const AZAN_START_DEADLINE_MS = 60_000;
+
+function azanCallOptions(): CallOptions {
+  return {
+    priority: 'PRIORITY_AZAN',
+    deadline: new Date(Date.now() + AZAN_START_DEADLINE_MS),
+  };
+}
+
+/**
+ * Idempotency key shared by requests for the same target within a minute,
+ * so a notification fired twice streams or calls once
+ */
+function minuteKey(kind: string, targetId: number): string {
+  return `${kind}:${targetId}:${Math.floor(Date.now() / 60_000)}`;
+}
 
 /**
  * Notification Service
@@ -83,7 +104,12 @@ export class NotificationService {
       }
       
       console.log(`🎵 Attempting to broadcast azan via voice chat in ${chatId}`);
-      const streamed = await this.voiceChatService.streamAudio(chatId, azanAudioPath);
+      // A draining or flood-waited service cannot start the stream; fall back right away
+      const streamed = (await this.voiceChatService.isReady())
+        && (await this.voiceChatService.streamAudio(chatId, azanAudioPath, {
+          ...azanCallOptions(),
+          idempotencyKey: minuteKey('azan', chatId),
+        }));
 
       console.log({
         streamed,
@@ -109,6 +135,71 @@ export class NotificationService {
     }
   }
 
+  /**
+   * Broadcast azan to many groups at once
+   * Streams in voice chats through a single batch request and falls back to
+   * voice messages for the chats where streaming failed
+   *
+   * @param chatIds - The group chat IDs
+   * @param azanAudioPath - URL of the azan audio
+   * @param caption - Optional caption for the fallback voice message
+   * @returns Promise<Map<number, 'voice_chat' | 'voice_message' | 'failed'>> - Broadcast method per chat
+   */
+  async broadcastAzanBatch(
+    chatIds: number[],
+    azanAudioPath: string,
+    caption?: string
+  ): Promise<Map<number, 'voice_chat' | 'voice_message' | 'failed'>> {
+    const methods = new Map<number, 'voice_chat' | 'voice_message' | 'failed'>();
+    if (chatIds.length === 0) {
+      return methods;
+    }
+
+    let streamed = new Map<number, boolean>();
+    if (!this.voiceChatService) {
+      console.error('Voice chat service not initialized');
+    } else if (!(await this.voiceChatService.isReady())) {
+      console.warn(`⚠️  Voice chat service is not taking streams, sending azan to ${chatIds.length} groups as voice messages`);
+    } else {
+      console.log(`🎵 Attempting to broadcast azan via voice chat in ${chatIds.length} groups`);
+      streamed = await this.voiceChatService.streamAudioBatch(chatIds, azanAudioPath, 0, azanCallOptions());
+    }
+
+    for (const chatId of chatIds) {
+      if (streamed.get(chatId)) {
+        methods.set(chatId, 'voice_chat');
+        continue;
+      }
+
+      // Fallback to voice message
+      try {
+        await this.broadcastVoice(chatId, azanAudioPath, caption);
+        methods.set(chatId, 'voice_message');
+      } catch (error) {
+        console.error(`Failed to broadcast azan to ${chatId}:`, error);
+        methods.set(chatId, 'failed');
+      }
+    }
+
+    return methods;
+  }
+
+  /**
+   * Get voice chats ready ahead of an azan broadcast
+   * Lets the broadcast start playing at prayer time without joining first
+   *
+   * @param chatIds - The group chat IDs the azan will be broadcast to
+   * @param startAt - Prayer time
+   */
+  async prepareAzanBroadcast(chatIds: number[], startAt: Date): Promise<void> {
+    if (!this.voiceChatService || chatIds.length === 0) {
+      return;
+    }
+
+    const scheduled = await this.voiceChatService.prepareBroadcast(chatIds, startAt);
+    console.log(`🎙️ Pre-warming voice chats in ${scheduled}/${chatIds.length} groups for ${startAt.toISOString()}`);
+  }
+
   /**
    * Call a user with audio playback (1-on-1 call)
    *
@@ -122,14 +213,16 @@ export class NotificationService {
     audioUrl: string,
     durationSeconds: number = 180
   ): Promise<string | null> {
-    if (!this.voiceChatService?.isAvailable()) {
+    if (!this.voiceChatService || !(await this.voiceChatService.isReady())) {
       console.warn(`Voice chat service not available for calling user ${userId}`);
       return null;
     }
 
     try {
       console.log(`📞 Initiating call to user ${userId} with audio: ${audioUrl}`);
-      const callId = await this.voiceChatService.startCall(userId, audioUrl, durationSeconds);
+      const callId = await this.voiceChatService.startCall(userId, audioUrl, durationSeconds, {
+        idempotencyKey: minuteKey('call', userId),
+      });
 
       if (callId) {
         console.log(`✅ Successfully initiated call to user ${userId} (Call ID: ${callId})`);
@@ -143,4 +236,28 @@ export class NotificationService {
       return null;
     }
   }
+
+  /**
+   * Call many users with the same audio through a single batch request
+   *
+   * @param userIds - The user IDs to call
+   * @param audioUrl - URL of audio to play during the calls
+   * @param durationSeconds - Maximum duration of each call (default: 180 seconds)
+   * @returns Promise<Map<number, string | null>> - Call ID per user, null where the call failed
+   */
+  async callUsers(
+    userIds: number[],
+    audioUrl: string,
+    durationSeconds: number = 180
+  ): Promise<Map<number, string | null>> {
+    if (!this.voiceChatService || !(await this.voiceChatService.isReady())) {
+      console.warn(`Voice chat service not available for calling ${userIds.length} users`);
+      return new Map(userIds.map((userId) => [userId, null] as [number, string | null]));
+    }
+
+    console.log(`📞 Initiating calls to ${userIds.length} users with audio: ${audioUrl}`);
+    return this.voiceChatService.startCallBatch(userIds, audioUrl, durationSeconds, {
+      idempotencyKeys: (userId) => minuteKey('call', userId),
+    });
+  }
 }
@@ -2,6 +2,105 @@ import * as grpc from '@grpc/grpc-js';
 import * as protoLoader from '@grpc/proto-loader';
 import * as path from 'path';
 
+/**
+ * Scheduling priority of a join when the voice chat service is busy, highest first
+ */
+export type CallPriority = 'PRIORITY_AZAN' | 'PRIORITY_REMINDER' | 'PRIORITY_PREWARM' | 'PRIORITY_TEST';
+
+/**
+ * Admission options for a stream or call
+ */
+export interface CallOptions {
+  /** Defaults to PRIORITY_AZAN for streams and PRIORITY_REMINDER for calls */
+  priority?: CallPriority;
+  /** Give up if the join cannot start by then */
+  deadline?: Date;
+  /**
+   * Requests for the same chat or user with the same key start one stream or
+   * call; repeats get the first request's result. Not used by batch requests
+   */
+  idempotencyKey?: string;
+}
+
+/**
+ * Admission options for a call batch
+ */
+export interface CallBatchOptions extends CallOptions {
+  /**
+   * Idempotency key per user, deduplicated against startCall with the same
+   * key, so a batch sent twice calls each user once
+   */
+  idempotencyKeys?: (userId: number) => string;
+}
+
+/**
+ * Lifecycle transition reported by SubscribeCallEvents
+ */
+export type CallEventType =
+  | 'CALL_EVENT_JOINED'
+  | 'CALL_EVENT_PLAYING'
+  | 'CALL_EVENT_ENDED'
+  | 'CALL_EVENT_FAILED'
+  | 'CALL_EVENT_AUTO_ENDED';
+
+/**
+ * Call lifecycle event pushed by the voice chat service
+ */
+export interface CallEvent {
+  type: CallEventType;
+  /** Set for group voice chats */
+  chatId: number;
+  /** Set for private calls */
+  userId: number;
+  jobId: string;
+  callId: string;
+  message: string;
+  at: Date;
+  /** Events dropped before this one because the subscriber fell behind */
+  dropped: number;
+}
+
+/**
+ * A Telegram account of the voice chat service, as reported by HealthCheck
+ */
+export interface VoiceChatSessionHealth {
+  name: string;
+  connected: boolean;
+  /** Chats and users with a call on the session */
+  calls: number;
+  admissionInFlight: number;
+  admissionQueued: number;
+  /** End of an active FloodWait */
+  floodWaitUntil: Date | null;
+}
+
+/**
+ * Liveness, readiness and load of the voice chat service
+ */
+export interface VoiceChatHealth {
+  /** A session is connected to Telegram */
+  live: boolean;
+  /** New streams and calls can start: not draining, a session connected and out of FloodWait */
+  ready: boolean;
+  draining: boolean;
+  /** Streams and calls still running; while draining, what the drain waits for */
+  activeStreams: number;
+  /** When a draining service tears down its remaining calls */
+  drainDeadline: Date | null;
+  groupCalls: number;
+  privateCalls: number;
+  admissionInFlight: number;
+  admissionQueued: number;
+  /** Joins that could still start at once */
+  admissionAvailable: number;
+  sessions: VoiceChatSessionHealth[];
+}
+
+/**
+ * How long a health report is reused by isReady()
+ */
+const HEALTH_CACHE_MS = 5_000;
+
 /**
  * Voice Chat Service
  * Handles Telegram voice chat streaming via Python Pyrogram microservice
@@ -15,6 +114,7 @@ export class VoiceChatService {
   private client: any = null;
   private serviceUrl: string;
   private isConnected: boolean = false;
+  private lastHealth: { checkedAt: number; health: VoiceChatHealth | null } | null = null;
 
   constructor(serviceUrl: string = 'localhost:50053') {
     this.serviceUrl = serviceUrl;
@@ -90,6 +190,67 @@ export class VoiceChatService {
     });
   }
 
+  /**
+   * Fetch the liveness, readiness and load of the service
+   *
+   * @returns The health report, or null if the service could not be reached
+   */
+  async getHealth(): Promise<VoiceChatHealth | null> {
+    if (!this.isAvailable()) {
+      return null;
+    }
+
+    return new Promise((resolve) => {
+      this.client.HealthCheck({}, (error: any, response: any) => {
+        if (error) {
+          console.error('Voice chat health check failed:', error.message);
+          resolve(null);
+          return;
+        }
+
+        resolve({
+          live: response.live,
+          ready: response.ready,
+          draining: response.draining,
+          activeStreams: response.active_streams,
+          drainDeadline: response.draining ? new Date(Number(response.drain_deadline_unix_ms)) : null,
+          groupCalls: response.group_calls,
+          privateCalls: response.private_calls,
+          admissionInFlight: response.admission_in_flight,
+          admissionQueued: response.admission_queued,
+          admissionAvailable: response.admission_available,
+          sessions: response.sessions.map((session: any) => ({
+            name: session.name,
+            connected: session.connected,
+            calls: session.calls,
+            admissionInFlight: session.admission_in_flight,
+            admissionQueued: session.admission_queued,
+            floodWaitUntil: Number(session.flood_wait_until_unix_ms) > 0
+              ? new Date(Number(session.flood_wait_until_unix_ms))
+              : null,
+          })),
+        });
+      });
+    });
+  }
+
+  /**
+   * Whether the service can start streams and calls now
+   * False while it is draining, or while every session is disconnected or in FloodWait,
+   * so callers can fall back right away instead of waiting on a request that cannot start.
+   * Health reports are reused for HEALTH_CACHE_MS
+   */
+  async isReady(): Promise<boolean> {
+    if (!this.isAvailable()) {
+      return false;
+    }
+
+    if (!this.lastHealth || Date.now() - this.lastHealth.checkedAt > HEALTH_CACHE_MS) {
+      this.lastHealth = { checkedAt: Date.now(), health: await this.getHealth() };
+    }
+    return this.lastHealth.health?.ready ?? false;
+  }
+
   /**
    * Start a voice chat in a group
    */
@@ -114,11 +275,13 @@ export class VoiceChatService {
 
   /**
    * Stream audio to a voice chat
+   * Resolves once the voice chat has been joined; playback continues in the service
    *
    * @param chatId - The chat ID where voice chat is active
    * @param audioUrl - URL to the audio file to stream
+   * @param options - Admission priority and deadline
    */
-  async streamAudio(chatId: number, audioUrl: string): Promise<boolean> {
+  async streamAudio(chatId: number, audioUrl: string, options: CallOptions = {}): Promise<boolean> {
     console.log(`🎵 Streaming audio to chat ${chatId} from ${audioUrl} | ${this.isAvailable()}` );
     if (!this.isAvailable()) {
       console.warn(`Voice chat not available for streaming to chat ${chatId}`);
@@ -129,14 +292,19 @@ export class VoiceChatService {
       console.log(`🎵 Streaming audio to chat ${chatId} from ${audioUrl}`);
 
       this.client.StreamAzan(
-        { chat_id: chatId, audio_url: audioUrl },
+        {
+          chat_id: chatId,
+          audio_url: audioUrl,
+          ...this.admissionFields(options),
+          ...(options.idempotencyKey ? { idempotency_key: options.idempotencyKey } : {}),
+        },
         (error: any, response: any) => {
           if (error) {
             console.error(`Failed to stream audio to chat ${chatId}:`, error.message);
             resolve(false);
           } else {
             if (response.success) {
-              console.log(`✅ ${response.message}`);
+              console.log(`✅ ${response.message} - Job ID: ${response.job_id}`);
             } else {
               console.warn(`⚠️  ${response.message}`);
             }
@@ -147,6 +315,167 @@ export class VoiceChatService {
     });
   }
 
+  /**
+   * Stream the same audio to many voice chats in one request
+   *
+   * The service downloads and prepares the audio once and joins the chats
+   * with bounded concurrency.
+   *
+   * @param chatIds - The chat IDs to stream to
+   * @param audioUrl - URL to the audio file to stream
+   * @param maxConcurrency - Concurrent joins (0 uses the service default)
+   * @param options - Admission priority and deadline
+   * @returns Map of chat ID to whether streaming succeeded
+   */
+  async streamAudioBatch(
+    chatIds: number[],
+    audioUrl: string,
+    maxConcurrency: number = 0,
+    options: CallOptions = {}
+  ): Promise<Map<number, boolean>> {
+    const failed = new Map(chatIds.map((chatId) => [chatId, false] as [number, boolean]));
+
+    if (!this.isAvailable()) {
+      console.warn(`Voice chat not available for batch streaming to ${chatIds.length} chats`);
+      return failed;
+    }
+
+    return new Promise((resolve) => {
+      console.log(`🎵 Streaming audio to ${chatIds.length} chats from ${audioUrl}`);
+
+      this.client.StreamAzanBatch(
+        {
+          chat_ids: chatIds,
+          audio_url: audioUrl,
+          max_concurrency: maxConcurrency,
+          ...this.admissionFields(options),
+        },
+        (error: any, response: any) => {
+          if (error) {
+            console.error(`Failed to batch stream audio to ${chatIds.length} chats:`, error.message);
+            resolve(failed);
+          } else {
+            console.log(`${response.success ? '✅' : '⚠️ '} ${response.message}`);
+            const results = new Map(failed);
+            for (const result of response.results) {
+              results.set(Number(result.chat_id), result.success);
+            }
+            resolve(results);
+          }
+        }
+      );
+    });
+  }
+
+  /**
+   * Have the service join voice chats ahead of a broadcast
+   *
+   * The chats are joined shortly before startAt and idle until a stream to
+   * them starts, which then begins playing without a join.
+   *
+   * @param chatIds - The chat IDs the broadcast will stream to
+   * @param startAt - When the broadcast starts
+   * @param leadSeconds - How long before startAt to join (0 uses the service default)
+   * @returns Number of chats scheduled for pre-warming
+   */
+  async prepareBroadcast(chatIds: number[], startAt: Date, leadSeconds: number = 0): Promise<number> {
+    if (!this.isAvailable() || chatIds.length === 0) {
+      return 0;
+    }
+
+    return new Promise((resolve) => {
+      this.client.PrepareBroadcast(
+        { chat_ids: chatIds, start_unix_ms: startAt.getTime(), lead_seconds: leadSeconds },
+        (error: any, response: any) => {
+          if (error) {
+            console.error(`Failed to prepare broadcast to ${chatIds.length} chats:`, error.message);
+            resolve(0);
+          } else {
+            console.log(`${response.success ? '✅' : '⚠️ '} ${response.message}`);
+            resolve(response.scheduled);
+          }
+        }
+      );
+    });
+  }
+
+  /**
+   * Queue audio clips to play one after another in a voice chat
+   *
+   * The chat is joined once; later clips swap the stream in the same call,
+   * which is left once the queue has stayed empty for a while.
+   *
+   * @param chatId - The chat ID to play in
+   * @param audioUrls - URLs of the clips, in play order
+   * @param options - Admission priority and deadline
+   * @returns Stream job ID of each clip, or null if queueing failed
+   */
+  async enqueueAudio(chatId: number, audioUrls: string[], options: CallOptions = {}): Promise<string[] | null> {
+    if (!this.isAvailable() || audioUrls.length === 0) {
+      return null;
+    }
+
+    return new Promise((resolve) => {
+      this.client.EnqueueAudio(
+        { chat_id: chatId, audio_urls: audioUrls, ...this.admissionFields(options) },
+        (error: any, response: any) => {
+          if (error) {
+            console.error(`Failed to queue audio in chat ${chatId}:`, error.message);
+            resolve(null);
+          } else if (!response.success) {
+            console.warn(`⚠️  ${response.message}`);
+            resolve(null);
+          } else {
+            console.log(`✅ ${response.message} in chat ${chatId}`);
+            resolve(response.job_ids);
+          }
+        }
+      );
+    });
+  }
+
+  /**
+   * Skip the queued clip playing in a voice chat
+   */
+  async skipAudio(chatId: number): Promise<boolean> {
+    if (!this.isAvailable()) {
+      return false;
+    }
+
+    return new Promise((resolve) => {
+      this.client.SkipAudio({ chat_id: chatId }, (error: any, response: any) => {
+        if (error) {
+          console.error(`Failed to skip audio in chat ${chatId}:`, error.message);
+          resolve(false);
+        } else {
+          resolve(response.success);
+        }
+      });
+    });
+  }
+
+  /**
+   * Drop the clips waiting in a voice chat's queue; the one playing finishes
+   *
+   * @returns Number of clips dropped
+   */
+  async clearQueue(chatId: number): Promise<number> {
+    if (!this.isAvailable()) {
+      return 0;
+    }
+
+    return new Promise((resolve) => {
+      this.client.ClearQueue({ chat_id: chatId }, (error: any, response: any) => {
+        if (error) {
+          console.error(`Failed to clear queue in chat ${chatId}:`, error.message);
+          resolve(0);
+        } else {
+          resolve(response.cleared);
+        }
+      });
+    });
+  }
+
   /**
    * Stop voice chat in a group
    */
@@ -173,8 +502,14 @@ export class VoiceChatService {
    * @param userId - The user ID to call
    * @param audioUrl - URL of audio file to play during call
    * @param durationSeconds - Maximum call duration (default: 180 seconds)
+   * @param options - Admission priority and deadline
    */
-  async startCall(userId: number, audioUrl: string, durationSeconds: number = 180): Promise<string | null> {
+  async startCall(
+    userId: number,
+    audioUrl: string,
+    durationSeconds: number = 180,
+    options: CallOptions = {}
+  ): Promise<string | null> {
     if (!this.isAvailable()) {
       console.warn(`Cannot start call: voice chat not available for user ${userId}`);
       return null;
@@ -187,7 +522,9 @@ export class VoiceChatService {
         {
           user_id: userId,
           audio_url: audioUrl,
-          duration_seconds: durationSeconds
+          duration_seconds: durationSeconds,
+          ...this.admissionFields(options),
+          ...(options.idempotencyKey ? { idempotency_key: options.idempotencyKey } : {}),
         },
         (error: any, response: any) => {
           if (error) {
@@ -207,6 +544,71 @@ export class VoiceChatService {
     });
   }
 
+  /**
+   * Call many users with the same audio
+   * The audio is downloaded once by the service and users are dialed in parallel
+   *
+   * @param userIds - The user IDs to call
+   * @param audioUrl - URL of audio file to play during the calls
+   * @param durationSeconds - Maximum duration of each call (default: 180 seconds)
+   * @param options - Admission priority, deadline and per-user idempotency keys
+   * @param onResult - Called with each user's call ID (null if the call failed) as soon as it is known
+   * @returns Call ID per user, null for users whose call failed
+   */
+  async startCallBatch(
+    userIds: number[],
+    audioUrl: string,
+    durationSeconds: number = 180,
+    options: CallBatchOptions = {},
+    onResult?: (userId: number, callId: string | null) => void
+  ): Promise<Map<number, string | null>> {
+    const results = new Map(userIds.map((userId) => [userId, null] as [number, string | null]));
+
+    if (!this.isAvailable()) {
+      console.warn(`Cannot start calls: voice chat not available for ${userIds.length} users`);
+      return results;
+    }
+    if (userIds.length === 0) {
+      return results;
+    }
+
+    return new Promise((resolve) => {
+      console.log(`📞 Starting calls to ${userIds.length} users`);
+
+      const stream = this.client.StartCallBatch({
+        user_ids: userIds,
+        audio_url: audioUrl,
+        duration_seconds: durationSeconds,
+        ...this.admissionFields(options),
+        ...(options.idempotencyKeys
+          ? {
+              idempotency_keys: Object.fromEntries(
+                userIds.map((userId) => [userId, options.idempotencyKeys!(userId)])
+              ),
+            }
+          : {}),
+      });
+      stream.on('data', (result: any) => {
+        const userId = Number(result.user_id);
+        const callId = result.success ? result.call_id : null;
+        if (!callId) {
+          console.warn(`⚠️  Call to user ${userId} failed: ${result.message}`);
+        }
+        results.set(userId, callId);
+        onResult?.(userId, callId);
+      });
+      stream.on('error', (error: any) => {
+        console.error(`Failed to start calls to ${userIds.length} users:`, error.message);
+        resolve(results);
+      });
+      stream.on('end', () => {
+        const started = [...results.values()].filter((callId) => callId !== null).length;
+        console.log(`✅ Started ${started}/${userIds.length} calls`);
+        resolve(results);
+      });
+    });
+  }
+
   /**
    * End an active 1-on-1 call
    *
@@ -230,6 +632,53 @@ export class VoiceChatService {
     });
   }
 
+  /**
+   * Subscribe to call lifecycle events instead of polling for them
+   *
+   * @param onEvent - Called for every event
+   * @param chatIds - Chat or user IDs to receive events of (empty for all)
+   * @returns Function that cancels the subscription
+   */
+  subscribeCallEvents(onEvent: (event: CallEvent) => void, chatIds: number[] = []): () => void {
+    if (!this.isAvailable()) {
+      return () => {};
+    }
+
+    const stream = this.client.SubscribeCallEvents({ chat_ids: chatIds });
+    stream.on('data', (event: any) => {
+      if (event.dropped > 0) {
+        console.warn(`⚠️  Missed ${event.dropped} call events`);
+      }
+      onEvent({
+        type: event.type,
+        chatId: Number(event.chat_id),
+        userId: Number(event.user_id),
+        jobId: event.job_id,
+        callId: event.call_id,
+        message: event.message,
+        at: new Date(Number(event.at_unix_ms)),
+        dropped: event.dropped,
+      });
+    });
+    stream.on('error', (error: any) => {
+      if (error.code !== grpc.status.CANCELLED) {
+        console.error('Call event subscription failed:', error.message);
+      }
+    });
+
+    return () => stream.cancel();
+  }
+
+  /**
+   * Request fields carrying admission options
+   */
+  private admissionFields(options: CallOptions): { priority?: CallPriority; deadline_unix_ms?: number } {
+    return {
+      ...(options.priority ? { priority: options.priority } : {}),
+      ...(options.deadline ? { deadline_unix_ms: options.deadline.getTime() } : {}),
+    };
+  }
+
   /**
    * Disconnect the client
    */